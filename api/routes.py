@@ -1,4 +1,11 @@
+import sqlite3
+from typing import Optional
+
+import numpy as np
 from fastapi import APIRouter
+from app.baseline_curve import current_baseline
+from app.calibration import calibration_shift
+from app.confidence_model import CONFIDENCE_PARAMS, ConfidenceGrid, confidence_bucket_batch
 from app.db_live import connect
 from app.config import CONFIG
 
@@ -268,4 +275,101 @@ def metrics_by_confidence():
     """).fetchall()
 
     conn.close()
-    return [dict(r) for r in rows]
\ No newline at end of file
+    return [dict(r) for r in rows]
+
+@router.get("/metrics/calibration/{season_year}")
+def calibration_by_season(season_year: int, baseline_version: Optional[str] = None):
+    """
+    Online calibration counts (app/calibration.py) for one season and one
+    baseline curve (default: the one loaded now): per confidence bucket and
+    per capped halftime margin, with the shift the halftime path applies at
+    each margin under that curve. `versions` lists every curve with counts.
+    """
+    if baseline_version is None:
+        baseline_version = current_baseline().version
+
+    conn = connect(CONFIG.db_path)
+    try:
+        rows = conn.execute("""
+            SELECT kind, key, resolved, home_wins, correct, sum_predicted, updated_at_utc
+            FROM calibration_state
+            WHERE season_year = ? AND baseline_version = ?;
+        """, (season_year, baseline_version)).fetchall()
+        versions = [r[0] for r in conn.execute("""
+            SELECT DISTINCT baseline_version
+            FROM calibration_state
+            WHERE season_year = ?
+            ORDER BY baseline_version;
+        """, (season_year,)).fetchall()]
+    except sqlite3.OperationalError:
+        rows, versions = [], []  # table is created by the poller on first run
+    finally:
+        conn.close()
+
+    out = {"season_year": season_year, "baseline_version": baseline_version, "versions": versions,
+           "buckets": [], "margins": []}
+    for r in rows:
+        item = dict(r)
+        n = item["resolved"]
+        item["accuracy"] = item["correct"] / n if n else None
+        item["home_win_rate"] = item["home_wins"] / n if n else None
+        item["mean_predicted"] = item["sum_predicted"] / n if n else None
+        if item["kind"] == "margin":
+            item["shift"] = calibration_shift(n, item["home_wins"], item["sum_predicted"])
+            out["margins"].append(item)
+        else:
+            out["buckets"].append(item)
+    out["margins"].sort(key=lambda m: int(m["key"]))
+    return out
+
+
+@router.get("/confidence/what-if")
+def confidence_what_if(
+    margin: int,
+    neutral: bool = False,
+    season_year: Optional[int] = None,
+    hqs_step: float = 0.05,
+):
+    """
+    Confidence and bucket a halftime margin would get across first-half
+    quality (HQS), with and without a shooting extreme, from the current
+    baseline. Read from the artifact's precomputed confidence grid when it
+    matches the live params; otherwise (logistic curve, no grid) tabulated
+    for this margin on the fly. Ignores online calibration.
+    """
+    curve = current_baseline()
+    p, weight = curve.lookup(margin, neutral, season_year)
+
+    grid = getattr(curve, "confidence_grid", None)
+    if grid is not None and grid.params == CONFIDENCE_PARAMS:
+        source = "grid"
+    else:
+        grid = ConfidenceGrid.build([p], [weight], margin, CONFIDENCE_PARAMS, baseline_version=curve.version)
+        source = "computed"
+
+    step = max(hqs_step, grid.hqs_step)
+    hqs = np.round(np.arange(-grid.hqs_max, grid.hqs_max + step / 2, step), 4) + 0.0  # no -0.0
+    normal = grid.lookup_batch(margin, hqs, False)
+    extreme = grid.lookup_batch(margin, hqs, True)
+    normal_bucket = confidence_bucket_batch(normal)
+    extreme_bucket = confidence_bucket_batch(extreme)
+
+    return {
+        "margin": margin,
+        "neutral": neutral,
+        "season_year": season_year,
+        "baseline_prob": p,
+        "baseline_weight": weight,
+        "baseline_version": curve.version,
+        "source": source,
+        "rows": [
+            {
+                "hqs": float(hqs[i]),
+                "confidence": float(normal[i]),
+                "bucket": str(normal_bucket[i]),
+                "confidence_shooting_extreme": float(extreme[i]),
+                "bucket_shooting_extreme": str(extreme_bucket[i]),
+            }
+            for i in range(len(hqs))
+        ],
+    }
@@ -1,5 +1,39 @@
 # app/baseline_curve.py
+#
+# Halftime margin -> (home win prob, weight).
+#
+# The live curve comes from the artifact written by
+# scripts/smooth_baseline_probs.py (CONFIG.baseline_artifact_path): a dense
+# per-integer-margin array, indexed directly. The poller re-reads it when the
+# file changes, so a re-fit goes live without a restart. Without an artifact
+# the built-in buckets below are used.
+#
+# A bucket artifact can also carry a ConfidenceGrid (app/confidence_model.py,
+# written by scripts/build_confidence_grid.py) tabulating confidence over
+# margin x HQS for this curve; handle_halftime reads it instead of
+# evaluating the formula.
+#
+# The same path can instead hold a logistic fit from
+# scripts/fit_logistic_baseline.py (LogisticCurve): a handful of
+# coefficients, evaluated per game, that also use neutral site and season.
 
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import CONFIG
+from app.confidence_model import DEFAULT_HQS_STEP, ConfidenceGrid, ConfidenceParams
+
+ARTIFACT_FORMAT = "halftime-baseline/v1"
+LOGIT_FORMAT = "halftime-logit/v1"
+
+# built-in fallback (and the shape the artifact's "buckets" use)
 BASELINE_HALFTIME_PROBS = [
     {"low": -20, "high": -16, "p": 0.1331, "weight": 0.85},
     {"low": -15, "high": -11, "p": 0.1868, "weight": 0.93},
@@ -12,6 +46,12 @@ BASELINE_HALFTIME_PROBS = [
     {"low":  16, "high":  20, "p": 0.9508, "weight": 0.93},
 ]
 
+MIN_MARGIN = -20
+MAX_MARGIN = 20
+
+# defensive fallback for margins no bucket covers: neutral prob. and weight
+NEUTRAL = (0.5, 1.0)
+
 
 def cap_margin(margin: int) -> int:
     if margin < -20:
@@ -21,11 +61,254 @@ def cap_margin(margin: int) -> int:
     return margin
 
 
-def lookup_baseline_prob(halftime_margin: int): # (got rid of) -> float
-    capped = cap_margin(halftime_margin)
+class BaselineCurve:
+    """
+    Dense lookup table: p[i], weight[i] for margin min_margin + i.
+    Margins outside [min_margin, max_margin] are capped to the ends.
+    """
+
+    def __init__(
+        self,
+        p: List[float],
+        weight: List[float],
+        min_margin: int = MIN_MARGIN,
+        version: str = "builtin",
+        metadata: Optional[Dict] = None,
+        confidence_grid: Optional[ConfidenceGrid] = None,
+    ):
+        if len(p) != len(weight) or not p:
+            raise ValueError("p and weight must be non-empty and the same length")
+        self.p = [float(x) for x in p]
+        self.weight = [float(x) for x in weight]
+        self.min_margin = int(min_margin)
+        self.max_margin = self.min_margin + len(self.p) - 1
+        self.version = version
+        self.metadata = metadata or {}
+        self.confidence_grid = confidence_grid
+
+    def lookup(self, halftime_margin: int, neutral: bool = False, season: Optional[int] = None) -> Tuple[float, float]:
+        # neutral / season: accepted for LogisticCurve compatibility, unused
+        i = int(halftime_margin) - self.min_margin
+        if i < 0:
+            i = 0
+        elif i >= len(self.p):
+            i = len(self.p) - 1
+        return self.p[i], self.weight[i]
+
+    def lookup_batch(self, margins, neutral=None, season=None):
+        """Vectorized lookup: margins array -> (p array, weight array)."""
+        idx = np.clip(np.asarray(margins, dtype=np.int64) - self.min_margin, 0, len(self.p) - 1)
+        return np.asarray(self.p)[idx], np.asarray(self.weight)[idx]
+
+    @classmethod
+    def from_buckets(cls, buckets: List[Dict], version: str = "builtin") -> "BaselineCurve":
+        p, weight = dense_from_buckets(buckets)
+        return cls(p, weight, MIN_MARGIN, version=version, metadata={"buckets": buckets})
+
+    @classmethod
+    def from_artifact(cls, path: Path) -> "BaselineCurve":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"{path}: unsupported baseline artifact format {data.get('format')!r}")
+
+        p, weight = data["p"], data["weight"]
+        if len(p) != data["max_margin"] - data["min_margin"] + 1:
+            raise ValueError(f"{path}: p/weight do not cover min_margin..max_margin")
+
+        grid = None
+        if data.get("confidence_grid"):
+            try:
+                grid = ConfidenceGrid.from_dict(data["confidence_grid"])
+            except ValueError as e:
+                print(f"[BASELINE] {path}: {e}; ignoring the confidence grid (rebuild it)")
+            if grid is not None and grid.baseline_version != data["version"]:
+                print(f"[BASELINE] {path}: confidence grid was built for {grid.baseline_version}, "
+                      f"not {data['version']}; ignoring it")
+                grid = None
+
+        metadata = {k: v for k, v in data.items() if k not in ("p", "weight", "confidence_grid")}
+        return cls(p, weight, data["min_margin"], version=data["version"], metadata=metadata,
+                   confidence_grid=grid)
+
+
+def dense_from_buckets(buckets: List[Dict], min_margin: int = MIN_MARGIN, max_margin: int = MAX_MARGIN):
+    """Expands [{low, high, p, weight}] to per-margin lists; uncovered margins get NEUTRAL."""
+    p, weight = [], []
+    for margin in range(min_margin, max_margin + 1):
+        bucket = next((b for b in buckets if b["low"] <= margin <= b["high"]), None)
+        if bucket is None:
+            p.append(NEUTRAL[0])
+            weight.append(NEUTRAL[1])
+        else:
+            p.append(bucket["p"])
+            weight.append(bucket["weight"])
+    return p, weight
+
+
+BUILTIN_CURVE = BaselineCurve.from_buckets(BASELINE_HALFTIME_PROBS)
+
+
+def attach_confidence_grid(
+    artifact: Dict,
+    params: Optional[ConfidenceParams] = None,
+    hqs_step: float = DEFAULT_HQS_STEP,
+) -> ConfidenceGrid:
+    """Builds the ConfidenceGrid for a bucket artifact dict and stores it in it."""
+    if artifact.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"confidence grids need a {ARTIFACT_FORMAT} artifact, not {artifact.get('format')!r}")
+    grid = ConfidenceGrid.build(
+        artifact["p"], artifact["weight"], artifact["min_margin"],
+        params, hqs_step, baseline_version=artifact["version"],
+    )
+    artifact["confidence_grid"] = grid.to_dict()
+    return grid
+
+
+class LogisticCurve:
+    """
+    p(home win) = 1 / (1 + exp(-z)),
+    z = intercept + margin * m + neutral * n + season_offsets.get(season, 0)
 
-    for bucket in BASELINE_HALFTIME_PROBS:
-        if bucket["low"] <= capped <= bucket["high"]:
-            return bucket["p"], bucket["weight"]
+    Fit by scripts/fit_logistic_baseline.py. Unknown seasons (e.g. the
+    live one, before it is in the training data) get no offset; the fit
+    shrinks the offsets toward 0 so that is the league-average season.
+    `weight` is one constant, playing the buckets' reliability weight.
+    """
 
-    return 0.5, 1.0  # defensive fallback: neutral prob. and weight
+    # p depends on site and season, so there is no margin x HQS grid
+    confidence_grid = None
+
+    def __init__(
+        self,
+        coefficients: Dict[str, float],
+        season_offsets: Optional[Dict[int, float]] = None,
+        weight: float = 1.0,
+        version: str = "logit",
+        metadata: Optional[Dict] = None,
+    ):
+        self.intercept = float(coefficients["intercept"])
+        self.margin = float(coefficients["margin"])
+        self.neutral = float(coefficients.get("neutral", 0.0))
+        self.season_offsets = {int(k): float(v) for k, v in (season_offsets or {}).items()}
+        self.weight = float(weight)
+        self.version = version
+        self.metadata = metadata or {}
+
+    def lookup(self, halftime_margin: int, neutral: bool = False, season: Optional[int] = None) -> Tuple[float, float]:
+        z = self.intercept + self.margin * halftime_margin
+        if neutral:
+            z += self.neutral
+        if season is not None:
+            z += self.season_offsets.get(int(season), 0.0)
+        # split on the sign so exp() cannot overflow
+        if z >= 0:
+            p = 1.0 / (1.0 + math.exp(-z))
+        else:
+            e = math.exp(z)
+            p = e / (1.0 + e)
+        return p, self.weight
+
+    def lookup_batch(self, margins, neutral=None, season=None):
+        margins = np.asarray(margins, dtype=np.float64)
+        z = self.intercept + self.margin * margins
+        if neutral is not None:
+            z = z + self.neutral * np.asarray(neutral, dtype=np.float64)
+        if season is not None:
+            season = np.asarray(season, dtype=np.int64)
+            offsets = np.zeros(len(season))
+            for year, offset in self.season_offsets.items():
+                offsets[season == year] = offset
+            z = z + offsets
+        p = 0.5 * (1.0 + np.tanh(0.5 * z))  # overflow-free logistic
+        return p, np.full(len(margins), self.weight)
+
+    @classmethod
+    def from_artifact(cls, path: Path) -> "LogisticCurve":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("format") != LOGIT_FORMAT:
+            raise ValueError(f"{path}: unsupported logistic artifact format {data.get('format')!r}")
+        metadata = {k: v for k, v in data.items() if k not in ("coefficients", "season_offsets")}
+        return cls(
+            data["coefficients"],
+            data.get("season_offsets"),
+            weight=data.get("weight", 1.0),
+            version=data["version"],
+            metadata=metadata,
+        )
+
+
+def load_curve_artifact(path: Path):
+    """Either artifact format -> BaselineCurve / LogisticCurve."""
+    with open(path, encoding="utf-8") as fh:
+        fmt = json.load(fh).get("format")
+    if fmt == LOGIT_FORMAT:
+        return LogisticCurve.from_artifact(path)
+    return BaselineCurve.from_artifact(path)
+
+
+class BaselineStore:
+    """
+    Holds the current curve (BaselineCurve / LogisticCurve) and reloads it when the artifact's
+    mtime / size change (checked at most every `check_seconds`).
+
+    A missing or unreadable artifact keeps whatever curve is loaded (the
+    built-in one at first), so a half-written or bad file never takes the
+    live path down. Thread-safe; the curve is swapped by reference.
+    """
+
+    def __init__(self, path: Optional[Path], check_seconds: float = 1.0):
+        self.path = Path(path) if path else None
+        self.check_seconds = check_seconds
+        self._curve = BUILTIN_CURVE
+        self._stamp = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Forces a check now; returns the current curve."""
+        self._checked_at = float("-inf")
+        return self.current()
+
+    def current(self):
+        now = time.monotonic()
+        if self.path is None or now - self._checked_at < self.check_seconds:
+            return self._curve
+
+        with self._lock:
+            if now - self._checked_at < self.check_seconds:
+                return self._curve
+            self._checked_at = now
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return self._curve
+
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp == self._stamp:
+                return self._curve
+
+            try:
+                curve = load_curve_artifact(self.path)
+            except Exception as e:
+                print(f"[BASELINE] Could not load {self.path}: {e}; keeping {self._curve.version}")
+                self._stamp = stamp  # don't retry until the file changes again
+                return self._curve
+
+            previous = self._curve.version
+            self._curve = curve
+            self._stamp = stamp
+            print(f"[BASELINE] Loaded {self.path} (version {curve.version}, was {previous})")
+            return curve
+
+
+BASELINE = BaselineStore(CONFIG.baseline_artifact_path)
+
+
+def current_baseline():
+    return BASELINE.current()
+
+
+def lookup_baseline_prob(halftime_margin: int): # (got rid of) -> float
+    return BASELINE.current().lookup(halftime_margin)
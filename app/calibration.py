@@ -0,0 +1,168 @@
+# app/calibration.py
+#
+# Online recalibration of the baseline curve within a season.
+#
+# handle_final adds every resolved prediction to running counts in
+# calibration_state, one row per (season, baseline version, capped halftime
+# margin) and per (season, baseline version, confidence bucket): an O(1)
+# upsert in the same transaction as the resolution. handle_halftime reads
+# the margin row for its game under the live curve's version and moves the
+# curve's p by the observed gap (actual home win rate minus the mean curve
+# p for that margin this season), shrunk by
+#     resolved / (resolved + CONFIG.calibration_prior_games)
+# and capped at CONFIG.calibration_max_shift. The gap is always measured
+# against the raw curve p (explanation_json "baseline_prob"), never the
+# adjusted one, so corrections do not feed back into themselves; and only
+# against the same curve, so a hot-reloaded or refitted artifact starts
+# from no correction instead of inheriting the old curve's gap.
+#
+# Bucket rows are for monitoring (api/routes.py /metrics/calibration).
+
+import sqlite3
+from typing import Optional, Tuple
+
+from app.baseline_curve import cap_margin
+from app.config import CONFIG
+from app.db_live import utc_now_iso
+
+# keep adjusted probabilities off the rails
+P_FLOOR = 0.01
+P_CEILING = 0.99
+
+
+CALIBRATION_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        season_year       INTEGER NOT NULL,
+        baseline_version  TEXT NOT NULL,      -- curve the predictions were made with
+        kind              TEXT NOT NULL,      -- 'margin' | 'bucket'
+        key               TEXT NOT NULL,      -- capped halftime margin | HIGH / MEDIUM / LOW
+
+        resolved          INTEGER NOT NULL DEFAULT 0,
+        home_wins         INTEGER NOT NULL DEFAULT 0,
+        correct           INTEGER NOT NULL DEFAULT 0,
+        sum_predicted     REAL NOT NULL DEFAULT 0,
+
+        updated_at_utc    TEXT NOT NULL,
+        PRIMARY KEY (season_year, baseline_version, kind, key)
+    );
+"""
+
+
+def ensure_calibration_schema(conn: sqlite3.Connection):
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(calibration_state);").fetchall()}
+    if columns and "baseline_version" not in columns:
+        # counts from before rows were keyed by curve: kept, under version ''
+        # (matches no curve, so never applied)
+        conn.executescript(
+            CALIBRATION_TABLE_SQL.format(table="calibration_state_new")
+            + """
+            INSERT INTO calibration_state_new (
+                season_year, baseline_version, kind, key,
+                resolved, home_wins, correct, sum_predicted, updated_at_utc
+            )
+            SELECT season_year, '', kind, key, resolved, home_wins, correct, sum_predicted, updated_at_utc
+            FROM calibration_state;
+            DROP TABLE calibration_state;
+            ALTER TABLE calibration_state_new RENAME TO calibration_state;
+            """
+        )
+        print("[CALIBRATION] Migrated calibration_state to per-baseline-version rows")
+    conn.executescript(CALIBRATION_TABLE_SQL.format(table="calibration_state"))
+    conn.commit()
+
+
+CALIBRATION_UPSERT_SQL = """
+    INSERT INTO calibration_state (
+        season_year, baseline_version, kind, key, resolved, home_wins, correct, sum_predicted, updated_at_utc
+    )
+    VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+    ON CONFLICT(season_year, baseline_version, kind, key) DO UPDATE SET
+        resolved = resolved + 1,
+        home_wins = home_wins + excluded.home_wins,
+        correct = correct + excluded.correct,
+        sum_predicted = sum_predicted + excluded.sum_predicted,
+        updated_at_utc = excluded.updated_at_utc;
+"""
+
+
+def record_resolution(
+    conn: sqlite3.Connection,
+    season_year: int,
+    baseline_version: Optional[str],
+    halftime_margin: Optional[int],
+    baseline_prob: Optional[float],
+    bucket: str,
+    predicted_prob: float,
+    home_win: int,
+    prediction_correct: int,
+):
+    """
+    Adds one resolved prediction to the running counts. Does not commit:
+    call inside the transaction that resolves the prediction, so a game is
+    counted exactly once. baseline_version / halftime_margin / baseline_prob
+    are None for predictions made before they were recorded (bucket row
+    only, under version '').
+    """
+    now = utc_now_iso()
+    version = baseline_version or ""
+    if baseline_version and halftime_margin is not None and baseline_prob is not None:
+        conn.execute(
+            CALIBRATION_UPSERT_SQL,
+            (season_year, version, "margin", str(cap_margin(int(halftime_margin))),
+             home_win, prediction_correct, float(baseline_prob), now),
+        )
+    conn.execute(
+        CALIBRATION_UPSERT_SQL,
+        (season_year, version, "bucket", bucket, home_win, prediction_correct, float(predicted_prob), now),
+    )
+
+
+def get_margin_counts(conn: sqlite3.Connection, season_year: int, baseline_version: str, halftime_margin: int):
+    """(resolved, home_wins, sum_predicted) for the margin's cell under this curve, or None."""
+    return conn.execute(
+        """
+        SELECT resolved, home_wins, sum_predicted
+        FROM calibration_state
+        WHERE season_year = ? AND baseline_version = ? AND kind = 'margin' AND key = ?;
+        """,
+        (season_year, baseline_version, str(cap_margin(int(halftime_margin)))),
+    ).fetchone()
+
+
+def calibration_shift(
+    resolved: int,
+    home_wins: int,
+    sum_predicted: float,
+    prior_games: float = CONFIG.calibration_prior_games,
+    max_shift: float = CONFIG.calibration_max_shift,
+) -> float:
+    if resolved <= 0:
+        return 0.0
+    gap = (home_wins - sum_predicted) / resolved
+    shift = gap * resolved / (resolved + prior_games)
+    return max(-max_shift, min(max_shift, shift))
+
+
+def recalibrate(
+    conn: sqlite3.Connection,
+    season_year: int,
+    halftime_margin: int,
+    p_baseline: float,
+    baseline_version: str,
+) -> Tuple[float, float, int]:
+    """
+    Curve p -> (adjusted p, shift applied, resolved games behind it), from
+    games predicted with the same curve (baseline_version). Returns p
+    unchanged when online calibration is off or the cell is empty.
+    """
+    if not CONFIG.online_calibration:
+        return p_baseline, 0.0, 0
+
+    row = get_margin_counts(conn, season_year, baseline_version, halftime_margin)
+    if row is None:
+        return p_baseline, 0.0, 0
+
+    resolved, home_wins, sum_predicted = row[0], row[1], row[2]
+    shift = calibration_shift(resolved, home_wins, sum_predicted)
+    p = max(P_FLOOR, min(P_CEILING, p_baseline + shift))
+    return p, shift, resolved
@@ -0,0 +1,79 @@
+# app/clock.py
+#
+# Injectable time source for the live path (poller, halftime/final handlers,
+# db_live timestamps). Production uses SystemClock; replays and benchmarks
+# install a SimulatedClock so a whole game day runs in seconds.
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    async def sleep_async(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class SimulatedClock:
+    """
+    Clock that only moves when someone sleeps on it.
+
+    sleep(s) advances simulated time by s instead of waiting; with
+    speed > 0 it also really waits s / speed (speed=60: a minute per second).
+    Thread-safe: worker threads read it while the poll loop advances it.
+    """
+
+    def __init__(self, start: datetime, speed: float = 0.0):
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        self.start = start.astimezone(timezone.utc)
+        self.speed = speed
+        self._elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self.start + timedelta(seconds=self._elapsed)
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._elapsed
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._elapsed += max(0.0, seconds)
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+
+    async def sleep_async(self, seconds: float) -> None:
+        self.advance(seconds)
+        await asyncio.sleep(seconds / self.speed if self.speed > 0 else 0)
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock) -> None:
+    global _clock
+    _clock = clock
+
+
+def utc_now() -> datetime:
+    return _clock.now()
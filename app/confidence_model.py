@@ -16,7 +16,96 @@
 
 # app/confidence_model.py
 
-from typing import Dict, Optional
+import json
+import math
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.config import CONFIG
+
+# first-half team stats read by the model (keys of extract_first_half_team_stats)
+STAT_FIELDS = ("fg_pct", "fg3_pct", "ft_att", "turnovers", "off_reb", "tot_reb")
+
+# Confidence buckets (persisted on predictions; MEDIUM+ triggers alerts)
+HIGH_CONFIDENCE = 0.20
+MEDIUM_CONFIDENCE = 0.10
+BUCKETS = ("HIGH", "MEDIUM", "LOW")
+
+PARAMS_FORMAT = "confidence-params/v1"
+
+
+@dataclass(frozen=True)
+class ConfidenceParams:
+    """
+    Tunable knobs of the confidence model. The defaults are the original
+    hand-picked values; scripts/sweep_confidence_params.py writes tuned
+    ones to CONFIG.confidence_params_path.
+    """
+
+    # HQS weights (stat diffs are scaled as in compute_halftime_quality)
+    fg_weight: float = 0.30
+    fg3_weight: float = 0.15
+    to_weight: float = 0.20
+    orb_weight: float = 0.15
+    reb_weight: float = 0.10
+    ft_weight: float = 0.10
+
+    # multiplier when the HQS sign disagrees with the margin
+    disagreement_factor: float = 0.6
+
+    # multiplier when the lead looks shooting-driven, and what counts as that
+    shooting_penalty: float = 0.85
+    fg_extreme: float = 0.15
+    fg3_extreme: float = 0.20
+
+    # strength boost = 1 + min(boost_scale * |hqs|, boost_cap)
+    boost_scale: float = 0.75
+    boost_cap: float = 0.30
+
+    # bucket cutoffs (MEDIUM+ alerts)
+    high_cutoff: float = HIGH_CONFIDENCE
+    medium_cutoff: float = MEDIUM_CONFIDENCE
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, float]) -> "ConfidenceParams":
+        known = {f.name for f in fields(cls)}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"unknown confidence params: {sorted(unknown)}")
+        return cls(**{k: float(v) for k, v in values.items()})
+
+
+DEFAULT_PARAMS = ConfidenceParams()
+
+
+def load_confidence_params(path: Optional[Path]) -> ConfidenceParams:
+    """
+    Reads a params file written by the sweep script. A missing file means
+    the defaults; a bad one is reported and also falls back to them.
+    """
+    if path is None or not Path(path).exists():
+        return DEFAULT_PARAMS
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("format") != PARAMS_FORMAT:
+            raise ValueError(f"unsupported format {data.get('format')!r}")
+        params = ConfidenceParams.from_dict(data["params"])
+    except Exception as e:
+        print(f"[CONFIDENCE] Could not load {path}: {e}; using defaults")
+        return DEFAULT_PARAMS
+    print(f"[CONFIDENCE] Loaded params {data.get('version', '?')} from {path}")
+    return params
+
+
+# live params, read once at import (restart to pick up a new file)
+CONFIDENCE_PARAMS = load_confidence_params(CONFIG.confidence_params_path)
 
 
 def _sign(x: float) -> int:
@@ -28,19 +117,37 @@ def _sign(x: float) -> int:
 
 
 def _safe_float(x) -> Optional[float]:
+    """Number, numeric string or "45.5%" -> float; None if missing, unparseable or not finite."""
     try:
         if x is None:
             return None
         if isinstance(x, str) and "%" in x:
-            return float(x.replace("%", "")) / 100.0
-        return float(x)
+            value = float(x.replace("%", "")) / 100.0
+        else:
+            value = float(x)
     except Exception:
         return None
+    return value if math.isfinite(value) else None
+
+
+def confidence_bucket(confidence: float, params: Optional[ConfidenceParams] = None) -> str:
+    params = params or CONFIDENCE_PARAMS
+    if confidence >= params.high_cutoff:
+        return "HIGH"
+    if confidence >= params.medium_cutoff:
+        return "MEDIUM"
+    return "LOW"
+
+
+def baseline_confidence(p_baseline: float, baseline_weight: float) -> float:
+    """Confidence when no first-half stats are available (margin only)."""
+    return abs(p_baseline - 0.5) * baseline_weight
 
 
 def compute_halftime_quality(
     home: Dict,
     away: Dict,
+    params: Optional[ConfidenceParams] = None,
 ) -> Dict:
     """
     Computes a Halftime Quality Score (HQS) using only
@@ -51,6 +158,8 @@ def compute_halftime_quality(
       - shooting_extreme (bool)
     """
 
+    params = params or CONFIDENCE_PARAMS
+
     # Parse values safely
     h_fg  = _safe_float(home.get("fg_pct"))
     a_fg  = _safe_float(away.get("fg_pct"))
@@ -82,18 +191,18 @@ def compute_halftime_quality(
 
     # Halftime Quality Score (Bayesian-lite efficiency proxy)
     hqs = (
-        0.30 * fg_diff +
-        0.15 * fg3_diff +
-        0.20 * to_diff +
-        0.15 * orb_diff +
-        0.10 * reb_diff +
-        0.10 * ft_diff
+        params.fg_weight * fg_diff +
+        params.fg3_weight * fg3_diff +
+        params.to_weight * to_diff +
+        params.orb_weight * orb_diff +
+        params.reb_weight * reb_diff +
+        params.ft_weight * ft_diff
     )
 
     # Fluke detection: extreme shooting
     shooting_extreme = (
-        abs(fg_diff) > 0.15 or
-        abs(fg3_diff) > 0.20
+        abs(fg_diff) > params.fg_extreme or
+        abs(fg3_diff) > params.fg3_extreme
     )
 
     return {
@@ -108,6 +217,7 @@ def compute_confidence_with_stats(
     halftime_margin: int,
     stats_home: Dict,
     stats_away: Dict,
+    params: Optional[ConfidenceParams] = None,
 ) -> float:
     """
     Final confidence score combining:
@@ -117,20 +227,51 @@ def compute_confidence_with_stats(
     Returns a numeric confidence score in ~[0.0, 0.45]
     """
 
+    params = params or CONFIDENCE_PARAMS
+    quality = compute_halftime_quality(stats_home, stats_away, params)
+    return confidence_from_quality(
+        p_baseline, baseline_weight, halftime_margin,
+        quality["hqs"], quality["shooting_extreme"], params,
+    )
+
+
+def confidence_from_quality(
+    p_baseline: float,
+    baseline_weight: float,
+    halftime_margin: int,
+    hqs: float,
+    shooting_extreme: bool,
+    params: Optional[ConfidenceParams] = None,
+) -> float:
+    """
+    The part of compute_confidence_with_stats after the HQS: what
+    ConfidenceGrid tabulates.
+    """
+    return round(_unrounded_confidence(p_baseline, baseline_weight, halftime_margin, hqs, shooting_extreme,
+                                       params or CONFIDENCE_PARAMS), 4)
+
+
+def _unrounded_confidence(
+    p_baseline: float,
+    baseline_weight: float,
+    halftime_margin: int,
+    hqs: float,
+    shooting_extreme: bool,
+    params: ConfidenceParams,
+) -> float:
+    """confidence_from_quality before rounding (ConfidenceGrid's node values)."""
+
     # Base confidence from margin (your existing logic)
     base_conf = abs(p_baseline - 0.5) * baseline_weight
 
-    quality = compute_halftime_quality(stats_home, stats_away)
-    hqs = quality["hqs"]
-
     # Agreement between margin and stat profile
-    agreement = 1.0 if _sign(hqs) == _sign(halftime_margin) else 0.6
+    agreement = 1.0 if _sign(hqs) == _sign(halftime_margin) else params.disagreement_factor
 
     # Shooting fluke penalty
-    shooting_penalty = 0.85 if quality["shooting_extreme"] else 1.0
+    shooting_penalty = params.shooting_penalty if shooting_extreme else 1.0
 
     # Strength boost (stats can enhance confidence, not dominate)
-    strength_boost = 1.0 + min(0.75 * abs(hqs), 0.30)
+    strength_boost = 1.0 + min(params.boost_scale * abs(hqs), params.boost_cap)
 
     confidence = (
         base_conf
@@ -139,4 +280,279 @@ def compute_confidence_with_stats(
         * strength_boost
     )
 
-    return round(confidence, 4)
+    return confidence
+
+
+# ---------------------------------------------------------------------------
+# Batch (vectorized) scoring
+# ---------------------------------------------------------------------------
+# Same arithmetic, in the same order, as the scalar functions above, on
+# float64 arrays, so every element matches the scalar result bit for bit.
+# Missing stats are NaN (the scalar path's None).
+
+def stats_to_arrays(stats: Sequence[Optional[Dict]]) -> Dict[str, np.ndarray]:
+    """
+    List of per-team stat dicts (as from extract_first_half_team_stats,
+    strings like "45.5%" included) -> {field: float64 array}, parsed with
+    _safe_float. Missing / unparseable / non-finite values become NaN.
+    """
+    n = len(stats)
+    out = {}
+    for field in STAT_FIELDS:
+        values = (_safe_float((s or {}).get(field)) for s in stats)
+        out[field] = np.fromiter(
+            (np.nan if v is None else v for v in values), dtype=np.float64, count=n
+        )
+    return out
+
+
+def confidence_bucket_batch(confidence: np.ndarray, params: Optional[ConfidenceParams] = None) -> np.ndarray:
+    """Vectorized confidence_bucket -> array of "HIGH" / "MEDIUM" / "LOW"."""
+    params = params or CONFIDENCE_PARAMS
+    confidence = np.asarray(confidence, dtype=np.float64)
+    return np.where(
+        confidence >= params.high_cutoff, "HIGH",
+        np.where(confidence >= params.medium_cutoff, "MEDIUM", "LOW"),
+    )
+
+
+def baseline_confidence_batch(p_baseline: np.ndarray, baseline_weight: np.ndarray) -> np.ndarray:
+    return np.abs(np.asarray(p_baseline, dtype=np.float64) - 0.5) * np.asarray(baseline_weight, dtype=np.float64)
+
+
+def _stat_diff(h: np.ndarray, a: np.ndarray, scale: Optional[float] = None) -> np.ndarray:
+    present = ~(np.isnan(h) | np.isnan(a))
+    diff = h - a if scale is None else (h - a) / scale
+    return np.where(present, diff, 0.0)
+
+
+def hqs_terms_batch(
+    home: Mapping[str, np.ndarray],
+    away: Mapping[str, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    The scaled per-stat differences HQS is a weighted sum of, keyed like the
+    ConfidenceParams weights without the suffix (fg, fg3, to, orb, reb, ft).
+    Missing stats give 0.0, as in the scalar path.
+    """
+    col = lambda side, field: np.asarray(side[field], dtype=np.float64)
+    return {
+        "fg": _stat_diff(col(home, "fg_pct"), col(away, "fg_pct")),
+        "fg3": _stat_diff(col(home, "fg3_pct"), col(away, "fg3_pct")),
+        # Turnovers inverted: fewer TOs is better
+        "to": _stat_diff(col(away, "turnovers"), col(home, "turnovers"), 10.0),
+        "orb": _stat_diff(col(home, "off_reb"), col(away, "off_reb"), 10.0),
+        "reb": _stat_diff(col(home, "tot_reb"), col(away, "tot_reb"), 15.0),
+        "ft": _stat_diff(col(home, "ft_att"), col(away, "ft_att"), 20.0),
+    }
+
+
+HQS_TERMS = ("fg", "fg3", "to", "orb", "reb", "ft")
+
+
+def compute_halftime_quality_batch(
+    home: Mapping[str, np.ndarray],
+    away: Mapping[str, np.ndarray],
+    params: Optional[ConfidenceParams] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized compute_halftime_quality.
+
+    home / away: stat name -> array, one element per game (a dict from
+    stats_to_arrays, or a DataFrame with STAT_FIELDS columns).
+
+    Returns a dict with:
+      - hqs (float64 array)
+      - shooting_extreme (bool array)
+    """
+    params = params or CONFIDENCE_PARAMS
+    terms = hqs_terms_batch(home, away)
+
+    hqs = (
+        params.fg_weight * terms["fg"] +
+        params.fg3_weight * terms["fg3"] +
+        params.to_weight * terms["to"] +
+        params.orb_weight * terms["orb"] +
+        params.reb_weight * terms["reb"] +
+        params.ft_weight * terms["ft"]
+    )
+
+    shooting_extreme = (np.abs(terms["fg"]) > params.fg_extreme) | (np.abs(terms["fg3"]) > params.fg3_extreme)
+
+    return {
+        "hqs": hqs,
+        "shooting_extreme": shooting_extreme,
+    }
+
+
+def compute_confidence_batch(
+    p_baseline: np.ndarray,
+    baseline_weight: np.ndarray,
+    halftime_margin: np.ndarray,
+    stats_home: Mapping[str, np.ndarray],
+    stats_away: Mapping[str, np.ndarray],
+    params: Optional[ConfidenceParams] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized compute_confidence_with_stats for many games at once.
+
+    Returns {"hqs", "shooting_extreme", "confidence"}; confidence[i] equals
+    compute_confidence_with_stats(...) for game i exactly.
+    """
+    params = params or CONFIDENCE_PARAMS
+    p_baseline = np.asarray(p_baseline, dtype=np.float64)
+    baseline_weight = np.asarray(baseline_weight, dtype=np.float64)
+    halftime_margin = np.asarray(halftime_margin)
+
+    base_conf = np.abs(p_baseline - 0.5) * baseline_weight
+
+    quality = compute_halftime_quality_batch(stats_home, stats_away, params)
+    hqs = quality["hqs"]
+
+    agreement = np.where(np.sign(hqs) == np.sign(halftime_margin), 1.0, params.disagreement_factor)
+    shooting_penalty = np.where(quality["shooting_extreme"], params.shooting_penalty, 1.0)
+    strength_boost = 1.0 + np.minimum(params.boost_scale * np.abs(hqs), params.boost_cap)
+
+    confidence = (
+        base_conf
+        * agreement
+        * shooting_penalty
+        * strength_boost
+    )
+
+    # Python's round() (correctly rounded decimal), not np.round (scale and
+    # round), which can differ in the last digit
+    rounded = np.fromiter((round(c, 4) for c in confidence.tolist()), dtype=np.float64, count=len(confidence))
+
+    return {
+        "hqs": hqs,
+        "shooting_extreme": quality["shooting_extreme"],
+        "confidence": rounded,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Precomputed confidence grid
+# ---------------------------------------------------------------------------
+# confidence_from_quality tabulated over margin x HQS x shooting_extreme for
+# one baseline curve and one ConfidenceParams, stored in the baseline
+# artifact (scripts/build_confidence_grid.py). HQS nodes are 0, +-step,
+# +-2*step, ... with the step shrunk so the last node lands exactly on
+# boost_cap / boost_scale, past which the formula no longer changes with
+# |HQS| (so clipping is exact). Between nodes the formula is linear in HQS,
+# so nodes are stored unrounded and interpolation rounds once, like the
+# formula; the segment touching 0 is extrapolated from its own side, because
+# HQS == 0 itself (no stat difference at all) takes the disagreement factor.
+# Interpolated lookups match confidence_from_quality up to float error in
+# the last digit, which --verify checks; nearest-node lookups are coarser.
+
+GRID_FORMAT = "confidence-grid/v2"
+DEFAULT_HQS_STEP = 0.0025
+
+
+class ConfidenceGrid:
+    """values[extreme][margin - min_margin][k + n]: unrounded confidence at HQS = k * hqs_step."""
+
+    def __init__(self, values, min_margin: int, hqs_step: float, params: ConfidenceParams,
+                 baseline_version: str = ""):
+        self.values = [[list(map(float, row)) for row in plane] for plane in values]
+        self.min_margin = int(min_margin)
+        self.n_margins = len(self.values[0])
+        self.n = (len(self.values[0][0]) - 1) // 2
+        self.hqs_step = float(hqs_step)
+        self.hqs_max = self.n * self.hqs_step
+        self.params = params
+        self.baseline_version = baseline_version
+        self._array = np.asarray(self.values, dtype=np.float64)
+        if self.n < 2:
+            raise ValueError("confidence grid needs at least 2 HQS nodes per side")
+
+    @classmethod
+    def build(cls, p: Sequence[float], weight: Sequence[float], min_margin: int,
+              params: Optional[ConfidenceParams] = None, hqs_step: float = DEFAULT_HQS_STEP,
+              baseline_version: str = "") -> "ConfidenceGrid":
+        """
+        Tabulates confidence_from_quality for a dense per-margin curve
+        (p[i] at min_margin + i). hqs_step is an upper bound: it is shrunk so
+        a node falls exactly where the boost saturates.
+        """
+        params = params or CONFIDENCE_PARAMS
+        saturation = params.boost_cap / params.boost_scale
+        n = max(2, int(np.ceil(saturation / hqs_step - 1e-9)))
+        hqs_step = saturation / n
+        values = [
+            [
+                [
+                    _unrounded_confidence(p_m, w_m, min_margin + i, k * hqs_step, extreme, params)
+                    for k in range(-n, n + 1)
+                ]
+                for i, (p_m, w_m) in enumerate(zip(p, weight))
+            ]
+            for extreme in (False, True)
+        ]
+        return cls(values, min_margin, hqs_step, params, baseline_version)
+
+    def _row(self, halftime_margin: int, shooting_extreme: bool):
+        i = int(halftime_margin) - self.min_margin
+        i = 0 if i < 0 else (self.n_margins - 1 if i >= self.n_margins else i)
+        return self.values[1 if shooting_extreme else 0][i]
+
+    def lookup(self, halftime_margin: int, hqs: float, shooting_extreme: bool, interpolate: bool = True) -> float:
+        """hqs must be finite (callers fall back to confidence_from_quality otherwise)."""
+        row = self._row(halftime_margin, shooting_extreme)
+        n = self.n
+        if hqs == 0:
+            return round(row[n], 4)
+
+        side = 1 if hqs > 0 else -1
+        x = min(abs(hqs), self.hqs_max) / self.hqs_step
+        if not interpolate:
+            k = int(x + 0.5) or 1  # nearest node on hqs's own side
+            return round(row[n + side * k], 4)
+
+        lo = min(max(int(x), 1), n - 1)  # (0, 1) extrapolates from nodes 1-2
+        v0, v1 = row[n + side * lo], row[n + side * (lo + 1)]
+        return round(v0 + (x - lo) * (v1 - v0), 4)
+
+    def lookup_batch(self, margins, hqs, shooting_extreme, interpolate: bool = True) -> np.ndarray:
+        """Vectorized lookup (verification, what-if tables)."""
+        hqs = np.asarray(hqs, dtype=np.float64)
+        i = np.clip(np.asarray(margins, dtype=np.int64) - self.min_margin, 0, self.n_margins - 1)
+        plane = np.asarray(shooting_extreme, dtype=bool).astype(np.intp)
+        i, hqs, plane = np.broadcast_arrays(i, hqs, plane)
+
+        n = self.n
+        side = np.where(hqs > 0, 1, -1)
+        x = np.minimum(np.abs(hqs), self.hqs_max) / self.hqs_step
+        if interpolate:
+            lo = np.clip(np.floor(x).astype(np.intp), 1, n - 1)
+            v0 = self._array[plane, i, n + side * lo]
+            v1 = self._array[plane, i, n + side * (lo + 1)]
+            out = v0 + (x - lo) * (v1 - v0)
+        else:
+            k = np.maximum(np.floor(x + 0.5).astype(np.intp), 1)
+            out = self._array[plane, i, n + side * k]
+        out = np.where(hqs == 0, self._array[plane, i, n], out)
+        # Python's round(), as in the scalar lookup
+        return np.fromiter((round(c, 4) for c in out.ravel().tolist()), dtype=np.float64,
+                           count=out.size).reshape(out.shape)
+
+    def hqs_nodes(self) -> np.ndarray:
+        return np.arange(-self.n, self.n + 1) * self.hqs_step
+
+    def to_dict(self) -> Dict:
+        return {
+            "format": GRID_FORMAT,
+            "baseline_version": self.baseline_version,
+            "min_margin": self.min_margin,
+            "hqs_step": self.hqs_step,
+            "params": self.params.to_dict(),
+            "values": self.values,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "ConfidenceGrid":
+        if data.get("format") != GRID_FORMAT:
+            raise ValueError(f"unsupported confidence grid format {data.get('format')!r}")
+        return cls(data["values"], data["min_margin"], data["hqs_step"],
+                   ConfidenceParams.from_dict(data["params"]), data.get("baseline_version", ""))
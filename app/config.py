@@ -2,26 +2,90 @@
 # acts as central place for all local variables
 
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
 from dotenv import load_dotenv
 
+# before the class body: its os.getenv() defaults are evaluated at import
+load_dotenv()
+
+ESPN_SITE_API = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball"
+
+
 @dataclass(frozen=True)
 class Config:
     db_path: Path = Path("data/ncaa_mbb.db")
 
-    # Polling interval for live scoreboard
+    # Polling interval for live scoreboard (slow cadence: PRE / LIVE mid-half)
     poll_interval_seconds: int = 60
 
+    # Fast cadence while any game is in the last minutes of a half
+    poll_fast_seconds: int = 10
+    end_of_half_seconds: int = 120
+
+    # Heartbeat when nothing on the slate needs polling (all FINAL / no games,
+    # or only PRE games that tip off later)
+    poll_idle_seconds: int = 1800
+
+    # Wake this long before the next tipoff when idling
+    tipoff_lead_seconds: int = 300
+
+    # Max in-flight ESPN requests for the asyncio poller (--async)
+    max_concurrent_fetches: int = 8
+
+    # Prefetch game summaries this often for games near the end of the 1st half
+    summary_prefetch_seconds: int = 30
+
+    # Halftime/final handler pool (0 workers = run inline in the poll loop)
+    transition_workers: int = 4
+    transition_queue_size: int = 100
+
+    # Prometheus /metrics port for the poller (0 = disabled)
+    metrics_port: int = int(os.getenv("METRICS_PORT", "0"))
+
+    # Baseline curve artifact from scripts/smooth_baseline_probs.py; reloaded
+    # by the poller when the file changes (missing file = built-in buckets)
+    baseline_artifact_path: Path = Path(os.getenv("BASELINE_ARTIFACT", "data/baseline_probs.json"))
+
+    # Confidence model params from scripts/sweep_confidence_params.py, read at
+    # startup (missing file = the hand-picked defaults in confidence_model.py)
+    confidence_params_path: Path = Path(os.getenv("CONFIDENCE_PARAMS", "data/confidence_params.json"))
+
+    # Online recalibration (app/calibration.py): shift the curve's p by this
+    # season's observed gap at the same margin, shrunk toward 0 with this many
+    # pseudo-games and capped at max_shift. ONLINE_CALIBRATION=0 turns it off.
+    online_calibration: bool = os.getenv("ONLINE_CALIBRATION", "1") != "0"
+    calibration_prior_games: float = 50.0
+    calibration_max_shift: float = 0.10
+
+    # Monte Carlo second halves per halftime prediction (app/simulator.py);
+    # 0 = skip the simulation
+    simulation_sims: int = int(os.getenv("SIMULATION_SIMS", "100000"))
+
+    # Confidence grid in the baseline artifact: "off" (always evaluate the
+    # formula), "interpolate" (same values; verify with
+    # scripts/build_confidence_grid.py --verify) or "nearest" (approximate:
+    # can flip a bucket, and so an alert, at the cutoffs)
+    confidence_grid: str = os.getenv("CONFIDENCE_GRID", "off")
+
     # ESPN endpoints (public JSON)
     # Scoreboard is all we need for halftime detection + current scores.
-    espn_scoreboard_url: str = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard"
+    # ESPN_SCOREBOARD_URL / ESPN_SUMMARY_URL override them, e.g. to point the
+    # poller at scripts/espn_standin_server.py for load tests.
+    espn_scoreboard_url: str = field(
+        default_factory=lambda: os.getenv("ESPN_SCOREBOARD_URL", f"{ESPN_SITE_API}/scoreboard")
+    )
+
+    # Per-game summary (boxscore) used at halftime; the scoreboard endpoint
+    # ignores ?event= and has no boxscore.
+    espn_summary_url: str = field(
+        default_factory=lambda: os.getenv("ESPN_SUMMARY_URL", f"{ESPN_SITE_API}/summary")
+    )
 
     # Basic run settings
     # NOTE: your "season_year" here is just metadata for events.
     season_year: int = 2025  # set per run, can override via CLI later
 
-    load_dotenv()
-
 
 CONFIG = Config()
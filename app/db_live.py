@@ -3,19 +3,41 @@
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from enum import Enum
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import json
-from app.team_mapping_static import get_sports_reference_name
+from app.clock import utc_now
+from app.team_mapping_static import ESPN_TO_SPORTSREF
 
 
-@dataclass
+class GameStatus(str, Enum):
+    """
+    Normalized game status. A str subclass: compares equal to (and is stored
+    in SQLite as) the plain string, so "HALFTIME" checks and DB rows are
+    unchanged, but the scoreboard reuses four interned members.
+    """
+
+    PRE = "PRE"
+    LIVE = "LIVE"
+    HALFTIME = "HALFTIME"
+    FINAL = "FINAL"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+# small-int codes for array-backed snapshots (0 = unknown / not seen)
+STATUS_CODES: Dict[str, int] = {s: i for i, s in enumerate(GameStatus, start=1)}
+
+
+@dataclass(slots=True)
 class LiveGame:
     game_live_id: str
     date: str  # YYYY-MM-DD (local or UTC date you decide; be consistent)
     start_time_utc: Optional[str]  # ISO string
 
-    status: str  # PRE, LIVE, HALFTIME, FINAL
+    status: GameStatus  # PRE, LIVE, HALFTIME, FINAL
 
     home_name: str
     away_name: str
@@ -26,6 +48,13 @@ class LiveGame:
     home_score: Optional[int]
     away_score: Optional[int]
 
+    # live game clock (scoreboard only, not persisted); used by the poll scheduler
+    period: Optional[int] = None
+    clock_seconds: Optional[float] = None  # seconds left in the current period
+
+    # ESPN competition.neutralSite (not persisted); read by LogisticCurve
+    neutral_site: bool = False
+
 
 def connect(db_path: Path) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path)
@@ -33,6 +62,15 @@ def connect(db_path: Path) -> sqlite3.Connection:
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
 
+def enable_concurrent_writers(conn: sqlite3.Connection, busy_timeout_ms: int = 30000):
+    """
+    WAL lets the API and other poller processes (sharded mode) read while a
+    poller writes; busy_timeout makes competing writers wait instead of
+    failing with "database is locked". journal_mode persists in the DB file.
+    """
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)};")
+
 def ensure_daily_games_schema(conn: sqlite3.Connection):
     # NOTE: these tables are independent of your historical schema.
     conn.executescript(
@@ -59,55 +97,104 @@ def ensure_daily_games_schema(conn: sqlite3.Connection):
     conn.commit()
 
 
-def upsert_daily_game(conn: sqlite3.Connection, g: LiveGame):
-    conn.execute(
-        """
-        INSERT INTO daily_games (
-            game_live_id, date, start_time_utc, status,
-            home_name, away_name,
-            home_espn_team_id, away_espn_team_id,
-            home_score, away_score,
-            last_seen_utc
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(game_live_id) DO UPDATE SET
-            date = excluded.date,
-            start_time_utc = excluded.start_time_utc,
-            status = excluded.status,
-            home_name = excluded.home_name,
-            away_name = excluded.away_name,
-            home_espn_team_id = excluded.home_espn_team_id,
-            away_espn_team_id = excluded.away_espn_team_id,
-            home_score = excluded.home_score,
-            away_score = excluded.away_score,
-            last_seen_utc = excluded.last_seen_utc;
-        """,
-        (
-            g.game_live_id,
-            g.date,
-            g.start_time_utc,
-            g.status,
-            g.home_name,
-            g.away_name,
-            g.home_espn_team_id,
-            g.away_espn_team_id,
-            g.home_score,
-            g.away_score,
-            utc_now_iso(),
-        ),
+DAILY_GAME_UPSERT_SQL = """
+    INSERT INTO daily_games (
+        game_live_id, date, start_time_utc, status,
+        home_name, away_name,
+        home_espn_team_id, away_espn_team_id,
+        home_score, away_score,
+        last_seen_utc
     )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(game_live_id) DO UPDATE SET
+        date = excluded.date,
+        start_time_utc = excluded.start_time_utc,
+        status = excluded.status,
+        home_name = excluded.home_name,
+        away_name = excluded.away_name,
+        home_espn_team_id = excluded.home_espn_team_id,
+        away_espn_team_id = excluded.away_espn_team_id,
+        home_score = excluded.home_score,
+        away_score = excluded.away_score,
+        last_seen_utc = excluded.last_seen_utc;
+"""
+
+
+def _daily_game_params(g: LiveGame, now: str) -> tuple:
+    return (
+        g.game_live_id,
+        g.date,
+        g.start_time_utc,
+        g.status,
+        g.home_name,
+        g.away_name,
+        g.home_espn_team_id,
+        g.away_espn_team_id,
+        g.home_score,
+        g.away_score,
+        now,
+    )
+
 
+def upsert_daily_games(conn: sqlite3.Connection, games: List[LiveGame]):
+    """
+    Upserts the pulled games into daily_games in one executemany. Does NOT
+    commit: the poller wraps the whole cycle in one transaction.
+    """
+    now = utc_now_iso()
+    conn.executemany(DAILY_GAME_UPSERT_SQL, [_daily_game_params(g, now) for g in games])
+
+
+def load_daily_game_states(conn: sqlite3.Connection) -> Dict[str, tuple]:
+    """
+    game_live_id -> (status, home_score, away_score, start_time_utc) for every
+    row in daily_games. Used to warm the poller's in-memory state cache.
+    """
+    rows = conn.execute(
+        """
+        SELECT game_live_id, status, home_score, away_score, start_time_utc
+        FROM daily_games;
+        """
+    ).fetchall()
+    return {r[0]: (r[1], r[2], r[3], r[4]) for r in rows}
 
-def get_previous_status(conn: sqlite3.Connection, game_live_id: str) -> Optional[str]:
+
+# SQLite caps bound parameters per statement (999 on older builds)
+_IN_CHUNK = 500
+
+
+def _select_by_live_ids(conn: sqlite3.Connection, sql: str, game_live_ids: List[str]):
+    """
+    Runs `sql` (containing one `{ids}` placeholder list) over game_live_ids in chunks.
+    """
+    rows = []
+    for i in range(0, len(game_live_ids), _IN_CHUNK):
+        chunk = game_live_ids[i:i + _IN_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows.extend(conn.execute(sql.format(ids=placeholders), chunk).fetchall())
+    return rows
+
+
+def get_next_tipoff_utc(conn: sqlite3.Connection, date: str, after_utc_iso: str) -> Optional[str]:
+    """
+    Earliest start_time_utc among PRE games of `date` starting after `after_utc_iso`.
+    start_time_utc is stored as normalized UTC ISO, so string comparison is safe.
+    """
     row = conn.execute(
-        "SELECT status FROM daily_games WHERE game_live_id = ?;",
-        (game_live_id,),
+        """
+        SELECT MIN(start_time_utc)
+        FROM daily_games
+        WHERE date = ?
+          AND status = 'PRE'
+          AND start_time_utc > ?;
+        """,
+        (date, after_utc_iso),
     ).fetchone()
     return row[0] if row else None
 
 
 def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    return utc_now().isoformat()
 
 
 # def insert_prediction(
@@ -133,52 +220,68 @@ def utc_now_iso() -> str:
 #         ),
 #     )
 
-def upsert_season_game_from_live(
-    conn: sqlite3.Connection,
+SEASON_GAME_UPSERT_SQL = """
+    INSERT INTO season_games (
+        season_id, game_live_id, game_date, start_time_utc,
+        home_team_id, away_team_id,
+        status, created_at_utc, updated_at_utc
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(game_live_id) DO UPDATE SET
+        game_date = excluded.game_date,
+        start_time_utc = excluded.start_time_utc,
+        status = excluded.status,
+        updated_at_utc = excluded.updated_at_utc
+    ;
+"""
+
+
+def _season_game_params(
     season_id: int,
     g: LiveGame,
     home_team_id: Optional[int],
     away_team_id: Optional[int],
-) -> int:
+    now: str,
+) -> tuple:
+    return (
+        season_id,
+        g.game_live_id,
+        g.date,
+        g.start_time_utc,
+        home_team_id,
+        away_team_id,
+        g.status,
+        now,
+        now,
+    )
+
+
+def upsert_season_games_from_live(
+    conn: sqlite3.Connection,
+    season_id: int,
+    rows: List[Tuple[LiveGame, Optional[int], Optional[int]]],
+) -> Dict[str, int]:
     """
-    Returns season_games.game_id (PK).
+    Upserts season_games rows for (game, home_team_id, away_team_id) in one
+    executemany. Does NOT commit.
+
+    Returns game_live_id -> season_games.game_id (PK).
     """
-    now = utc_now_iso()
+    if not rows:
+        return {}
 
-    conn.execute(
-        """
-        INSERT INTO season_games (
-            season_id, game_live_id, game_date, start_time_utc,
-            home_team_id, away_team_id,
-            status, created_at_utc, updated_at_utc
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(game_live_id) DO UPDATE SET
-            game_date = excluded.game_date,
-            start_time_utc = excluded.start_time_utc,
-            status = excluded.status,
-            updated_at_utc = excluded.updated_at_utc
-        ;
-        """,
-        (
-            season_id,
-            g.game_live_id,
-            g.date,
-            g.start_time_utc,
-            home_team_id,
-            away_team_id,
-            g.status,
-            now,
-            now,
-        ),
+    now = utc_now_iso()
+    conn.executemany(
+        SEASON_GAME_UPSERT_SQL,
+        [_season_game_params(season_id, g, home, away, now) for g, home, away in rows],
     )
-    conn.commit()
 
-    row = conn.execute(
-        "SELECT game_id FROM season_games WHERE game_live_id = ?;",
-        (g.game_live_id,),
-    ).fetchone()
-    return int(row["game_id"])
+    found = _select_by_live_ids(
+        conn,
+        "SELECT game_live_id, game_id FROM season_games WHERE game_live_id IN ({ids});",
+        [g.game_live_id for g, _, _ in rows],
+    )
+    return {r[0]: int(r[1]) for r in found}
 
 
 def set_season_game_final(conn: sqlite3.Connection, game_live_id: str, home: int, away: int):
@@ -223,42 +326,102 @@ def upsert_team_alias(
         (alias_source, alias_name, team_id, source, now, now),
     )
     conn.commit()
+    TEAM_ID_CACHE.invalidate()
 
 
 def get_or_create_season_id(conn: sqlite3.Connection, season_year: int) -> int:
     row = conn.execute("SELECT season_id FROM seasons WHERE year = ?;", (season_year,)).fetchone()
     if row:
         return int(row["season_id"])
-    cur = conn.execute("INSERT INTO seasons (year) VALUES (?);", (season_year,))
+    # OR IGNORE: sharded pollers may race to create the same season
+    conn.execute("INSERT OR IGNORE INTO seasons (year) VALUES (?);", (season_year,))
     conn.commit()
 
-    lastrowid = cur.lastrowid
-    if lastrowid is None:
-        # This should never happen for a normal INSERT, so fail loudly.
-        raise RuntimeError("Expected lastrowid after INSERT into seasons, got None")
-    
-    return int(lastrowid)
+    row = conn.execute("SELECT season_id FROM seasons WHERE year = ?;", (season_year,)).fetchone()
+    if row is None:
+        # This should never happen after the INSERT, so fail loudly.
+        raise RuntimeError(f"Season {season_year} missing after INSERT into seasons")
 
-def resolve_team_id_from_espn_name(
-    conn: sqlite3.Connection,
-    espn_display_name: str,
-) -> int:
+    return int(row["season_id"])
+
+
+class TeamIdCache:
     """
-    Resolve internal team_id using ESPN displayName → sportsref_id mapping.
-    Raises if unmapped (intentional).
+    Process-wide ESPN team -> teams.team_id resolution cache for the poller.
+
+    Keyed by ESPN team id, falling back to the ESPN displayName. Resolution:
+      1) static ESPN displayName -> sportsref_id map -> teams
+      2) team_aliases (alias_source = 'espn') on displayName
+    Misses are remembered too, so an unmapped team is logged once instead
+    of every poll. Call invalidate() whenever teams / aliases change.
     """
-    sportsref_id = get_sports_reference_name(espn_display_name)
 
-    row = conn.execute(
+    def __init__(self):
+        self._by_espn_id: Dict[str, Optional[int]] = {}
+        self._by_name: Dict[str, Optional[int]] = {}
+        self._by_sportsref: Dict[str, int] = {}
+        self._by_alias: Dict[str, int] = {}
+        self._loaded = False
+
+    def preload(self, conn: sqlite3.Connection) -> None:
+        self._by_espn_id.clear()
+        self._by_name.clear()
+        self._by_sportsref = {
+            r[0]: int(r[1])
+            for r in conn.execute("SELECT sportsref_id, team_id FROM teams;").fetchall()
+        }
+        try:
+            rows = conn.execute(
+                "SELECT alias_name, team_id FROM team_aliases WHERE alias_source = 'espn';"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # team_aliases is optional (deprecated mapping path)
+            rows = []
+        self._by_alias = {r[0]: int(r[1]) for r in rows}
+        self._loaded = True
+
+    def invalidate(self) -> None:
+        self._by_espn_id.clear()
+        self._by_name.clear()
+        self._loaded = False
+
+    def resolve(
+        self,
+        conn: sqlite3.Connection,
+        espn_team_id: Optional[str],
+        espn_display_name: str,
+    ) -> Optional[int]:
         """
-        SELECT team_id
-        FROM teams
-        WHERE sportsref_id = ?;
-        """,
-        (sportsref_id,),
-    ).fetchone()
+        Returns team_id, or None if unmapped (logged on first miss only).
+        """
+        if espn_team_id is not None and espn_team_id in self._by_espn_id:
+            return self._by_espn_id[espn_team_id]
+
+        if espn_display_name in self._by_name:
+            team_id = self._by_name[espn_display_name]
+        else:
+            if not self._loaded:
+                self.preload(conn)
+            team_id = self._lookup(espn_display_name)
+            self._by_name[espn_display_name] = team_id
+
+        if espn_team_id is not None:
+            self._by_espn_id[espn_team_id] = team_id
+        return team_id
+
+    def _lookup(self, espn_display_name: str) -> Optional[int]:
+        sportsref_id = ESPN_TO_SPORTSREF.get(espn_display_name)
+        if sportsref_id is not None and sportsref_id in self._by_sportsref:
+            return self._by_sportsref[sportsref_id]
+
+        if espn_display_name in self._by_alias:
+            return self._by_alias[espn_display_name]
+
+        if sportsref_id is None:
+            print(f"[TEAM MAP MISSING] '{espn_display_name}' — add it to team_mapping_static.py")
+        else:
+            print(f"[TEAM MAP MISSING] SportsRef team not found: {sportsref_id} ({espn_display_name})")
+        return None
 
-    if not row:
-        raise RuntimeError(f"SportsRef team not found: {sportsref_id}")
 
-    return int(row["team_id"])
+TEAM_ID_CACHE = TeamIdCache()
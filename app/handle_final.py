@@ -1,8 +1,10 @@
 # app/handle_final.py
 
+import json
 import sqlite3
-from datetime import datetime, timezone
-from app.db_live import set_season_game_final
+from app.calibration import record_resolution
+from app.confidence_model import confidence_bucket as bucket_for
+from app.db_live import set_season_game_final, utc_now_iso
 
 def handle_final(conn: sqlite3.Connection, game):
     """
@@ -11,6 +13,7 @@ def handle_final(conn: sqlite3.Connection, game):
    Responsibilities:
     1. Finalize season_games (scores + status)
     2. Resolve prediction correctness
+    3. Add it to the online calibration counts (app/calibration.py)
 
     Idempotent: safe to call multiple times.
     """
@@ -36,7 +39,10 @@ def handle_final(conn: sqlite3.Connection, game):
         SELECT
             predicted_home_win_prob,
             confidence,
-            resolved_at_utc
+            confidence_bucket,
+            resolved_at_utc,
+            season_year,
+            explanation_json
         FROM predictions
         WHERE game_live_id = ?;
         """,
@@ -47,7 +53,7 @@ def handle_final(conn: sqlite3.Connection, game):
         # No halftime prediction was made
         return
 
-    predicted_prob, confidence_score, resolved_at = row
+    predicted_prob, confidence_score, confidence_bucket, resolved_at, season_year, explanation_json = row
 
     # Already resolved
     if resolved_at is not None:
@@ -66,21 +72,19 @@ def handle_final(conn: sqlite3.Connection, game):
     prediction_correct = 1 if predicted_home_win == home_win else 0
 
     # ---------------------------------------------------------
-    # 4. Confidence bucket (persisted for analytics)
+    # 4. Confidence bucket: the one the alert went out under at halftime,
+    #    not a re-bucketing with whatever cutoffs are live now; only rows
+    #    written before buckets were persisted get one here
     # ---------------------------------------------------------
-    if confidence_score >= 0.20:
-        confidence_bucket = "HIGH"
-    elif confidence_score >= 0.10:
-        confidence_bucket = "MEDIUM"
-    else:
-        confidence_bucket = "LOW"
+    if confidence_bucket is None:
+        confidence_bucket = bucket_for(confidence_score)
 
-    resolved_at_utc = datetime.now(timezone.utc).isoformat()
+    resolved_at_utc = utc_now_iso()
 
     # ---------------------------------------------------------
     # 5. Persist resolution
     # ---------------------------------------------------------
-    cursor.execute(
+    updated = cursor.execute(
         """
         UPDATE predictions
         SET
@@ -89,9 +93,9 @@ def handle_final(conn: sqlite3.Connection, game):
             final_margin = ?,
             home_win = ?,
             prediction_correct = ?,
-            confidence_bucket = ?,
+            confidence_bucket = COALESCE(confidence_bucket, ?),
             resolved_at_utc = ?
-        WHERE game_live_id = ?;
+        WHERE game_live_id = ? AND resolved_at_utc IS NULL;
         """,
         (
             final_home,
@@ -103,6 +107,30 @@ def handle_final(conn: sqlite3.Connection, game):
             resolved_at_utc,
             game_live_id,
         ),
+    ).rowcount
+
+    if not updated:
+        # resolved concurrently since the SELECT above
+        conn.commit()
+        return
+
+    # ---------------------------------------------------------
+    # 6. Online calibration (same transaction: counted once)
+    # ---------------------------------------------------------
+    try:
+        explanation = json.loads(explanation_json) if explanation_json else {}
+    except ValueError:
+        explanation = {}
+    record_resolution(
+        conn,
+        season_year=season_year,
+        baseline_version=explanation.get("baseline_version"),
+        halftime_margin=explanation.get("halftime_margin"),
+        baseline_prob=explanation.get("baseline_prob"),
+        bucket=confidence_bucket,
+        predicted_prob=predicted_prob,
+        home_win=home_win,
+        prediction_correct=prediction_correct,
     )
 
     conn.commit()
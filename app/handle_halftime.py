@@ -2,36 +2,109 @@
 
 import sqlite3
 import json
+import math
+import time
+import zlib
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
-from app.db_live import LiveGame
-from app.baseline_curve import lookup_baseline_prob
+import numpy as np
+
+from app.db_live import TEAM_ID_CACHE, LiveGame, utc_now_iso
+from app.baseline_curve import current_baseline
+from app.calibration import recalibrate
 from app.team_mapping_static import get_sports_reference_name
-from app.sources.espn import fetch_game_summary, extract_first_half_team_stats, HEADERS
-from app.confidence_model import compute_confidence_with_stats
+from app.sources.espn import refresh_game_summary, extract_first_half_team_stats, HEADERS
+from app.confidence_model import (
+    CONFIDENCE_PARAMS,
+    baseline_confidence,
+    compute_halftime_quality,
+    confidence_bucket,
+    confidence_from_quality,
+)
 from app.messaging import (
     alert_config_from_env,
     notify_if_confident,
     build_halftime_message
 )
 from app.config import CONFIG
+from app.metrics import METRICS
+from app.simulator import TEAM_RATINGS, simulate_game
+from app.tracing import TRACER
+
+SHOULD_NOTIFY_THRESHOLD = CONFIDENCE_PARAMS.medium_cutoff  # only MEDIUM+
 
-SHOULD_NOTIFY_THRESHOLD = 0.10  # only MEDIUM+
+
+def simulate_halftime(conn: sqlite3.Connection, game: LiveGame, season_id: int, shooting_extreme: bool):
+    """app.simulator summary for this game, or None if it could not run."""
+    try:
+        ratings, league_rating, league_tempo = TEAM_RATINGS.season(conn, season_id)
+        home_id = TEAM_ID_CACHE.resolve(conn, game.home_espn_team_id, game.home_name)
+        away_id = TEAM_ID_CACHE.resolve(conn, game.away_espn_team_id, game.away_name)
+        return simulate_game(
+            game.home_score,
+            game.away_score,
+            ratings.get(home_id),
+            ratings.get(away_id),
+            neutral=game.neutral_site,
+            shooting_extreme=shooting_extreme,
+            league_rating=league_rating,
+            league_tempo=league_tempo,
+            n_sims=CONFIG.simulation_sims,
+            # seeded per game: re-running (or replaying) a halftime gives the same numbers
+            rng=np.random.default_rng(zlib.crc32(str(game.game_live_id).encode("utf-8"))),
+        )
+    except Exception as e:
+        print(f"[WARN] Second-half simulation failed for {game.game_live_id}: {e}")
+        return None
 
 
-def handle_halftime(conn: sqlite3.Connection, game: LiveGame, season_year: int):
+def handle_halftime(
+    conn: sqlite3.Connection,
+    game: LiveGame,
+    season_year: int,
+    summary: Optional[dict] = None,
+    prefetched: bool = False,
+    detected_at: Optional[float] = None,
+):
     """
     Handles a game that has JUST reached halftime.
 
     Assumptions:
     - season_games row already exists (created by poller)
     - season_id already resolved in poller
+
+    If `prefetched` is True, `summary` was already fetched by the caller
+    (e.g. concurrently by the async poller) and is used as-is; None means
+    the fetch failed and the prediction falls back to baseline only.
+
+    `detected_at` (time.perf_counter() when the poller requested the
+    scoreboard that showed HALFTIME) feeds the
+    halftime_to_prediction_seconds metric.
+
+    Traced under the game's live id (app.tracing): summary_fetch,
+    confidence, simulate, prediction_insert, send_sms, end_to_end. A
+    handler that raises closes its trace with outcome "error".
     """
+    try:
+        _handle_halftime(conn, game, season_year, summary, prefetched, detected_at)
+    finally:
+        # no-op when the handler already finished the trace
+        TRACER.finish(game.game_live_id, outcome="error")
+
 
+def _handle_halftime(
+    conn: sqlite3.Connection,
+    game: LiveGame,
+    season_year: int,
+    summary: Optional[dict],
+    prefetched: bool,
+    detected_at: Optional[float],
+):
     cursor = conn.cursor()
     game_live_id = game.game_live_id
-    now_utc = datetime.now(timezone.utc).isoformat()
+    now_utc = utc_now_iso()
 
     cursor.execute(
         "SELECT season_id FROM seasons WHERE year = ?;",
@@ -73,64 +146,116 @@ def handle_halftime(conn: sqlite3.Connection, game: LiveGame, season_year: int):
         print(f"{game.away_name} @ {game.home_name}")
         print("Add mapping to team_mapping_static.py")
         print("=================================================")
+        TRACER.finish(game_live_id, outcome="team_alias_missing")
         return
 
     stats = None
-    try:    
-        summary = fetch_game_summary(
-            CONFIG.espn_scoreboard_url,
-            game.game_live_id,
-            headers=HEADERS,
-        )
-        stats = extract_first_half_team_stats(summary)
+    try:
+        if not prefetched:
+            with TRACER.span(game_live_id, "summary_fetch", source="sync"):
+                summary = refresh_game_summary(
+                    CONFIG.espn_summary_url,
+                    game.game_live_id,
+                    headers=HEADERS,
+                )
+        if summary is not None:
+            stats = extract_first_half_team_stats(summary)
     except Exception as e:
         print(f"[WARN] Could not fetch halftime stats: {e}")
 
     # Validate scores
     if game.home_score is None or game.away_score is None:
+        TRACER.finish(game_live_id, outcome="missing_scores")
         return
 
+    confidence_started = time.perf_counter()
+
     halftime_margin = game.home_score - game.away_score
 
     # Baseline probability lookup
-    baseline_prob, baseline_weight = lookup_baseline_prob(halftime_margin)
+    baseline = current_baseline()
+    baseline_prob, baseline_weight = baseline.lookup(
+        halftime_margin, neutral=game.neutral_site, season=season_year
+    )
+
+    # Online recalibration from this season's resolved games at this margin
+    p_home, calibration_shift, calibration_games = recalibrate(
+        conn, season_year, halftime_margin, baseline_prob, baseline.version
+    )
 
+    quality = None
+    confidence_from = "formula"
     if stats is not None:
-        confidence = compute_confidence_with_stats(
-            p_baseline=baseline_prob,
-            baseline_weight=baseline_weight,
-            halftime_margin=halftime_margin,
-            stats_home=stats["home"],
-            stats_away=stats["away"]
-        )
+        quality = compute_halftime_quality(stats["home"], stats["away"])
+        grid = baseline.confidence_grid
+        if (
+            grid is not None
+            and CONFIG.confidence_grid != "off"
+            and calibration_shift == 0  # the grid holds the curve's own p
+            and grid.params == CONFIDENCE_PARAMS
+            and math.isfinite(quality["hqs"])
+        ):
+            confidence = grid.lookup(
+                halftime_margin,
+                quality["hqs"],
+                quality["shooting_extreme"],
+                interpolate=CONFIG.confidence_grid == "interpolate",
+            )
+            confidence_from = "grid"
+        else:
+            confidence = confidence_from_quality(
+                p_baseline=p_home,
+                baseline_weight=baseline_weight,
+                halftime_margin=halftime_margin,
+                hqs=quality["hqs"],
+                shooting_extreme=quality["shooting_extreme"],
+            )
         source = "baseline+stats"
     else:
-        confidence = abs(baseline_prob - 0.5) * baseline_weight
+        confidence = baseline_confidence(p_home, baseline_weight)
         source = "baseline_only"
 
-    if confidence >= 0.20:
-        bucket = "HIGH"
-    elif confidence >= 0.10:
-        bucket = "MEDIUM"
-    else:
-        bucket = "LOW"
+    bucket = confidence_bucket(confidence)
 
+    TRACER.record(
+        game_live_id, "confidence", confidence_started, time.perf_counter(),
+        source=source, confidence_from=confidence_from,
+    )
+
+    # Second-half Monte Carlo: expected final margin + its spread
+    simulation = None
+    if CONFIG.simulation_sims > 0:
+        with TRACER.span(game_live_id, "simulate", sims=CONFIG.simulation_sims):
+            simulation = simulate_halftime(
+                conn, game, season_id, bool(quality and quality["shooting_extreme"])
+            )
+    predicted_final_margin = simulation["expected_margin"] if simulation else halftime_margin
 
     # create json explanation
     explanation = {
         "source": source,
         "halftime_margin": halftime_margin,
-        "baseline_prob": baseline_prob,
+        "baseline_prob": baseline_prob,  # raw curve p (calibration compares against this)
+        "baseline_version": baseline.version,
+        "calibration_shift": calibration_shift,
+        "calibration_games": calibration_games,
+        "neutral_site": game.neutral_site,
         "stats_available": stats is not None,
+        "confidence_from": confidence_from,
+        "simulation": simulation,
+        # raw first-half box score, kept so the params sweep can replay games
+        "first_half_stats": stats,
         "home_team": game.home_name,
         "away_team": game.away_name,
     }
 
+    insert_started = time.perf_counter()
     cursor.execute(
         "SELECT 1 FROM predictions WHERE game_id = ?;",
         (season_game_id,)
     )
     if cursor.fetchone():
+        TRACER.finish(game_live_id, outcome="duplicate")
         return
 
     # Insert into predictions table
@@ -155,8 +280,8 @@ def handle_halftime(conn: sqlite3.Connection, game: LiveGame, season_year: int):
             game_live_id,
             season_year,
             season_id,
-            baseline_prob,
-            halftime_margin,
+            p_home,
+            predicted_final_margin,
             confidence,
             bucket,
             now_utc,
@@ -165,6 +290,10 @@ def handle_halftime(conn: sqlite3.Connection, game: LiveGame, season_year: int):
     )
 
     conn.commit()
+    TRACER.record(game_live_id, "prediction_insert", insert_started, time.perf_counter())
+
+    if detected_at is not None:
+        METRICS.observe("halftime_to_prediction_seconds", time.perf_counter() - detected_at)
 
 
     # Notify if confident
@@ -173,20 +302,22 @@ def handle_halftime(conn: sqlite3.Connection, game: LiveGame, season_year: int):
         home_name=game.home_name,
         away_score=game.away_score,
         home_score=game.home_score,
-        p_home=baseline_prob,
+        p_home=p_home,
         confidence_score=confidence,
         confidence_bucket=bucket,
         extra={"halftime_margin": halftime_margin},
     )
 
-    notify_if_confident(
+    notified = notify_if_confident(
         conn=conn,
         alert_cfg=alert_config_from_env(),
         confidence_score=confidence,
-        threshold=0.10,
+        threshold=SHOULD_NOTIFY_THRESHOLD,
         message=msg,
         metadata={
             "game_id": game_live_id,
             "season_year": season_year,
         },
+        trace_id=game_live_id,
     )
+    TRACER.finish(game_live_id, outcome="predicted", bucket=bucket, notified=notified)
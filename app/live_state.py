@@ -0,0 +1,199 @@
+# app/live_state.py
+
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.db_live import STATUS_CODES, GameStatus, LiveGame, load_daily_game_states
+
+
+# (status, home_score, away_score, start_time_utc)
+GameState = Tuple[str, Optional[int], Optional[int], Optional[str]]
+
+# stand-in for a missing score in the int32 columns
+NO_SCORE = -1
+
+_STATUS_BY_CODE = {code: status for status, code in STATUS_CODES.items()}
+
+
+def game_state(g: LiveGame) -> GameState:
+    return (g.status, g.home_score, g.away_score, g.start_time_utc)
+
+
+def start_key(start_time_utc: Optional[str]) -> int:
+    # start times only need an equality check; hash() of the ISO string does
+    return hash(start_time_utc) if start_time_utc is not None else 0
+
+
+class ScoreboardSnapshot:
+    """
+    Struct-of-arrays view of one scoreboard pull: the fields that decide
+    whether a game needs a DB write, one numpy column each, row i = games[i].
+    """
+
+    __slots__ = ("ids", "status", "home_score", "away_score", "start_key")
+
+    def __init__(self, ids: List[str], status, home_score, away_score, start_key):
+        self.ids = ids
+        self.status = status
+        self.home_score = home_score
+        self.away_score = away_score
+        self.start_key = start_key
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_states(cls, ids: List[str], states: List[GameState]) -> "ScoreboardSnapshot":
+        n = len(ids)
+        return cls(
+            ids=list(ids),
+            status=np.fromiter((STATUS_CODES.get(s[0], 0) for s in states), dtype=np.int8, count=n),
+            home_score=np.fromiter(
+                (NO_SCORE if s[1] is None else s[1] for s in states), dtype=np.int32, count=n
+            ),
+            away_score=np.fromiter(
+                (NO_SCORE if s[2] is None else s[2] for s in states), dtype=np.int32, count=n
+            ),
+            start_key=np.fromiter((start_key(s[3]) for s in states), dtype=np.int64, count=n),
+        )
+
+    @classmethod
+    def from_games(cls, games: List[LiveGame]) -> "ScoreboardSnapshot":
+        return cls.from_states([g.game_live_id for g in games], [game_state(g) for g in games])
+
+    @classmethod
+    def from_columns(cls, ids: List[str], status: List[int], home_score: List[int],
+                     away_score: List[int], start_key: List[int]) -> "ScoreboardSnapshot":
+        """Columns as plain lists, already encoded (status codes, NO_SCORE, start keys)."""
+        return cls(
+            ids=ids,
+            status=np.array(status, dtype=np.int8),
+            home_score=np.array(home_score, dtype=np.int32),
+            away_score=np.array(away_score, dtype=np.int32),
+            start_key=np.array(start_key, dtype=np.int64),
+        )
+
+    def take(self, indices) -> "ScoreboardSnapshot":
+        indices = np.asarray(indices, dtype=np.intp)
+        return ScoreboardSnapshot(
+            ids=[self.ids[i] for i in indices],
+            status=self.status[indices],
+            home_score=self.home_score[indices],
+            away_score=self.away_score[indices],
+            start_key=self.start_key[indices],
+        )
+
+
+class Scoreboard(list):
+    """
+    List of LiveGame that also carries its ScoreboardSnapshot, filled by
+    parse_scoreboard in the same pass. Filter with subset() to keep the two
+    aligned; plain list operations return plain lists.
+    """
+
+    def __init__(self, games: List[LiveGame], snapshot: ScoreboardSnapshot):
+        super().__init__(games)
+        self.snapshot = snapshot
+
+    def subset(self, indices) -> "Scoreboard":
+        return Scoreboard([self[i] for i in indices], self.snapshot.take(indices))
+
+
+def snapshot_of(games: List[LiveGame]) -> ScoreboardSnapshot:
+    if isinstance(games, Scoreboard):
+        return games.snapshot
+    return ScoreboardSnapshot.from_games(games)
+
+
+class ScoreboardStateCache:
+    """
+    In-memory copy of each game's last persisted state, kept as a
+    ScoreboardSnapshot plus a game_live_id -> row index.
+
+    Lets the poller skip every DB write for games that did not change since
+    the previous poll without reading daily_games back each cycle.
+    changed() is one vectorized compare of the new pull against the rows
+    it gathers from the cache. The cache only advances after a cycle's
+    transaction commits, so a failed write is retried on the next poll.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._rows = ScoreboardSnapshot.from_states([], [])
+        # row lookup for the last full pull; the slate rarely changes between polls
+        self._last_ids: Optional[List[str]] = None
+        self._last_rows: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def warm(self, conn: sqlite3.Connection) -> None:
+        states = load_daily_game_states(conn)
+        ids = list(states)
+        self._rows = ScoreboardSnapshot.from_states(ids, [states[i] for i in ids])
+        self._index = {game_live_id: row for row, game_live_id in enumerate(ids)}
+        self._last_ids = None
+
+    def previous_status(self, game_live_id: str) -> Optional[GameStatus]:
+        row = self._index.get(game_live_id)
+        if row is None:
+            return None
+        return _STATUS_BY_CODE.get(int(self._rows.status[row]))
+
+    def _gather(self, ids: List[str]) -> np.ndarray:
+        return np.fromiter((self._index.get(i, -1) for i in ids), dtype=np.intp, count=len(ids))
+
+    def diff(self, snapshot: ScoreboardSnapshot) -> np.ndarray:
+        """Boolean mask over `snapshot`: True where the game is new or changed."""
+        if snapshot.ids == self._last_ids:
+            rows = self._last_rows
+        else:
+            rows = self._gather(snapshot.ids)
+            self._last_ids, self._last_rows = snapshot.ids, rows
+        known = rows >= 0
+        prev = np.where(known, rows, 0)
+        if len(self._rows) == 0:
+            return ~known
+
+        same = (
+            known
+            & (self._rows.status[prev] == snapshot.status)
+            & (self._rows.home_score[prev] == snapshot.home_score)
+            & (self._rows.away_score[prev] == snapshot.away_score)
+            & (self._rows.start_key[prev] == snapshot.start_key)
+        )
+        return ~same
+
+    def changed(self, games: List[LiveGame]) -> Scoreboard:
+        snapshot = snapshot_of(games)
+        indices = np.flatnonzero(self.diff(snapshot))
+        return Scoreboard([games[i] for i in indices], snapshot.take(indices))
+
+    def update(self, games: List[LiveGame]) -> None:
+        if not games:
+            return
+        snapshot = snapshot_of(games)
+        rows = self._gather(snapshot.ids)
+
+        new = np.flatnonzero(rows < 0)
+        if len(new):
+            # rows cached for the last pull may point at -1 for these
+            self._last_ids = None
+            start = len(self._rows)
+            for offset, i in enumerate(new):
+                self._index[snapshot.ids[i]] = start + offset
+            self._rows = ScoreboardSnapshot(
+                ids=self._rows.ids + [snapshot.ids[i] for i in new],
+                status=np.concatenate([self._rows.status, snapshot.status[new]]),
+                home_score=np.concatenate([self._rows.home_score, snapshot.home_score[new]]),
+                away_score=np.concatenate([self._rows.away_score, snapshot.away_score[new]]),
+                start_key=np.concatenate([self._rows.start_key, snapshot.start_key[new]]),
+            )
+            rows[new] = np.arange(start, start + len(new))
+
+        self._rows.status[rows] = snapshot.status
+        self._rows.home_score[rows] = snapshot.home_score
+        self._rows.away_score[rows] = snapshot.away_score
+        self._rows.start_key[rows] = snapshot.start_key
@@ -8,6 +8,8 @@ from typing import Optional, Dict, Any, List
 
 from twilio.rest import Client
 
+from app.tracing import TRACER
+
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -25,12 +27,13 @@ class AlertConfig:
 def alert_config_from_env() -> AlertConfig:
     """
     Load SMS alert configuration from environment variables.
+    SMS_DISABLED=1 forces SMS off (used by replays / load tests).
     """
     sid = os.getenv("TWILIO_ACCOUNT_SID")
     token = os.getenv("TWILIO_AUTH_TOKEN")
     from_number = os.getenv("TWILIO_FROM_NUMBER")
 
-    sms_enabled = all([sid, token, from_number])
+    sms_enabled = all([sid, token, from_number]) and not os.getenv("SMS_DISABLED")
 
     return AlertConfig(
         sms_enabled=sms_enabled,
@@ -131,10 +134,13 @@ def notify_if_confident(
     threshold: float,
     message: str,
     metadata: Optional[Dict[str, Any]] = None,
+    trace_id: Optional[str] = None,
 ) -> bool:
     """
     Send SMS alerts if confidence threshold is met.
     Returns True if a notification attempt was made.
+
+    Each send_sms call is traced as a `send_sms` span under `trace_id`.
     """
     if confidence_score < threshold:
         return False
@@ -149,16 +155,20 @@ def notify_if_confident(
     recipients = load_sms_recipients(conn, confidence_score)
 
     for phone in recipients:
-        try:
-            send_sms(
-                account_sid=alert_cfg.twilio_account_sid,
-                auth_token=alert_cfg.twilio_auth_token,
-                from_number=alert_cfg.twilio_from_number,
-                to_number=phone,
-                body=message,
-            )
-        except Exception as e:
-            print(f"[SMS ERROR] {phone}: {e}")
+        # last 4 digits only; traces are not a subscriber list
+        with TRACER.span(trace_id, "send_sms", to=phone[-4:]) as span:
+            try:
+                send_sms(
+                    account_sid=alert_cfg.twilio_account_sid,
+                    auth_token=alert_cfg.twilio_auth_token,
+                    from_number=alert_cfg.twilio_from_number,
+                    to_number=phone,
+                    body=message,
+                )
+                span["ok"] = True
+            except Exception as e:
+                span["ok"] = False
+                print(f"[SMS ERROR] {phone}: {e}")
 
     return True
 
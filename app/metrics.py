@@ -0,0 +1,191 @@
+# app/metrics.py
+# In-process metrics for the live poller (thread-safe, no external deps).
+#
+# Exposed in Prometheus text format by serve_metrics() (poller --metrics-port):
+#   curl localhost:9108/metrics
+
+import threading
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+
+# Histogram upper bounds (Prometheus `le`), seconds and per-cycle counts
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+QUANTILES = (0.50, 0.95, 0.99)
+
+
+class RollingWindow:
+    """
+    Keeps the most recent `size` observations of one metric.
+    Percentiles are computed over that window only.
+    """
+
+    def __init__(self, size: int = 1000):
+        self._values = deque(maxlen=size)
+        self.count = 0  # lifetime observations
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self._values.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[idx]
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "max": max(self._values) if self._values else None,
+        }
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (lifetime counts, as Prometheus expects; the
+    server side computes windows with rate()). Pairs with a RollingWindow
+    for the recent-percentile view.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative(self):
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            yield bound, running
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows: Dict[str, RollingWindow] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, float] = {}
+        self._counters: Dict[str, float] = {}
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None) -> None:
+        """
+        Records one observation. `buckets` only matters on the first call for
+        a name (default LATENCY_BUCKETS; use COUNT_BUCKETS for per-cycle counts).
+        """
+        with self._lock:
+            window = self._windows.get(name)
+            if window is None:
+                window = self._windows[name] = RollingWindow()
+                self._histograms[name] = Histogram(buckets or LATENCY_BUCKETS)
+            window.observe(value)
+            self._histograms[name].observe(value)
+
+    def inc(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "gauges": dict(self._gauges),
+                "counters": dict(self._counters),
+                "latencies": {name: w.summary() for name, w in self._windows.items()},
+            }
+
+    def render_prometheus(self, prefix: str = "ncaa_poller") -> str:
+        """
+        Prometheus text exposition format (0.0.4).
+
+        Each observed metric is written twice: `<name>` as a histogram and
+        `<name>_recent` as a summary over the rolling window.
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                full = f"{prefix}_{name}"
+                lines.append(f"# TYPE {full} counter")
+                lines.append(f"{full} {_fmt(self._counters[name])}")
+
+            for name in sorted(self._gauges):
+                full = f"{prefix}_{name}"
+                lines.append(f"# TYPE {full} gauge")
+                lines.append(f"{full} {_fmt(self._gauges[name])}")
+
+            for name in sorted(self._histograms):
+                hist = self._histograms[name]
+                full = f"{prefix}_{name}"
+                lines.append(f"# TYPE {full} histogram")
+                for bound, running in hist.cumulative():
+                    lines.append(f'{full}_bucket{{le="{_fmt(bound)}"}} {running}')
+                lines.append(f"{full}_sum {_fmt(hist.total)}")
+                lines.append(f"{full}_count {hist.count}")
+
+                window = self._windows[name]
+                recent = f"{full}_recent"
+                lines.append(f"# TYPE {recent} summary")
+                for q in QUANTILES:
+                    value = window.percentile(q)
+                    if value is not None:
+                        lines.append(f'{recent}{{quantile="{q}"}} {_fmt(value)}')
+                lines.append(f"{recent}_sum {_fmt(window.total)}")
+                lines.append(f"{recent}_count {window.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0", registry: MetricsRegistry = METRICS) -> ThreadingHTTPServer:
+    """
+    Serves GET /metrics from a daemon thread. The poller and the FastAPI app
+    are separate processes, so the poller exposes its own registry here.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every 15s would drown the poller log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[METRICS] Serving Prometheus metrics on http://{host}:{server.server_port}/metrics")
+    return server
@@ -1,23 +1,51 @@
 # app/poller.py
 
 import argparse
+import asyncio
+import os
+import sys
 import time
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional, Tuple
 
+import aiohttp
+
+from app.baseline_curve import BASELINE, BUILTIN_CURVE
+from app.calibration import ensure_calibration_schema
+from app.clock import SimulatedClock, get_clock, set_clock
 from app.config import CONFIG
 from app.db_live import (
+    TEAM_ID_CACHE,
+    GameStatus,
+    LiveGame,
     connect,
+    enable_concurrent_writers,
     ensure_daily_games_schema,
-    get_previous_status,
-    upsert_daily_game,
-    upsert_season_game_from_live,
+    get_next_tipoff_utc,
+    upsert_daily_games,
+    upsert_season_games_from_live,
     get_or_create_season_id,
-    resolve_team_id_from_espn_name
 )
 from app.handle_halftime import handle_halftime
 from app.handle_final import handle_final
-from app.sources.espn import fetch_scoreboard
+from app.live_state import ScoreboardStateCache
+from app.metrics import COUNT_BUCKETS, METRICS, serve_metrics
+from app.sharding import ShardSpec, run_shards
+from app.tracing import TRACER
+from app.workers import TransitionWorkerPool
+from app.sources.espn import (
+    HEADERS,
+    SUMMARY_CACHE,
+    get_client,
+    prefetch_game_summary,
+    fetch_scoreboard,
+    fetch_scoreboard_async,
+    fetch_game_summary_async,
+    set_client,
+)
+from app.sources.recorder import PayloadRecorder, ReplayFinished, ReplaySource
 
 from zoneinfo import ZoneInfo
 from datetime import timedelta
@@ -29,13 +57,43 @@ def parse_args():
     p = argparse.ArgumentParser(description="Live poller: ESPN scoreboard -> daily_games -> halftime trigger")
     p.add_argument("--db", type=str, default=str(CONFIG.db_path))
     p.add_argument("--season", type=int, required=True, help="Season year metadata for halftime_events (e.g. 2025)")
-    p.add_argument("--interval", type=int, default=CONFIG.poll_interval_seconds)
+    p.add_argument("--interval", type=int, default=CONFIG.poll_interval_seconds,
+                   help="Slow poll cadence (PRE / LIVE mid-half)")
+    p.add_argument("--fast-interval", type=int, default=CONFIG.poll_fast_seconds,
+                   help="Poll cadence while any game is in the last minutes of a half")
+    p.add_argument("--idle-interval", type=int, default=CONFIG.poll_idle_seconds,
+                   help="Heartbeat when no game on the slate needs polling")
+    p.add_argument("--fixed-interval", action="store_true",
+                   help="Disable the adaptive scheduler and always sleep --interval")
     p.add_argument("--date", type=str, default=None, help="YYYYMMDD (defaults to today)")
+    p.add_argument("--async", dest="use_async", action="store_true",
+                   help="Use the asyncio poller (concurrent scoreboard + halftime summary fetches)")
+    p.add_argument("--max-concurrency", type=int, default=CONFIG.max_concurrent_fetches,
+                   help="Max in-flight ESPN requests in --async mode")
+    p.add_argument("--workers", type=int, default=CONFIG.transition_workers,
+                   help="Worker threads for halftime/final handling (0 = run inline in the poll loop)")
+    p.add_argument("--record", type=str, default=None, metavar="DIR",
+                   help="Archive every raw scoreboard/summary payload to DIR/espn-<UTC>.jsonl.gz")
+    p.add_argument("--replay", type=str, nargs="+", default=None, metavar="ARCHIVE",
+                   help="Replay recorded archives instead of calling ESPN (SMS is disabled)")
+    p.add_argument("--replay-speed", type=float, default=1.0,
+                   help="Replay speed multiplier (0 = as fast as possible)")
+    p.add_argument("--simulate-start", type=str, default=None, metavar="UTC_ISO",
+                   help="Run on a simulated clock starting at this UTC time (no real sleeping)")
+    p.add_argument("--metrics-port", type=int, default=CONFIG.metrics_port,
+                   help="Serve Prometheus metrics on this port at /metrics (0 = off)")
+    p.add_argument("--trace", type=str, default=None, metavar="FILE",
+                   help="Append halftime alert latency spans to FILE (JSONL)")
+    p.add_argument("--shards", type=int, default=1,
+                   help="Run N poller processes, each owning a hash slice of the slate "
+                        "(splits parsing, DB and handler work; every shard still downloads the scoreboard)")
+    p.add_argument("--shard-index", type=int, default=0, help=argparse.SUPPRESS)
+    p.add_argument("--shard-count", type=int, default=1, help=argparse.SUPPRESS)
     return p.parse_args()
 
 
 def current_sports_day_et():
-    now_utc = datetime.now(tz=ZoneInfo("UTC"))
+    now_utc = get_clock().now()
     return sports_day_et(now_utc)
 
 
@@ -54,35 +112,360 @@ def sports_day_et(now_utc: datetime) -> str:
     return sports_day.isoformat()
 
 
+@dataclass
+class PollScheduler:
+    """
+    Picks the next poll delay from the game states of the last scoreboard.
+
+    Every game gets its own cadence:
+      - LIVE with <= end_of_half_seconds left in a period -> fast
+        (halftime / final is about to happen)
+      - LIVE mid-half, HALFTIME, PRE close to tipoff       -> slow
+      - PRE tipping off later than tipoff_lead_seconds     -> never
+      - FINAL                                              -> never
+    One scoreboard request covers every game, so the loop sleeps for the
+    shortest cadence on the slate. When nothing needs polling it idles until
+    shortly before the next tipoff, with an idle_seconds heartbeat so
+    schedule changes are still picked up.
+    """
+    fast_seconds: float
+    slow_seconds: float
+    idle_seconds: float
+    end_of_half_seconds: float = CONFIG.end_of_half_seconds
+    tipoff_lead_seconds: float = CONFIG.tipoff_lead_seconds
+    adaptive: bool = True
+
+    def game_interval(self, g: LiveGame, now_utc: Optional[datetime] = None) -> Optional[float]:
+        if g.status == GameStatus.FINAL:
+            return None
+
+        if g.status == GameStatus.PRE and now_utc is not None:
+            start = _parse_utc(g.start_time_utc)
+            if start is not None and (start - now_utc).total_seconds() > self.tipoff_lead_seconds:
+                return None
+
+        if (
+            g.status == GameStatus.LIVE
+            and g.period is not None
+            and g.clock_seconds is not None
+            and g.clock_seconds <= self.end_of_half_seconds
+        ):
+            return self.fast_seconds
+
+        return self.slow_seconds
+
+    def next_delay(
+        self,
+        games: List[LiveGame],
+        now_utc: Optional[datetime] = None,
+        next_tipoff_utc: Optional[datetime] = None,
+    ) -> float:
+        if not self.adaptive:
+            return self.slow_seconds
+
+        intervals = [i for i in (self.game_interval(g, now_utc) for g in games) if i is not None]
+        if intervals:
+            return min(intervals)
+
+        # Nothing in play: sleep until shortly before the next tipoff (heartbeat-capped)
+        delay = self.idle_seconds
+        if now_utc is not None and next_tipoff_utc is not None:
+            until_tipoff = (next_tipoff_utc - now_utc).total_seconds() - self.tipoff_lead_seconds
+            delay = min(delay, max(until_tipoff, self.fast_seconds))
+
+        if now_utc is not None:
+            # never sleep through the 5am ET sports-day rollover
+            delay = min(delay, max(seconds_until_rollover(now_utc), self.fast_seconds))
+
+        return delay
+
+
+def _parse_utc(iso: Optional[str]) -> Optional[datetime]:
+    if not iso:
+        return None
+    try:
+        return datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def seconds_until_rollover(now_utc: datetime) -> float:
+    now_et = now_utc.astimezone(ET)
+    rollover = now_et.replace(hour=5, minute=0, second=0, microsecond=0)
+    if now_et >= rollover:
+        rollover += timedelta(days=1)
+    return (rollover - now_et).total_seconds()
+
+
+def next_poll_delay(conn, scheduler: PollScheduler, games: List[LiveGame], sports_day: str) -> float:
+    now_utc = get_clock().now()
+    next_tipoff = _parse_utc(
+        get_next_tipoff_utc(conn, sports_day, now_utc.replace(microsecond=0).isoformat())
+    )
+
+    delay = scheduler.next_delay(games, now_utc, next_tipoff)
+    if delay > scheduler.slow_seconds:
+        tipoff = next_tipoff.isoformat() if next_tipoff else "none scheduled"
+        print(f"[IDLE] Nothing in play, next tipoff {tipoff} — sleeping {delay:.0f}s")
+    return delay
+
+
+def scheduler_from_args(args) -> PollScheduler:
+    return PollScheduler(
+        fast_seconds=args.fast_interval,
+        slow_seconds=args.interval,
+        idle_seconds=args.idle_interval,
+        adaptive=not args.fixed_interval,
+    )
+
+
+def prune_daily_games(conn):
+    now_utc = get_clock().now()
+
+    sports_today = sports_day_et(now_utc)
+    sports_yesterday = (datetime.fromisoformat(sports_today) - timedelta(days=1)).isoformat()
+
+    # filters daily_games to only include today and yesterday basketball games
+    conn.execute(
+        """
+        DELETE FROM daily_games
+        WHERE date NOT IN (?, ?);
+        """,
+        (sports_today, sports_yesterday)
+    )
+    conn.commit()
+
+
+def apply_scoreboard(
+    conn,
+    games: List[LiveGame],
+    season_id: int,
+    sports_day: str,
+    state: ScoreboardStateCache,
+) -> Tuple[List[LiveGame], List[LiveGame]]:
+    """
+    Writes one scoreboard pull to daily_games / season_games in a single
+    transaction (one commit per cycle instead of two per game).
+
+    Only games whose status, score or start time changed since the last
+    poll (per `state`) reach the DB. Games skipped for an unmapped team stay
+    "changed", so once the alias exists (and TEAM_ID_CACHE is invalidated)
+    they get their season_games row and halftime detection.
+
+    Returns (halftimes, finals): games that just transitioned into
+    HALFTIME / FINAL this cycle. The caller runs the handlers after the
+    batch is committed.
+
+    Records db_write_seconds, cycle_games_changed and
+    cycle_halftimes_detected in METRICS.
+    """
+    halftimes: List[LiveGame] = []
+    finals: List[LiveGame] = []
+    season_rows = []
+
+    for g in games:
+        # Fill date partition
+        g.date = sports_day
+
+    changed = state.changed(games)
+    METRICS.observe("cycle_games_changed", len(changed), buckets=COUNT_BUCKETS)
+    if not changed:
+        METRICS.observe("cycle_halftimes_detected", 0, buckets=COUNT_BUCKETS)
+        return halftimes, finals
+
+    written = []  # indices into `changed` that get a season_games row
+    for i, g in enumerate(changed):
+        # cached; unmapped teams are logged once by the cache
+        home_team_id = TEAM_ID_CACHE.resolve(conn, g.home_espn_team_id, g.home_name)
+        away_team_id = TEAM_ID_CACHE.resolve(conn, g.away_espn_team_id, g.away_name)
+        if home_team_id is None or away_team_id is None:
+            continue
+
+        season_rows.append((g, home_team_id, away_team_id))
+        written.append(i)
+
+        prev_status = state.previous_status(g.game_live_id)
+
+        # Transition logic
+        if g.status == GameStatus.HALFTIME and prev_status != GameStatus.HALFTIME:
+
+            if g.home_score is None or g.away_score is None:
+                print(f"[HALFTIME] Missing scores, skipping: {g.away_name} @ {g.home_name} ({g.game_live_id})")
+                continue
+
+            halftimes.append(g)
+
+        if g.status == GameStatus.FINAL and prev_status != GameStatus.FINAL:
+            finals.append(g)
+
+    started = time.perf_counter()
+    with conn:
+        upsert_daily_games(conn, changed)
+        upsert_season_games_from_live(conn, season_id, season_rows)
+    METRICS.observe("db_write_seconds", time.perf_counter() - started)
+
+    state.update(changed.subset(written))
+
+    METRICS.observe("cycle_halftimes_detected", len(halftimes), buckets=COUNT_BUCKETS)
+    METRICS.inc("halftimes_detected_total", len(halftimes))
+    METRICS.inc("finals_detected_total", len(finals))
+
+    return halftimes, finals
+
+
+def make_worker_pool(args, db_path: Path) -> Optional[TransitionWorkerPool]:
+    if args.workers <= 0:
+        return None
+    return TransitionWorkerPool(db_path, workers=args.workers, max_queue=CONFIG.transition_queue_size)
+
+
+def trace_detected(halftimes: List[LiveGame], cycle_started: float) -> None:
+    """
+    Opens a trace per new halftime, anchored at the scoreboard request that
+    first showed it (`detect` span: fetch + parse + DB write).
+    """
+    detected = time.perf_counter()
+    for g in halftimes:
+        TRACER.begin(g.game_live_id, cycle_started)
+        TRACER.record(g.game_live_id, "detect", cycle_started, detected)
+
+
+def dispatch_halftime(conn, pool: Optional[TransitionWorkerPool], g: LiveGame, season_year: int, **kwargs):
+    if pool is None:
+        handle_halftime(conn, g, season_year, **kwargs)
+    else:
+        pool.submit(g.game_live_id, "halftime", handle_halftime, g, season_year, **kwargs)
+
+
+def dispatch_final(conn, pool: Optional[TransitionWorkerPool], g: LiveGame):
+    if pool is None:
+        handle_final(conn, g)
+    else:
+        pool.submit(g.game_live_id, "final", handle_final, g)
+
+
+def prefetch_candidates(games: List[LiveGame]) -> List[LiveGame]:
+    """
+    Games in the last minutes of the first half whose summary should be
+    (re)warmed now. Claims them in SUMMARY_CACHE, so each is returned at most
+    once per CONFIG.summary_prefetch_seconds.
+    """
+    return [
+        g for g in games
+        if g.status == GameStatus.LIVE
+        and g.period == 1
+        and g.clock_seconds is not None
+        and g.clock_seconds <= CONFIG.end_of_half_seconds
+        and SUMMARY_CACHE.claim(g.game_live_id, CONFIG.summary_prefetch_seconds)
+    ]
+
+
+def _prefetch_task(_conn, event_id: str):
+    prefetch_game_summary(CONFIG.espn_summary_url, event_id, headers=HEADERS)
+
+
+def dispatch_prefetch(pool: Optional[TransitionWorkerPool], games: List[LiveGame]):
+    for g in prefetch_candidates(games):
+        if pool is None:
+            _prefetch_task(None, g.game_live_id)
+        else:
+            pool.submit(g.game_live_id, "prefetch", _prefetch_task, g.game_live_id)
+
+
+def setup_source(args):
+    """
+    Wires --record / --replay / --simulate-start / --trace into the shared
+    ESPN client, the process clock and the tracer. Returns this process's
+    ShardSpec (per-shard archive / trace names when sharded).
+    """
+    if args.simulate_start:
+        set_clock(SimulatedClock(datetime.fromisoformat(args.simulate_start.replace("Z", "+00:00"))))
+        print(f"[SIMULATED CLOCK] starting at {get_clock().now().isoformat()}")
+
+    if args.replay:
+        if args.use_async or args.record:
+            raise SystemExit("--replay cannot be combined with --async or --record")
+
+        source = ReplaySource([Path(p) for p in args.replay], speed=args.replay_speed)
+        set_client(source)
+        set_clock(source.clock)
+        # never text subscribers from a replay
+        os.environ["SMS_DISABLED"] = "1"
+        # handlers run inline: a worker thread would fetch its summary while
+        # this thread advances the shared clock, so the payload it gets (or
+        # ReplayFinished) would depend on thread timing
+        if args.workers > 0:
+            print(f"[REPLAY] --workers {args.workers} ignored; handlers run inline for a deterministic replay")
+            args.workers = 0
+        print(f"[REPLAY] {source.start.isoformat()} → {source.end.isoformat()} at speed {args.replay_speed}")
+
+    shard = ShardSpec(args.shard_index, args.shard_count)
+
+    if args.record:
+        recorder = PayloadRecorder(Path(args.record), tag=shard.label if shard.sharded else None)
+        get_client().recorder = recorder
+        print(f"[RECORD] Writing ESPN payloads to {recorder.path}")
+
+    if args.trace:
+        TRACER.open(shard.path(args.trace))
+        print(f"[TRACE] Writing halftime alert spans to {TRACER.path}")
+
+    return shard
+
+
+def open_db(db_path: Path, shard: ShardSpec):
+    if BASELINE.load() is BUILTIN_CURVE:
+        print(f"[BASELINE] No artifact at {BASELINE.path}; using built-in buckets")
+
+    conn = connect(db_path)
+    enable_concurrent_writers(conn)
+    ensure_daily_games_schema(conn)
+    ensure_calibration_schema(conn)
+    if shard.is_primary:
+        prune_daily_games(conn)
+    return conn
+
+
 def main():
     args = parse_args()
+
+    if args.shards > 1:
+        if args.replay:
+            raise SystemExit("--replay cannot be combined with --shards")
+        sys.exit(run_shards(args.shards, sys.argv[1:]))
+
+    shard = setup_source(args)
+
+    if args.use_async:
+        asyncio.run(run_async(args, shard))
+        return
+
     db_path = Path(args.db)
 
     sports_day = args.date or current_sports_day_et()
     date_param = sports_day.replace("-", "")
 
-    now_utc = datetime.now(tz=ZoneInfo("UTC"))
-
-    sports_today = sports_day_et(now_utc)
-    sports_yesterday = (datetime.fromisoformat(sports_today) - timedelta(days=1)).isoformat()
+    scheduler = scheduler_from_args(args)
+    state = ScoreboardStateCache()
 
-    conn = connect(db_path)
+    conn = open_db(db_path, shard)
     season_id = get_or_create_season_id(conn, args.season)
+    pool = make_worker_pool(args, db_path)
+    if args.metrics_port:
+        serve_metrics(shard.port(args.metrics_port))
+
+    # cycle cost bookkeeping (reported at exit on a simulated clock)
+    cycles = 0
+    busy_seconds = 0.0
+    clock_started = get_clock().now()
     try:
-        ensure_daily_games_schema(conn)
-
-        # filters daily_games to only include today and yesterday basketball games
-        conn.execute(
-            """
-            DELETE FROM daily_games
-            WHERE date NOT IN (?, ?);
-            """,
-            (sports_today, sports_yesterday)
-        )
-        conn.commit()
+        state.warm(conn)
+        TEAM_ID_CACHE.preload(conn)
 
         print(f"Using DB: {db_path.resolve()}")
-        print(f"Polling ESPN for date={date_param} every {args.interval}s (season={args.season})")
+        print(f"Polling ESPN for date={date_param} every {args.fast_interval}-{args.interval}s (season={args.season})")
+        if shard.sharded:
+            print(f"[SHARD] {shard.index + 1}/{shard.count}: owning crc32(game_live_id) % {shard.count} == {shard.index}")
 
         while True:
 
@@ -92,53 +475,243 @@ def main():
                 date_param = sports_day.replace("-", "")
                 print(f"[INFO] Sports day rolled over → {sports_day}")
 
+            cycle_started = time.perf_counter()
             try:
-                games = fetch_scoreboard(CONFIG.espn_scoreboard_url, date_param)
+                games = fetch_scoreboard(CONFIG.espn_scoreboard_url, date_param, owns=shard.event_filter)
+            except ReplayFinished as e:
+                print(f"[REPLAY] {e}")
+                break
             except Exception as e:
                 print(f"[poller] fetch failed: {e}")
-                time.sleep(args.interval)
+                METRICS.inc("scoreboard_fetch_errors_total")
+                get_clock().sleep(args.interval)
                 continue
 
-            for g in games:
+            halftimes, finals = apply_scoreboard(conn, games, season_id, sports_day, state)
+            trace_detected(halftimes, cycle_started)
+
+            for g in halftimes:
+                # latency is measured from the scoreboard request that first showed HALFTIME
+                dispatch_halftime(conn, pool, g, args.season, detected_at=cycle_started)
+
+            for g in finals:
+                dispatch_final(conn, pool, g)
+
+            dispatch_prefetch(pool, games)
+
+            if pool is not None:
+                pool.log_backlog()
+
+            cycles += 1
+            busy_seconds += time.perf_counter() - cycle_started
+            METRICS.inc("poll_cycles_total")
+            METRICS.observe("cycle_seconds", time.perf_counter() - cycle_started)
+
+            get_clock().sleep(next_poll_delay(conn, scheduler, games, sports_day))
+
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        conn.close()
+        if get_client().recorder is not None:
+            get_client().recorder.close()
+        TRACER.close()
+        if isinstance(get_clock(), SimulatedClock) and cycles:
+            simulated_hours = (get_clock().now() - clock_started).total_seconds() / 3600
+            print(
+                f"[SIMULATED CLOCK] {cycles} cycles over {simulated_hours:.1f}h simulated, "
+                f"avg cycle {busy_seconds / cycles * 1000:.1f} ms, total busy {busy_seconds:.2f}s"
+            )
+
+
+# ---------------------------------------------------------------------------
+# asyncio poller
+# ---------------------------------------------------------------------------
+
+def _run_with_connection(db_path: Path, fn, *args, **kwargs):
+    """
+    fn(conn, *args, **kwargs) on a connection of its own, for handlers run
+    through asyncio.to_thread without a worker pool (sqlite3 connections
+    stay on the thread that opened them).
+    """
+    conn = connect(db_path)
+    # writes alongside the poll loop's connection
+    conn.execute("PRAGMA busy_timeout = 30000;")
+    try:
+        return fn(conn, *args, **kwargs)
+    finally:
+        conn.close()
+
+
+async def _halftime_task(session, sem, db_path: Path, pool, g: LiveGame, season_year: int, detected_at: float):
+    """
+    Fetches the game summary (bounded by `sem`) and runs / enqueues the
+    halftime handler. Runs alongside the poll loop, so N simultaneous
+    halftimes cost roughly one summary round trip instead of N. Without a
+    pool the handler (DB insert, simulation, SMS fan-out) runs in a thread,
+    never on the event loop.
+    """
+    summary = None
+    async with sem:
+        try:
+            with TRACER.span(g.game_live_id, "summary_fetch", source="async"):
+                summary = await fetch_game_summary_async(
+                    session,
+                    CONFIG.espn_summary_url,
+                    g.game_live_id,
+                    headers=HEADERS,
+                )
+        except Exception as e:
+            # fall back to the copy prefetched near the end of the half
+            summary = SUMMARY_CACHE.get(g.game_live_id)
+            if summary is None:
+                print(f"[WARN] Could not fetch halftime stats: {e}")
+            else:
+                print(f"[WARN] Halftime summary refresh failed ({e}); using prefetched copy")
+    SUMMARY_CACHE.discard(g.game_live_id)
+
+    try:
+        if pool is None:
+            await asyncio.to_thread(
+                _run_with_connection, db_path, handle_halftime, g, season_year,
+                summary=summary, prefetched=True, detected_at=detected_at,
+            )
+        else:
+            # submit() may block on a full queue; keep the event loop free
+            await asyncio.to_thread(
+                dispatch_halftime, None, pool, g, season_year,
+                summary=summary, prefetched=True, detected_at=detected_at,
+            )
+    except Exception as e:
+        print(f"[HALFTIME] handler failed for {g.game_live_id}: {e}")
+
+
+async def _final_task(db_path: Path, pool, g: LiveGame, halftime: Optional[asyncio.Task] = None):
+    """
+    Runs / enqueues the final handler, after the game's own halftime task if
+    one is still pending (a FINAL must never resolve ahead of its halftime
+    prediction). Chained as its own task, so a slow summary fetch holds back
+    this game only, not the poll cycle.
+    """
+    if halftime is not None:
+        await asyncio.gather(halftime, return_exceptions=True)
+    try:
+        if pool is None:
+            await asyncio.to_thread(_run_with_connection, db_path, handle_final, g)
+        else:
+            await asyncio.to_thread(dispatch_final, None, pool, g)
+    except Exception as e:
+        print(f"[FINAL] handler failed for {g.game_live_id}: {e}")
+
+
+async def _prefetch_task_async(session, sem, event_id: str):
+    async with sem:
+        try:
+            summary = await fetch_game_summary_async(
+                session,
+                CONFIG.espn_summary_url,
+                event_id,
+                headers=HEADERS,
+            )
+        except Exception as e:
+            SUMMARY_CACHE.release(event_id)
+            print(f"[PREFETCH] summary {event_id} failed: {e}")
+            return
+    SUMMARY_CACHE.put(event_id, summary)
+
+
+async def run_async(args, shard: ShardSpec):
+    db_path = Path(args.db)
+
+    sports_day = args.date or current_sports_day_et()
+    date_param = sports_day.replace("-", "")
+
+    conn = open_db(db_path, shard)
+    season_id = get_or_create_season_id(conn, args.season)
+
+    scheduler = scheduler_from_args(args)
+    state = ScoreboardStateCache()
+    pool = make_worker_pool(args, db_path)
+    if args.metrics_port:
+        serve_metrics(shard.port(args.metrics_port))
+    sem = asyncio.Semaphore(max(1, args.max_concurrency))
+    pending = {}  # game_live_id -> asyncio.Task
+    resolving = set()
+    prefetching = set()
+
+    connector = aiohttp.TCPConnector(limit=max(1, args.max_concurrency))
+    try:
+        state.warm(conn)
+        TEAM_ID_CACHE.preload(conn)
+
+        print(f"Using DB: {db_path.resolve()}")
+        print(
+            f"Polling ESPN (async, max {args.max_concurrency} in flight) for date={date_param} "
+            f"every {args.fast_interval}-{args.interval}s (season={args.season})"
+        )
+        if shard.sharded:
+            print(f"[SHARD] {shard.index + 1}/{shard.count}: owning crc32(game_live_id) % {shard.count} == {shard.index}")
 
-                # Fill date partition
-                g.date = sports_day
+        async with aiohttp.ClientSession(connector=connector) as session:
+            while True:
 
-                prev_status = get_previous_status(conn, g.game_live_id)
-                upsert_daily_game(conn, g)
-                conn.commit()
+                new_sports_day = current_sports_day_et()
+                if new_sports_day != sports_day:
+                    sports_day = new_sports_day
+                    date_param = sports_day.replace("-", "")
+                    print(f"[INFO] Sports day rolled over → {sports_day}")
 
+                cycle_started = time.perf_counter()
                 try:
-                    home_team_id = resolve_team_id_from_espn_name(conn, g.home_name)
-                    away_team_id = resolve_team_id_from_espn_name(conn, g.away_name)
-                except KeyError as e:
-                    print(f"[TEAM MAP MISSING] {e} — skipping game {g.game_live_id}")
+                    async with sem:
+                        games = await fetch_scoreboard_async(
+                            session, CONFIG.espn_scoreboard_url, date_param, owns=shard.event_filter
+                        )
+                except Exception as e:
+                    print(f"[poller] fetch failed: {e}")
+                    METRICS.inc("scoreboard_fetch_errors_total")
+                    await get_clock().sleep_async(args.interval)
                     continue
 
-                game_pk = upsert_season_game_from_live (
-                    conn=conn,
-                    season_id=season_id,
-                    g=g,
-                    home_team_id=home_team_id,
-                    away_team_id=away_team_id
-                )
+                halftimes, finals = apply_scoreboard(conn, games, season_id, sports_day, state)
+                trace_detected(halftimes, cycle_started)
+
+                for g in halftimes:
+                    if g.game_live_id in pending:
+                        continue
+                    task = asyncio.create_task(
+                        _halftime_task(session, sem, db_path, pool, g, args.season, detected_at=cycle_started)
+                    )
+                    pending[g.game_live_id] = task
+                    task.add_done_callback(lambda _t, gid=g.game_live_id: pending.pop(gid, None))
+
+                for g in finals:
+                    task = asyncio.create_task(_final_task(db_path, pool, g, pending.get(g.game_live_id)))
+                    resolving.add(task)
+                    task.add_done_callback(resolving.discard)
 
-                # Transition logic
-                if g.status == "HALFTIME" and prev_status != "HALFTIME":
-        
-                    if g.home_score is None or g.away_score is None:
-                        print(f"[HALFTIME] Missing scores, skipping: {g.away_name} @ {g.home_name} ({g.game_live_id})")
-                        continue    
+                for g in prefetch_candidates(games):
+                    task = asyncio.create_task(_prefetch_task_async(session, sem, g.game_live_id))
+                    prefetching.add(task)
+                    task.add_done_callback(prefetching.discard)
 
-                    handle_halftime(conn, g, args.season)
+                if pool is not None:
+                    pool.log_backlog()
 
-                if g.status == "FINAL" and prev_status != "FINAL":
-                    handle_final(conn, g)
+                METRICS.inc("poll_cycles_total")
+                METRICS.observe("cycle_seconds", time.perf_counter() - cycle_started)
 
-            time.sleep(args.interval)
+                await get_clock().sleep_async(next_poll_delay(conn, scheduler, games, sports_day))
 
     finally:
+        for task in list(pending.values()) + list(resolving) + list(prefetching):
+            task.cancel()
+        if pool is not None:
+            pool.shutdown()
         conn.close()
+        if get_client().recorder is not None:
+            get_client().recorder.close()
+        TRACER.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+# app/sharding.py
+#
+# Splits the live slate across N poller processes sharing one SQLite DB.
+#
+#   python -m app.poller --season 2025 --shards 4
+#
+# starts 4 children (`--shard-index i --shard-count 4`). Every child fetches
+# the same scoreboard and parses only the events whose
+# crc32(game_live_id) % count == index, so each game's daily_games /
+# season_games rows, halftime prediction and final resolution are written by
+# exactly one process.
+#
+# What this splits is parsing, DB writes and halftime / final handling.
+# Network is not split: each child still downloads the full scoreboard every
+# cycle, so N shards make N times the scoreboard requests to ESPN (a live
+# scoreboard changes between polls, so conditional GETs rarely get a 304).
+# Per-game summary requests are split, since only the owner fetches them.
+
+import os
+import signal
+import subprocess
+import sys
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    index: int = 0
+    count: int = 1
+
+    def __post_init__(self):
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError(f"invalid shard {self.index}/{self.count}")
+
+    @property
+    def sharded(self) -> bool:
+        return self.count > 1
+
+    @property
+    def is_primary(self) -> bool:
+        """Shard 0 does the slate-wide housekeeping (pruning daily_games)."""
+        return self.index == 0
+
+    @property
+    def label(self) -> str:
+        return f"shard{self.index}of{self.count}"
+
+    def owns(self, game_live_id: str) -> bool:
+        # crc32, not hash(): must agree across processes
+        return zlib.crc32(str(game_live_id).encode("utf-8")) % self.count == self.index
+
+    @property
+    def event_filter(self) -> Optional[Callable[[str], bool]]:
+        """parse_scoreboard's `owns`: None (parse everything) when not sharded."""
+        return self.owns if self.sharded else None
+
+    def port(self, base_port: int) -> int:
+        """Per-shard port (base + index) so every child can serve /metrics."""
+        return base_port + self.index if base_port else 0
+
+    def path(self, path: Optional[str]) -> Optional[Path]:
+        """Per-shard file (trace.jsonl -> trace.shard1of4.jsonl)."""
+        if path is None:
+            return None
+        path = Path(path)
+        if not self.sharded:
+            return path
+        return path.with_name(f"{path.stem}.{self.label}{path.suffix}")
+
+
+def _strip_arg(argv: Sequence[str], name: str) -> List[str]:
+    out: List[str] = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg == name:
+            skip = True
+            continue
+        if arg.startswith(name + "="):
+            continue
+        out.append(arg)
+    return out
+
+
+def run_shards(count: int, argv: Sequence[str]) -> int:
+    """
+    Runs `count` copies of the poller (same arguments minus --shards) and
+    waits for all of them. Ctrl-C / SIGTERM is forwarded to every child.
+    Returns the first non-zero exit code, else 0.
+    """
+    base = _strip_arg(argv, "--shards")
+    children = []
+    for i in range(count):
+        cmd = [sys.executable, "-m", "app.poller", *base, "--shard-index", str(i), "--shard-count", str(count)]
+        children.append(subprocess.Popen(cmd, env=os.environ.copy()))
+    print(f"[SHARDS] Started {count} pollers: {[c.pid for c in children]}")
+
+    def _forward(signum, _frame):
+        for c in children:
+            if c.poll() is None:
+                c.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, _forward)
+
+    codes = []
+    try:
+        for c in children:
+            codes.append(c.wait())
+    except KeyboardInterrupt:
+        # a terminal Ctrl-C already reached the whole process group; children
+        # that did not get it (kill -INT <launcher>) are stopped here
+        codes = []
+        for c in children:
+            try:
+                codes.append(c.wait(timeout=10))
+            except subprocess.TimeoutExpired:
+                c.terminate()
+                codes.append(c.wait())
+
+    return next((code for code in codes if code), 0)
@@ -0,0 +1,236 @@
+# app/simulator.py
+#
+# Monte Carlo second half.
+#
+# For each game, n simulated second halves from the halftime score:
+#
+#   possessions  ~ Normal(poss, POSSESSION_SD)
+#   PPP edge     ~ Normal(ppp_home - ppp_away, sqrt(2) * EFFICIENCY_SD)
+#   2nd-half margin = possessions * edge + noise, noise sd
+#                     POINTS_SD_PER_POSSESSION * sqrt(2 * possessions)
+#
+# rounded to whole points (a tie after 40 minutes counts as half a win:
+# overtime is a coin flip). Only the margin is simulated, so each half
+# costs three normal draws; 100k halves for one game take a few ms.
+#
+# Expected possessions and points per possession come from
+# team_season_stats (tempo, offensive / defensive rating, KenPom-style
+# multiplicative matchup, home edge unless neutral) blended with the first
+# half: the pace implied by the halftime score, and each side's share of
+# it. The first-half weight (pace and scoring split alike) is halved when
+# extract_first_half_team_stats shows hot shooting (compute_halftime_quality's
+# shooting_extreme), since that part of the lead tends not to last; with no
+# first-half points there is nothing to blend and the priors stand. Missing
+# ratings fall back to the season's league average.
+#
+# Everything is a NumPy array over games, so the live path (one game) and
+# backtests (every game in halftime_state) share the same code.
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# league-wide fallbacks when a season has no team_season_stats
+LEAGUE_RATING = 104.0   # points per 100 possessions
+LEAGUE_TEMPO = 68.0     # possessions per 40 minutes
+
+HOME_EDGE_PER_100 = 1.5          # home +1.5 / away -1.5 points per 100 possessions
+POSSESSION_SD = 3.0              # second-half possessions, per game
+EFFICIENCY_SD = 0.08             # per-team PPP uncertainty for this game
+POINTS_SD_PER_POSSESSION = 1.0   # points scored on one possession
+FIRST_HALF_WEIGHT = 0.25         # weight of first-half pace / scoring split
+
+QUANTILES = (0.05, 0.25, 0.50, 0.75, 0.95)
+
+# simulated cells (games x sims) per chunk; bounds memory in bulk runs
+CHUNK_CELLS = 1_000_000
+
+
+@dataclass(frozen=True)
+class TeamRatings:
+    offensive_rating: float
+    defensive_rating: float
+    tempo: float
+
+
+class TeamRatingsCache:
+    """
+    team_season_stats for a season, loaded once (a few hundred rows), plus
+    the season's league averages. Thread-safe; call invalidate() after the
+    table is refreshed.
+    """
+
+    def __init__(self):
+        self._seasons: Dict[int, Tuple[Dict[int, TeamRatings], float, float]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._seasons.clear()
+
+    def season(self, conn: sqlite3.Connection, season_id: int) -> Tuple[Dict[int, TeamRatings], float, float]:
+        """-> ({team_id: TeamRatings}, league rating, league tempo)."""
+        cached = self._seasons.get(season_id)
+        if cached is not None:
+            return cached
+
+        try:
+            rows = conn.execute(
+                """
+                SELECT team_id, offensive_rating, defensive_rating, tempo
+                FROM team_season_stats
+                WHERE season_id = ?
+                  AND offensive_rating IS NOT NULL
+                  AND defensive_rating IS NOT NULL
+                  AND tempo IS NOT NULL;
+                """,
+                (season_id,),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+
+        ratings = {int(r[0]): TeamRatings(float(r[1]), float(r[2]), float(r[3])) for r in rows}
+        if ratings:
+            league_rating = float(np.mean([r.offensive_rating for r in ratings.values()]))
+            league_tempo = float(np.mean([r.tempo for r in ratings.values()]))
+        else:
+            league_rating, league_tempo = LEAGUE_RATING, LEAGUE_TEMPO
+
+        entry = (ratings, league_rating, league_tempo)
+        with self._lock:
+            self._seasons[season_id] = entry
+        return entry
+
+
+TEAM_RATINGS = TeamRatingsCache()
+
+
+def second_half_inputs(
+    home_pts,
+    away_pts,
+    home_ortg,
+    home_drtg,
+    home_tempo,
+    away_ortg,
+    away_drtg,
+    away_tempo,
+    neutral,
+    shooting_extreme,
+    league_rating=LEAGUE_RATING,
+    league_tempo=LEAGUE_TEMPO,
+):
+    """
+    Per-game arrays (NaN rating = unknown team) -> (expected second-half
+    possessions, home PPP, away PPP).
+    """
+    f = lambda x: np.asarray(x, dtype=np.float64)
+    league_rating, league_tempo = f(league_rating), f(league_tempo)
+    fill = lambda x, default: np.where(np.isnan(f(x)), default, f(x))
+
+    h_o, h_d, h_t = fill(home_ortg, league_rating), fill(home_drtg, league_rating), fill(home_tempo, league_tempo)
+    a_o, a_d, a_t = fill(away_ortg, league_rating), fill(away_drtg, league_rating), fill(away_tempo, league_tempo)
+
+    edge = np.where(np.asarray(neutral, dtype=bool), 0.0, HOME_EDGE_PER_100)
+    ppp_home = (h_o * a_d / league_rating + edge) / 100.0
+    ppp_away = (a_o * h_d / league_rating - edge) / 100.0
+    poss_prior = h_t * a_t / league_tempo / 2.0
+
+    # first half: pace implied by the score, and each side's share of it
+    # (no first-half points: nothing to blend, keep the priors)
+    home_pts, away_pts = f(home_pts), f(away_pts)
+    pace_first = (home_pts + away_pts) / (ppp_home + ppp_away)
+    w = FIRST_HALF_WEIGHT * np.where(np.asarray(shooting_extreme, dtype=bool), 0.5, 1.0)
+    scored = pace_first > 0
+    possessions = np.where(scored, (1.0 - w) * poss_prior + w * pace_first, poss_prior)
+
+    safe_pace = np.where(scored, pace_first, 1.0)
+    ppp_home = np.where(scored, (1.0 - w) * ppp_home + w * home_pts / safe_pace, ppp_home)
+    ppp_away = np.where(scored, (1.0 - w) * ppp_away + w * away_pts / safe_pace, ppp_away)
+    return possessions, ppp_home, ppp_away
+
+
+def simulate_second_half(
+    halftime_margin,
+    possessions,
+    ppp_home,
+    ppp_away,
+    n_sims: int = 100_000,
+    rng: Optional[np.random.Generator] = None,
+    quantiles=QUANTILES,
+) -> Dict[str, np.ndarray]:
+    """
+    Per-game arrays -> {"p_home_win", "expected_margin", "quantiles"}
+    (quantiles: games x len(quantiles) final home margins).
+    """
+    rng = rng or np.random.default_rng()
+    f = lambda x: np.atleast_1d(np.asarray(x, dtype=np.float64))
+    margin, poss, ppp_h, ppp_a = np.broadcast_arrays(f(halftime_margin), f(possessions), f(ppp_home), f(ppp_away))
+    games = len(margin)
+
+    p_home_win = np.empty(games)
+    expected = np.empty(games)
+    qs = np.empty((games, len(quantiles)))
+
+    step = max(1, CHUNK_CELLS // n_sims)
+    for lo in range(0, games, step):
+        hi = min(games, lo + step)
+        g = hi - lo
+
+        # float32 draws: half the cost, far more precision than the model has
+        draw = lambda: rng.standard_normal((g, n_sims), dtype=np.float32)
+        sim_poss = np.maximum(poss[lo:hi, None].astype(np.float32) + POSSESSION_SD * draw(), 0.0)
+        edge = (ppp_h[lo:hi] - ppp_a[lo:hi]).astype(np.float32)[:, None] + np.float32(np.sqrt(2.0) * EFFICIENCY_SD) * draw()
+        noise = POINTS_SD_PER_POSSESSION * np.sqrt(2.0 * sim_poss) * draw()
+        final = np.rint(margin[lo:hi, None].astype(np.float32) + sim_poss * edge + noise).astype(np.int64)
+
+        # final margins are integers: one histogram per game gives p, mean
+        # and quantiles without sorting
+        low = int(final.min())
+        width = int(final.max()) - low + 1
+        counts = np.bincount(
+            (final - low + width * np.arange(g)[:, None]).ravel(), minlength=g * width
+        ).reshape(g, width)
+        values = np.arange(low, low + width)
+
+        p_home_win[lo:hi] = (counts[:, values > 0].sum(axis=1) + 0.5 * counts[:, values == 0].sum(axis=1)) / n_sims
+        expected[lo:hi] = counts @ values / n_sims
+        cdf = np.cumsum(counts, axis=1)
+        for j, q in enumerate(quantiles):
+            # smallest margin with at least q of the sims at or below it
+            qs[lo:hi, j] = values[np.argmax(cdf >= q * n_sims, axis=1)]
+
+    return {"p_home_win": p_home_win, "expected_margin": expected, "quantiles": qs}
+
+
+def simulate_game(
+    home_pts: int,
+    away_pts: int,
+    home: Optional[TeamRatings],
+    away: Optional[TeamRatings],
+    neutral: bool = False,
+    shooting_extreme: bool = False,
+    league_rating: float = LEAGUE_RATING,
+    league_tempo: float = LEAGUE_TEMPO,
+    n_sims: int = 100_000,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict:
+    """One live game -> JSON-ready summary for explanation_json."""
+    nan = float("nan")
+    possessions, ppp_home, ppp_away = second_half_inputs(
+        home_pts, away_pts,
+        home.offensive_rating if home else nan, home.defensive_rating if home else nan, home.tempo if home else nan,
+        away.offensive_rating if away else nan, away.defensive_rating if away else nan, away.tempo if away else nan,
+        neutral, shooting_extreme, league_rating, league_tempo,
+    )
+    out = simulate_second_half(home_pts - away_pts, possessions, ppp_home, ppp_away, n_sims, rng)
+    return {
+        "p_home_win": round(float(out["p_home_win"][0]), 4),
+        "expected_margin": round(float(out["expected_margin"][0]), 2),
+        "quantiles": {f"p{int(q * 100):02d}": float(v) for q, v in zip(QUANTILES, out["quantiles"][0])},
+        "possessions": round(float(possessions), 1),
+        "sims": n_sims,
+        "ratings": {"home": home is not None, "away": away is not None},
+    }
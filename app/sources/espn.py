@@ -1,10 +1,21 @@
 # app/sources/espn.py
 
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+import aiohttp
 import requests
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 
-from app.db_live import LiveGame
+from app.clock import get_clock
+from app.db_live import STATUS_CODES, GameStatus, LiveGame
+from app.live_state import NO_SCORE, Scoreboard, ScoreboardSnapshot, start_key
+from app.metrics import METRICS
 
 
 HEADERS = {
@@ -12,6 +23,153 @@ HEADERS = {
 }
 
 
+# JSON decoding: orjson / ujson when installed (optional, not in
+# requirements.txt), stdlib json otherwise. All take bytes or str.
+JSON_DECODERS = {"json": json.loads}
+try:
+    import ujson
+    JSON_DECODERS["ujson"] = ujson.loads
+except ImportError:
+    pass
+try:
+    import orjson
+    JSON_DECODERS["orjson"] = orjson.loads
+except ImportError:
+    pass
+
+JSON_BACKEND = next(name for name in ("orjson", "ujson", "json") if name in JSON_DECODERS)
+decode_json = JSON_DECODERS[JSON_BACKEND]
+
+
+class EspnClient:
+    """
+    Shared ESPN HTTP client used by the poller and the halftime handler.
+
+    - One requests.Session with a keep-alive connection pool, so polls reuse
+      TLS connections instead of handshaking every request.
+    - Accept-Encoding advertises every codec urllib3 can decode here
+      (gzip/deflate, plus br/zstd when brotli/zstandard are installed).
+    - Conditional GETs: the last ETag / Last-Modified per (url, params) is
+      sent back as If-None-Match / If-Modified-Since. A 304 returns the
+      cached payload without downloading or decoding JSON again. Only the
+      `max_validators` most recently used (url, params) keep theirs: a
+      season's worth of per-game summaries would otherwise stay in memory.
+
+    Thread-safe: the worker pool fetches summaries concurrently.
+
+    If `recorder` is set (see app.sources.recorder), every payload returned
+    is also written to its archive.
+    """
+
+    def __init__(self, pool_size: int = 10, max_validators: int = 64):
+        self.recorder = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(HEADERS)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        self.max_validators = max_validators
+        self._lock = threading.Lock()
+        # (url, params) -> (etag, last_modified, payload), least recently used first
+        self._validators: "OrderedDict[Tuple, Tuple[Optional[str], Optional[str], dict]]" = OrderedDict()
+
+    def conditional_headers(self, key: Tuple) -> dict:
+        with self._lock:
+            cached = self._validators.get(key)
+            if cached is not None:
+                self._validators.move_to_end(key)
+        if cached is None:
+            return {}
+
+        etag, last_modified, _ = cached
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def cached_payload(self, key: Tuple) -> Optional[dict]:
+        with self._lock:
+            cached = self._validators.get(key)
+        return cached[2] if cached else None
+
+    def remember(self, key: Tuple, response_headers, payload: dict) -> None:
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._validators[key] = (etag, last_modified, payload)
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+
+    def get_json(
+        self,
+        url: str,
+        params: dict,
+        timeout: float,
+        headers: Optional[dict] = None,
+        kind: str = "raw",
+    ) -> dict:
+        key = _cache_key(url, params)
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(key))
+
+        resp = self.session.get(url, params=params, headers=request_headers, timeout=timeout)
+        payload = None
+        if resp.status_code == 304:
+            payload = self.cached_payload(key)
+            if payload is None:
+                # validators dropped between send and receive; refetch unconditionally
+                resp = self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+        if payload is None:
+            resp.raise_for_status()
+            payload = decode_json(resp.content)
+            self.remember(key, resp.headers, payload)
+
+        if self.recorder is not None:
+            self.recorder.record(kind, params, payload)
+        return payload
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _cache_key(url: str, params: dict) -> Tuple:
+    return (url, tuple(sorted(params.items())))
+
+
+_default_client: Optional[EspnClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> EspnClient:
+    """
+    Process-wide EspnClient (created on first use).
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = EspnClient()
+        return _default_client
+
+
+def set_client(client) -> None:
+    """
+    Replace the process-wide client, e.g. with a ReplaySource for offline runs.
+    Anything with EspnClient's get_json() signature works.
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
 def _safe_int(x) -> Optional[int]:
     try:
         return int(x)
@@ -19,7 +177,7 @@ def _safe_int(x) -> Optional[int]:
         return None
 
 
-def _status_from_competition(status_obj: dict) -> str:
+def _status_from_competition(status_obj: dict) -> GameStatus:
     """
     ESPN status object is nested. We'll map to: PRE, LIVE, HALFTIME, FINAL
     """
@@ -34,64 +192,141 @@ def _status_from_competition(status_obj: dict) -> str:
     detail = (t.get("detail") or "").upper()
 
     if completed or state == "POST":
-        return "FINAL"
+        return GameStatus.FINAL
 
     if "HALFTIME" in name or "HALFTIME" in short or "HALFTIME" in detail:
-        return "HALFTIME"
+        return GameStatus.HALFTIME
 
     if state == "PRE":
-        return "PRE"
+        return GameStatus.PRE
 
     # IN covers "in progress"
-    return "LIVE"
+    return GameStatus.LIVE
+
+
+@lru_cache(maxsize=2048)
+def _start_time_utc(date_iso: Optional[str]) -> Optional[str]:
+    """
+    ESPN event date -> normalized UTC ISO (seconds). Cached: a slate has a
+    few dozen distinct tipoff times, re-sent on every poll.
+    """
+    if not date_iso:
+        return None
+    # keep as ISO; ESPN provides timezone offset
+    try:
+        return datetime.fromisoformat(date_iso.replace("Z", "+00:00")).astimezone(timezone.utc).replace(microsecond=0).isoformat()
+    except Exception:
+        return date_iso
+
+
+def _scoreboard_params(date_yyyymmdd: str) -> dict:
+    return {"dates": date_yyyymmdd, "groups": "50", "limit": "500"}
+
+
+def _clock_from_competition(status_obj: dict):
+    """
+    Returns (period, seconds left in period). Either may be None
+    (e.g. PRE games, or payloads missing the clock).
+    """
+    status_obj = status_obj or {}
+    period = _safe_int(status_obj.get("period"))
+
+    clock = status_obj.get("clock")
+    try:
+        clock_seconds = float(clock) if clock is not None else None
+    except (TypeError, ValueError):
+        clock_seconds = None
+
+    if clock_seconds is None:
+        # fall back to "M:SS" display clock
+        display = status_obj.get("displayClock") or ""
+        try:
+            mins, secs = display.split(":")
+            clock_seconds = int(mins) * 60 + float(secs)
+        except ValueError:
+            clock_seconds = None
+
+    return period, clock_seconds
 
 
 # beginning of the day, handles fething all games being played for that day
-def fetch_scoreboard(scoreboard_url: str, date_yyyymmdd: str) -> List[LiveGame]:
+def fetch_scoreboard(
+    scoreboard_url: str,
+    date_yyyymmdd: str,
+    client: Optional[EspnClient] = None,
+    owns: Optional[Callable[[str], bool]] = None,
+) -> List[LiveGame]:
     """
     date_yyyymmdd: e.g. 20241222
+    owns: only parse events whose id it accepts (a shard's ShardSpec.owns)
     """
-    resp = requests.get(
+    started = time.perf_counter()
+    data = (client or get_client()).get_json(
         scoreboard_url,
-        params={"dates": date_yyyymmdd, "groups": "50", "limit": "500"},
-        headers=HEADERS,
+        params=_scoreboard_params(date_yyyymmdd),
         timeout=30,
+        kind="scoreboard",
     )
-    resp.raise_for_status()
-    data = resp.json()
+    METRICS.observe("scoreboard_fetch_seconds", time.perf_counter() - started)
+    return _timed_parse_scoreboard(data, owns)
+
+
+def _timed_parse_scoreboard(data: dict, owns: Optional[Callable[[str], bool]] = None) -> Scoreboard:
+    started = time.perf_counter()
+    games = parse_scoreboard(data, owns)
+    METRICS.observe("scoreboard_parse_seconds", time.perf_counter() - started)
+    return games
+
 
+def parse_scoreboard(data: dict, owns: Optional[Callable[[str], bool]] = None) -> Scoreboard:
+    """
+    Turns a raw ESPN scoreboard payload into LiveGame rows.
+    Shared by the blocking and asyncio fetch paths. With `owns`, events whose
+    id it rejects are skipped before any other field is read.
+
+    Fills the change-detection columns (ScoreboardSnapshot) in the same
+    pass, so the poller's state cache diffs arrays instead of objects.
+    """
     events = data.get("events") or []
     games: List[LiveGame] = []
-
+    ids: List[str] = []
+    codes: List[int] = []
+    home_scores: List[int] = []
+    away_scores: List[int] = []
+    start_keys: List[int] = []
+
+    # one walk per event, reading only the fields LiveGame needs; the
+    # order of checks matches the original per-field helpers
     for e in events:
-        game_id = str(e.get("id"))
-        date_iso = e.get("date")  # ISO datetime
-
-        start_time_utc = None
-        if date_iso:
-            # keep as ISO; ESPN provides timezone offset
-            try:
-                start_time_utc = datetime.fromisoformat(date_iso.replace("Z", "+00:00")).astimezone(timezone.utc).replace(microsecond=0).isoformat()
-            except Exception:
-                start_time_utc = date_iso
+        if owns is not None and not owns(str(e.get("id"))):
+            continue
 
         competitions = e.get("competitions") or []
         if not competitions:
             continue
 
         comp = competitions[0]
-        status = _status_from_competition(comp.get("status") or {})
-
         competitors = comp.get("competitors") or []
         if len(competitors) != 2:
             continue
 
+        game_id = str(e.get("id"))
+        start_time_utc = _start_time_utc(e.get("date"))  # ISO datetime
+
+        status_obj = comp.get("status") or {}
+        status = _status_from_competition(status_obj)
+        period, clock_seconds = _clock_from_competition(status_obj)
+
         # ESPN gives "home"/"away" keys
-        home = next((c for c in competitors if c.get("homeAway") == "home"), None)
-        away = next((c for c in competitors if c.get("homeAway") == "away"), None)
-        if not home or not away:
+        first, second = competitors
+        side = first.get("homeAway")
+        if side == "home" and second.get("homeAway") == "away":
+            home, away = first, second
+        elif side == "away" and second.get("homeAway") == "home":
+            away, home = first, second
+        else:
             # fallback to order
-            away, home = competitors[0], competitors[1]
+            away, home = first, second
 
         home_team = home.get("team") or {}
         away_team = away.get("team") or {}
@@ -119,22 +354,201 @@ def fetch_scoreboard(scoreboard_url: str, date_yyyymmdd: str) -> List[LiveGame]:
                 away_espn_team_id=str(away_team_id) if away_team_id is not None else None,
                 home_score=home_score,
                 away_score=away_score,
+                period=period,
+                clock_seconds=clock_seconds,
+                neutral_site=bool(comp.get("neutralSite")),
             )
         )
-
-    return games
+        ids.append(game_id)
+        codes.append(STATUS_CODES[status])
+        home_scores.append(NO_SCORE if home_score is None else home_score)
+        away_scores.append(NO_SCORE if away_score is None else away_score)
+        start_keys.append(start_key(start_time_utc))
+
+    return Scoreboard(
+        games,
+        ScoreboardSnapshot.from_columns(ids, codes, home_scores, away_scores, start_keys),
+    )
 
 
 # @ halftime functions -------------------------------------------------------
-def fetch_game_summary(summary_url: str, event_id: str, headers: dict):
-    resp = requests.get(
+def fetch_game_summary(
+    summary_url: str,
+    event_id: str,
+    headers: dict,
+    client: Optional[EspnClient] = None,
+):
+    return (client or get_client()).get_json(
+        summary_url,
+        params={"event": event_id},
+        headers=headers,
+        timeout=20,
+        kind="summary",
+    )
+
+
+class SummaryCache:
+    """
+    Warm game summaries, prefetched while a game is in the last minutes of
+    the first half, so the halftime handler has boxscore data even if the
+    final refresh at halftime is slow or fails.
+
+    claim() hands out at most one in-flight prefetch per game and throttles
+    refetches to one per `max_age` seconds. Oldest entries are evicted past
+    `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 200):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._in_flight = set()
+
+    def get(self, event_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(event_id)
+        return entry[1] if entry else None
+
+    def claim(self, event_id: str, max_age: float) -> bool:
+        with self._lock:
+            if event_id in self._in_flight:
+                return False
+            entry = self._entries.get(event_id)
+            if entry is not None and get_clock().monotonic() - entry[0] < max_age:
+                return False
+            self._in_flight.add(event_id)
+            return True
+
+    def put(self, event_id: str, payload: dict) -> None:
+        with self._lock:
+            self._in_flight.discard(event_id)
+            self._entries[event_id] = (get_clock().monotonic(), payload)
+            self._entries.move_to_end(event_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def release(self, event_id: str) -> None:
+        with self._lock:
+            self._in_flight.discard(event_id)
+
+    def discard(self, event_id: str) -> None:
+        with self._lock:
+            self._in_flight.discard(event_id)
+            self._entries.pop(event_id, None)
+
+
+SUMMARY_CACHE = SummaryCache()
+
+
+def prefetch_game_summary(
+    summary_url: str,
+    event_id: str,
+    headers: dict,
+    client: Optional[EspnClient] = None,
+) -> None:
+    """
+    Warms SUMMARY_CACHE for one game. Caller must have claim()ed it.
+    Errors are logged and swallowed: prefetch is best effort.
+    """
+    try:
+        SUMMARY_CACHE.put(event_id, fetch_game_summary(summary_url, event_id, headers, client=client))
+    except Exception as e:
+        SUMMARY_CACHE.release(event_id)
+        print(f"[PREFETCH] summary {event_id} failed: {e}")
+
+
+def refresh_game_summary(
+    summary_url: str,
+    event_id: str,
+    headers: dict,
+    client: Optional[EspnClient] = None,
+) -> dict:
+    """
+    Final summary refresh at halftime. Falls back to the prefetched copy if
+    the fetch fails; raises only when there is nothing cached either.
+    """
+    try:
+        summary = fetch_game_summary(summary_url, event_id, headers, client=client)
+    except Exception as e:
+        summary = SUMMARY_CACHE.get(event_id)
+        if summary is None:
+            raise
+        print(f"[WARN] Halftime summary refresh failed ({e}); using prefetched copy")
+
+    SUMMARY_CACHE.discard(event_id)
+    return summary
+
+
+# @ asyncio variants (used by poller --async) ---------------------------------
+# aiohttp keeps its own connection pool and decompresses gzip/deflate (br with
+# brotli installed); the EspnClient only lends its ETag / Last-Modified cache.
+async def _get_json_async(
+    session: aiohttp.ClientSession,
+    url: str,
+    params: dict,
+    headers: dict,
+    timeout: float,
+    kind: str,
+) -> dict:
+    client = get_client()
+    key = _cache_key(url, params)
+    request_headers = dict(headers)
+    request_headers.update(client.conditional_headers(key))
+
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with session.get(url, params=params, headers=request_headers, timeout=client_timeout) as resp:
+        payload = client.cached_payload(key) if resp.status == 304 else None
+        if payload is None and resp.status != 304:
+            resp.raise_for_status()
+            payload = decode_json(await resp.read())
+            client.remember(key, resp.headers, payload)
+
+    if payload is None:
+        # validators dropped between send and receive; refetch unconditionally
+        async with session.get(url, params=params, headers=headers, timeout=client_timeout) as resp:
+            resp.raise_for_status()
+            payload = decode_json(await resp.read())
+            client.remember(key, resp.headers, payload)
+
+    if client.recorder is not None:
+        client.recorder.record(kind, params, payload)
+    return payload
+
+
+async def fetch_scoreboard_async(
+    session: aiohttp.ClientSession,
+    scoreboard_url: str,
+    date_yyyymmdd: str,
+    owns: Optional[Callable[[str], bool]] = None,
+) -> List[LiveGame]:
+    started = time.perf_counter()
+    data = await _get_json_async(
+        session,
+        scoreboard_url,
+        params=_scoreboard_params(date_yyyymmdd),
+        headers=HEADERS,
+        timeout=30,
+        kind="scoreboard",
+    )
+    METRICS.observe("scoreboard_fetch_seconds", time.perf_counter() - started)
+    return _timed_parse_scoreboard(data, owns)
+
+
+async def fetch_game_summary_async(
+    session: aiohttp.ClientSession,
+    summary_url: str,
+    event_id: str,
+    headers: dict,
+):
+    return await _get_json_async(
+        session,
         summary_url,
         params={"event": event_id},
         headers=headers,
         timeout=20,
+        kind="summary",
     )
-    resp.raise_for_status()
-    return resp.json()
+
 
 def extract_first_half_team_stats(summary_json: dict) -> dict:
     """
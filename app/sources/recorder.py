@@ -0,0 +1,166 @@
+# app/sources/recorder.py
+#
+# Record-and-replay for ESPN payloads.
+#
+#   record:  python -m app.poller --season 2025 --record data/captures
+#   replay:  python -m app.poller --season 2025 --db /tmp/replay.db \
+#                --replay data/captures/espn-20250118T160000Z.jsonl.gz --replay-speed 0
+#
+# Archive format: gzip'd JSON lines, one response per line:
+#   {"t": "<UTC ISO when received>", "kind": "scoreboard" | "summary",
+#    "params": {...request params...}, "payload": {...raw ESPN JSON...}}
+
+import bisect
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.clock import SimulatedClock
+from app.sources.espn import fetch_game_summary, fetch_scoreboard
+
+
+class PayloadRecorder:
+    """
+    Appends every payload the EspnClient returns to a compressed,
+    timestamped archive: <directory>/espn-<start UTC>[-<tag>].jsonl.gz
+    (`tag` keeps sharded pollers started in the same second apart).
+    """
+
+    def __init__(self, directory: Path, tag: Optional[str] = None):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        suffix = f"-{tag}" if tag else ""
+        self.path = directory / f"espn-{stamp}{suffix}.jsonl.gz"
+
+        self._lock = threading.Lock()
+        self._fh = gzip.open(self.path, "at", encoding="utf-8")
+
+    def record(self, kind: str, params: dict, payload: dict) -> None:
+        line = json.dumps(
+            {
+                "t": datetime.now(timezone.utc).isoformat(),
+                "kind": kind,
+                "params": params,
+                "payload": payload,
+            },
+            separators=(",", ":"),
+        )
+        with self._lock:
+            self._fh.write(line + "\n")
+            # sync flush: a killed poller still leaves a readable archive
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+
+class ReplayFinished(Exception):
+    """Raised once replay time has passed the last recorded payload."""
+
+
+def read_archive(path: Path):
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # truncated last line of an archive from a killed recorder
+                continue
+
+
+def _series_key(kind: str, params: dict) -> Tuple:
+    if kind == "summary":
+        return (kind, str(params.get("event")))
+    if kind == "scoreboard":
+        return (kind, str(params.get("dates")))
+    return (kind, tuple(sorted(params.items())))
+
+
+class ReplaySource:
+    """
+    Feeds recorded payloads back on a virtual timeline.
+
+    `clock` is a SimulatedClock starting at the first recorded payload; it
+    only moves when the poller sleeps on it, and really sleeps s / speed
+    (speed <= 0: no real sleeping, a whole game day replays in seconds).
+    Install it with app.clock.set_clock().
+
+    Each request returns the latest payload recorded at or before the
+    current virtual time (plus `lookahead_seconds`, since the recording
+    poller spent real time between a scoreboard and the summaries it
+    triggered) for the same kind + params; LookupError if there is none yet.
+
+    Drop-in for EspnClient (get_json), so fetch_scoreboard /
+    fetch_game_summary / prefetch / halftime refresh all replay unchanged;
+    the fetch_* methods mirror the app.sources.espn signatures.
+    """
+
+    def __init__(self, paths: List[Path], speed: float = 1.0, lookahead_seconds: float = 5.0):
+        self.speed = speed
+        self.lookahead = timedelta(seconds=lookahead_seconds)
+        self.recorder = None
+
+        series: Dict[Tuple, List[Tuple[datetime, dict]]] = {}
+        for path in paths:
+            for rec in read_archive(Path(path)):
+                t = datetime.fromisoformat(rec["t"])
+                key = _series_key(rec["kind"], rec.get("params") or {})
+                series.setdefault(key, []).append((t, rec["payload"]))
+
+        if not series:
+            raise ValueError(f"No recorded payloads in {paths}")
+
+        self._series = {}
+        for key, items in series.items():
+            items.sort(key=lambda item: item[0])
+            self._series[key] = ([t for t, _ in items], [p for _, p in items])
+
+        self.start = min(times[0] for times, _ in self._series.values())
+        self.end = max(times[-1] for times, _ in self._series.values())
+        self.clock = SimulatedClock(self.start, speed=speed)
+
+    @property
+    def finished(self) -> bool:
+        return self.clock.now() > self.end
+
+    # -- EspnClient-compatible ---------------------------------------------
+
+    def get_json(
+        self,
+        url: str,
+        params: dict,
+        timeout: float,
+        headers: Optional[dict] = None,
+        kind: str = "raw",
+    ) -> dict:
+        now = self.clock.now()
+        if now > self.end:
+            raise ReplayFinished(f"replay finished at {self.end.isoformat()}")
+
+        found = self._series.get(_series_key(kind, params))
+        if found is None:
+            raise LookupError(f"no recorded {kind} for {params}")
+
+        times, payloads = found
+        idx = bisect.bisect_right(times, now + self.lookahead) - 1
+        if idx < 0:
+            # never hand out a payload from the future
+            raise LookupError(f"no recorded {kind} for {params} before {now.isoformat()}")
+        return payloads[idx]
+
+    def fetch_scoreboard(self, scoreboard_url: str, date_yyyymmdd: str):
+        return fetch_scoreboard(scoreboard_url, date_yyyymmdd, client=self)
+
+    def fetch_game_summary(self, summary_url: str, event_id: str, headers: dict):
+        return fetch_game_summary(summary_url, event_id, headers, client=self)
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,107 @@
+# app/tracing.py
+#
+# Per-game halftime alert traces, one JSON line per span:
+#   {"trace": "<game_live_id>", "span": "summary_fetch", "at_ms": 412.3,
+#    "duration_ms": 388.1, "ts": "<UTC ISO>", ...attrs}
+#
+# at_ms is measured from the scoreboard request that first showed the game at
+# HALFTIME (the trace origin), so at_ms + duration_ms of the last send_sms is
+# the end-to-end halftime -> phone latency.
+#
+#   python -m app.poller --season 2025 --trace data/traces/halftime.jsonl
+#   python scripts/summarize_traces.py data/traces/halftime.jsonl
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class Tracer:
+    """
+    Thread-safe JSONL span writer. Disabled (every call a no-op) until
+    open() is called, so the handlers can trace unconditionally.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fh = None
+        self._origins: Dict[str, float] = {}
+        self.path: Optional[Path] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._fh is not None
+
+    def open(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._fh = open(path, "a", encoding="utf-8")
+            self.path = path
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+            self._fh = None
+
+    def begin(self, trace_id: str, origin: float) -> None:
+        """Starts a trace; `origin` is a time.perf_counter() value."""
+        if self._fh is None:
+            return
+        with self._lock:
+            self._origins[trace_id] = origin
+
+    def record(self, trace_id: Optional[str], span: str, start: float, end: float, **attrs) -> None:
+        if self._fh is None or trace_id is None:
+            return
+        with self._lock:
+            origin = self._origins.get(trace_id, start)
+            line = {
+                "trace": trace_id,
+                "span": span,
+                "at_ms": round((start - origin) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+                "ts": datetime.now(timezone.utc).isoformat(),
+            }
+            line.update(attrs)
+            if self._fh is not None:
+                self._fh.write(json.dumps(line, separators=(",", ":")) + "\n")
+                self._fh.flush()
+
+    @contextmanager
+    def span(self, trace_id: Optional[str], span: str, **attrs):
+        """
+        Times the enclosed block. Yields a dict; keys set on it are added
+        to the span (e.g. ok=False). An exception is recorded as error=...
+        and re-raised.
+        """
+        if self._fh is None or trace_id is None:
+            yield {}
+            return
+        extra: Dict = dict(attrs)
+        start = time.perf_counter()
+        try:
+            yield extra
+        except Exception as e:
+            extra["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(trace_id, span, start, time.perf_counter(), **extra)
+
+    def finish(self, trace_id: Optional[str], **attrs) -> None:
+        """Writes the closing `end_to_end` span (origin -> now) and forgets the trace."""
+        if self._fh is None or trace_id is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            origin = self._origins.pop(trace_id, None)
+        if origin is not None:
+            self.record(trace_id, "end_to_end", origin, now, **attrs)
+
+
+TRACER = Tracer()
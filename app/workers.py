@@ -0,0 +1,98 @@
+# app/workers.py
+
+import queue
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, List
+
+from app.db_live import connect
+from app.metrics import METRICS
+
+
+class TransitionWorkerPool:
+    """
+    Bounded thread pool for halftime / final handling.
+
+    The poll loop only detects transitions and submits them here, so a slow
+    summary fetch or SMS fan-out never delays detection for other games.
+
+    - Each worker owns its own SQLite connection (connections are not shared
+      across threads).
+    - Tasks are routed by game key, so a game's HALFTIME and FINAL always run
+      in order on the same worker.
+    - Queues are bounded: submit() blocks when a worker is max_queue deep,
+      which pushes back on the poll loop instead of growing without limit.
+
+    Metrics (app.metrics.METRICS):
+      transition_queue_depth          gauge
+      transition_<kind>_wait_seconds  time from submit to start
+      transition_<kind>_run_seconds   handler run time
+    """
+
+    def __init__(self, db_path: Path, workers: int = 4, max_queue: int = 100):
+        self.db_path = db_path
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=max_queue) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f"transition-worker-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def submit(self, key: str, kind: str, fn: Callable, *args, **kwargs) -> None:
+        """
+        Enqueue fn(conn, *args, **kwargs) on the worker that owns `key`.
+        """
+        q = self._queues[zlib.crc32(key.encode()) % len(self._queues)]
+        q.put((kind, key, fn, args, kwargs, time.monotonic()))
+        METRICS.set_gauge("transition_queue_depth", self.depth())
+
+    def log_backlog(self) -> None:
+        depth = self.depth()
+        if depth == 0:
+            return
+        latencies = METRICS.snapshot()["latencies"]
+        waits = ", ".join(
+            f"{name}: p95={s['p95']:.2f}s"
+            for name, s in latencies.items()
+            if name.endswith("_wait_seconds") and s["p95"] is not None
+        )
+        print(f"[WORKERS] queue depth={depth} {waits}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        for q in self._queues:
+            q.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+            METRICS.set_gauge("transition_queue_depth", 0)
+
+    def _run(self, q: queue.Queue) -> None:
+        conn = connect(self.db_path)
+        # workers write concurrently with the poll loop
+        conn.execute("PRAGMA busy_timeout = 30000;")
+        try:
+            while True:
+                item = q.get()
+                if item is None:
+                    break
+
+                kind, key, fn, args, kwargs, enqueued = item
+                started = time.monotonic()
+                METRICS.observe(f"transition_{kind}_wait_seconds", started - enqueued)
+
+                try:
+                    fn(conn, *args, **kwargs)
+                except Exception as e:
+                    print(f"[WORKERS] {kind} failed for {key}: {e}")
+                    conn.rollback()
+                finally:
+                    METRICS.observe(f"transition_{kind}_run_seconds", time.monotonic() - started)
+                    METRICS.set_gauge("transition_queue_depth", self.depth())
+        finally:
+            conn.close()
@@ -0,0 +1,429 @@
+"""
+backtest_confidence.py
+
+Replays the live halftime model over historical games and reports how it
+would have done.
+
+One bulk read of the history, then everything is scored at once with the
+vectorized model in app/confidence_model.py:
+  - games and first-half team stats from halftime_state when it carries
+    stat columns (home_<field> / away_<field> for STAT_FIELDS), otherwise
+    from resolved predictions whose explanation_json recorded
+    first_half_stats (--source picks one); no stats is an error
+  - p(home win) from the baseline curve (bucket or logistic artifact, else
+    built-in buckets); a logistic curve also sees neutral site and season
+  - confidence from compute_confidence_batch, or the live margin-only
+    fallback over every halftime_state game with --baseline-only
+  - HIGH / MEDIUM / LOW buckets with the live thresholds
+  - model params from --params (default: the poller's CONFIDENCE_PARAMS
+    file, so a sweep result can be checked before it goes live)
+
+Reports accuracy, Brier score and log loss overall, per season and per
+bucket; a reliability table; and alert volume / hit rate per threshold.
+
+--simulate N also runs N Monte Carlo second halves per halftime_state
+game (app/simulator.py, team_season_stats ratings) and compares its win
+probability with the curve's, its expected final margin with the
+halftime margin, and how often finals land inside its quantile bands.
+
+Note: if the baseline artifact was fit on the same seasons, p is in-sample.
+
+Usage:
+    python -m scripts.backtest_confidence --db data/ncaa_mbb.db
+    python -m scripts.backtest_confidence --seasons 2023 2024 --thresholds 0.05 0.10 0.15 0.20 0.25
+    python -m scripts.backtest_confidence --baseline-only --simulate 2000
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.baseline_curve import BUILTIN_CURVE, BaselineCurve, load_curve_artifact
+from app.confidence_model import (
+    BUCKETS,
+    DEFAULT_PARAMS,
+    STAT_FIELDS,
+    ConfidenceParams,
+    baseline_confidence_batch,
+    compute_confidence_batch,
+    confidence_bucket_batch,
+    load_confidence_params,
+    stats_to_arrays,
+)
+from app.config import CONFIG
+from app.simulator import (
+    LEAGUE_RATING,
+    LEAGUE_TEMPO,
+    QUANTILES,
+    second_half_inputs,
+    simulate_second_half,
+)
+
+EPS = 1e-15
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backtest the halftime confidence model on historical halftimes")
+    parser.add_argument("--db", type=str, default="data/ncaa_mbb.db")
+    parser.add_argument("--source", choices=("auto", "halftime_state", "predictions"), default="auto",
+                        help="Where games and first-half stats come from")
+    parser.add_argument("--baseline-only", action="store_true",
+                        help="Score every halftime_state game on margin alone (no first-half stats)")
+    parser.add_argument("--artifact", type=str, default=str(CONFIG.baseline_artifact_path))
+    parser.add_argument("--seasons", type=int, nargs="*", default=None, help="Only these season years")
+    parser.add_argument("--params", type=str, default=str(CONFIG.confidence_params_path),
+                        help="Confidence params file (missing = built-in defaults)")
+    parser.add_argument("--thresholds", type=float, nargs="*",
+                        default=[0.05, DEFAULT_PARAMS.medium_cutoff, 0.15, DEFAULT_PARAMS.high_cutoff, 0.25, 0.30])
+    parser.add_argument("--bins", type=int, default=10, help="Reliability bins over p(home win)")
+    parser.add_argument("--simulate", type=int, default=0, metavar="N",
+                        help="Also score the second-half simulator with N sims per game (0 = off)")
+    parser.add_argument("--seed", type=int, default=None, help="Simulator RNG seed")
+    return parser.parse_args()
+
+
+def load_curve(path: Path):
+    if path.exists():
+        return load_curve_artifact(path)
+    return BUILTIN_CURVE
+
+
+def stat_columns(conn) -> list:
+    """First-half stat columns halftime_state exposes, if any."""
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(halftime_state);")}
+    wanted = [f"{side}_{field}" for side in ("home", "away") for field in STAT_FIELDS]
+    return wanted if all(c in cols for c in wanted) else []
+
+
+def load_games(conn, seasons=None):
+    """
+    One query for the whole history -> dict of numpy columns.
+    """
+    stats = stat_columns(conn)
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(halftime_state);")}
+    location = "location" if "location" in cols else "NULL"
+    select = ", ".join(["season_year", "halftime_margin", "home_won", location] + stats)
+    sql = f"SELECT {select} FROM halftime_state"
+    params = ()
+    if seasons:
+        sql += f" WHERE season_year IN ({', '.join('?' for _ in seasons)})"
+        params = tuple(seasons)
+
+    rows = conn.execute(sql, params).fetchall()
+    if not rows:
+        return None, stats
+
+    cols = list(zip(*rows))
+    data = {
+        "season": np.asarray(cols[0], dtype=np.int64),
+        "margin": np.asarray(cols[1], dtype=np.int64),
+        "home_won": np.asarray(cols[2], dtype=np.int64),
+        "neutral": np.asarray([loc == "neutral" for loc in cols[3]], dtype=np.int64),
+    }
+    for name, values in zip(stats, cols[4:]):
+        data[name] = np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+    return data, stats
+
+
+def _has_table(conn, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (name,)).fetchone() is not None
+
+
+def _history_from_halftime_state(conn, seasons):
+    if not _has_table(conn, "halftime_state") or not stat_columns(conn):
+        return None
+    data, _ = load_games(conn, seasons)
+    if data is None:
+        return None
+    home = {f: data[f"home_{f}"] for f in STAT_FIELDS}
+    away = {f: data[f"away_{f}"] for f in STAT_FIELDS}
+    return data["season"], data["margin"], data["home_won"], data["neutral"], home, away
+
+
+def _history_from_predictions(conn, seasons):
+    if not _has_table(conn, "predictions"):
+        return None
+    sql = """
+        SELECT season_year, home_win, explanation_json
+        FROM predictions
+        WHERE home_win IS NOT NULL AND explanation_json IS NOT NULL
+    """
+    params = ()
+    if seasons:
+        sql += f" AND season_year IN ({', '.join('?' for _ in seasons)})"
+        params = tuple(seasons)
+
+    season, margin, home_won, neutral, home, away = [], [], [], [], [], []
+    for season_year, home_win, explanation_json in conn.execute(sql, params):
+        try:
+            explanation = json.loads(explanation_json)
+        except ValueError:
+            continue
+        stats = explanation.get("first_half_stats")
+        if not stats or explanation.get("halftime_margin") is None:
+            continue
+        season.append(season_year)
+        margin.append(explanation["halftime_margin"])
+        home_won.append(home_win)
+        neutral.append(bool(explanation.get("neutral_site")))
+        home.append(stats.get("home"))
+        away.append(stats.get("away"))
+
+    if not season:
+        return None
+    return (
+        np.asarray(season, dtype=np.int64),
+        np.asarray(margin, dtype=np.int64),
+        np.asarray(home_won, dtype=np.int64),
+        np.asarray(neutral, dtype=np.int64),
+        stats_to_arrays(home),
+        stats_to_arrays(away),
+    )
+
+
+def load_history(db_path: str, source: str, seasons):
+    conn = sqlite3.connect(Path(db_path))
+    try:
+        if source in ("auto", "halftime_state"):
+            history = _history_from_halftime_state(conn, seasons)
+            if history is not None or source == "halftime_state":
+                return history, "halftime_state"
+        return _history_from_predictions(conn, seasons), "predictions"
+    finally:
+        conn.close()
+
+
+def history_to_data(history) -> dict:
+    season, margin, home_won, neutral, home, away = history
+    return {"season": season, "margin": margin, "home_won": home_won, "neutral": neutral,
+            "home": home, "away": away}
+
+
+def score(data, curve: BaselineCurve, params: ConfidenceParams = DEFAULT_PARAMS):
+    """Confidence from first-half stats when data carries them (load_history), else margin only."""
+    p, weight = curve.lookup_batch(data["margin"], data["neutral"], data["season"])
+    if "home" in data:
+        confidence = compute_confidence_batch(p, weight, data["margin"], data["home"], data["away"], params)["confidence"]
+    else:
+        confidence = baseline_confidence_batch(p, weight)
+    return p, confidence, confidence_bucket_batch(confidence, params)
+
+
+def load_simulation_inputs(conn, seasons=None):
+    """
+    halftime_state joined to both teams' team_season_stats (NaN when a
+    team has no row) plus each season's league averages.
+    """
+    sql = """
+        SELECT
+            hs.season_year, hs.home_first_half_pts, hs.away_first_half_pts,
+            hs.final_margin, hs.home_won, hs.location = 'neutral',
+            th.offensive_rating, th.defensive_rating, th.tempo,
+            ta.offensive_rating, ta.defensive_rating, ta.tempo
+        FROM halftime_state hs
+        JOIN seasons s ON s.year = hs.season_year
+        LEFT JOIN team_season_stats th ON th.team_id = hs.home_team_id AND th.season_id = s.season_id
+        LEFT JOIN team_season_stats ta ON ta.team_id = hs.away_team_id AND ta.season_id = s.season_id
+    """
+    params = ()
+    if seasons:
+        sql += f" WHERE hs.season_year IN ({', '.join('?' for _ in seasons)})"
+        params = tuple(seasons)
+    rows = conn.execute(sql, params).fetchall()
+    if not rows:
+        return None
+
+    cols = [np.asarray([np.nan if v is None else v for v in c], dtype=np.float64) for c in zip(*rows)]
+    names = ("season", "home_pts", "away_pts", "final_margin", "home_won", "neutral",
+             "home_ortg", "home_drtg", "home_tempo", "away_ortg", "away_drtg", "away_tempo")
+    data = dict(zip(names, cols))
+
+    league = {
+        int(year): (rating, tempo)
+        for year, rating, tempo in conn.execute(
+            """
+            SELECT s.year, AVG(t.offensive_rating), AVG(t.tempo)
+            FROM team_season_stats t JOIN seasons s ON s.season_id = t.season_id
+            GROUP BY s.year;
+            """
+        )
+        if rating is not None and tempo is not None
+    }
+    data["league_rating"] = np.asarray([league.get(int(y), (np.nan, np.nan))[0] for y in data["season"]])
+    data["league_tempo"] = np.asarray([league.get(int(y), (np.nan, np.nan))[1] for y in data["season"]])
+    return data
+
+
+def simulate_history(data, n_sims: int, seed=None):
+    possessions, ppp_home, ppp_away = second_half_inputs(
+        data["home_pts"], data["away_pts"],
+        data["home_ortg"], data["home_drtg"], data["home_tempo"],
+        data["away_ortg"], data["away_drtg"], data["away_tempo"],
+        data["neutral"] == 1, False,
+        np.where(np.isnan(data["league_rating"]), LEAGUE_RATING, data["league_rating"]),
+        np.where(np.isnan(data["league_tempo"]), LEAGUE_TEMPO, data["league_tempo"]),
+    )
+    return simulate_second_half(
+        data["home_pts"] - data["away_pts"], possessions, ppp_home, ppp_away,
+        n_sims=n_sims, rng=np.random.default_rng(seed),
+    )
+
+
+def print_simulation(data, sim, curve, seconds):
+    y = data["home_won"].astype(np.int64)
+    margin = (data["home_pts"] - data["away_pts"]).astype(np.int64)
+    p_curve, _ = curve.lookup_batch(margin, data["neutral"], data["season"].astype(np.int64))
+    rated = ~(np.isnan(data["home_ortg"]) | np.isnan(data["away_ortg"]))
+
+    print(f"\nSecond-half simulation ({len(y)} games, {int(rated.sum())} with both teams rated, {seconds:.2f}s)")
+    print_table("Win probability", [
+        ("simulator", summarize(sim["p_home_win"], y), None),
+        ("curve", summarize(p_curve, y), None),
+    ])
+
+    final = data["final_margin"]
+    print("\nFinal margin")
+    print("-" * 52)
+    print(f"{'':>22} | {'MAE':>7} | {'RMSE':>7}")
+    print("-" * 52)
+    for label, guess in (("simulator expected", sim["expected_margin"]), ("halftime margin", margin)):
+        err = guess - final
+        print(f"{label:>22} | {np.mean(np.abs(err)):>7.2f} | {np.sqrt(np.mean(err ** 2)):>7.2f}")
+
+    q = sim["quantiles"]
+    lo_out, hi_out = QUANTILES.index(0.05), QUANTILES.index(0.95)
+    lo_mid, hi_mid = QUANTILES.index(0.25), QUANTILES.index(0.75)
+    inside_90 = np.mean((final >= q[:, lo_out]) & (final <= q[:, hi_out]))
+    inside_50 = np.mean((final >= q[:, lo_mid]) & (final <= q[:, hi_mid]))
+    print(f"\nFinals inside the simulated 5-95% band: {inside_90:.1%} (nominal 90%+), "
+          f"25-75% band: {inside_50:.1%} (nominal 50%+)")
+
+
+def summarize(p, y):
+    """(n, accuracy, brier, log loss) for predictions p of outcomes y."""
+    n = len(p)
+    if n == 0:
+        return 0, None, None, None
+    correct = (p >= 0.5).astype(np.int64) == y
+    clipped = np.clip(p, EPS, 1 - EPS)
+    brier = float(np.mean((p - y) ** 2))
+    log_loss = float(-np.mean(y * np.log(clipped) + (1 - y) * np.log(1 - clipped)))
+    return n, float(np.mean(correct)), brier, log_loss
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print("-" * 72)
+    print(f"{'':>12} | {'Games':>7} | {'Accuracy':>8} | {'Brier':>7} | {'LogLoss':>7} | {'Conf':>6}")
+    print("-" * 72)
+    for label, (n, acc, brier, ll), conf in rows:
+        print(
+            f"{label:>12} | {n:>7} | {_fmt(acc, '8.3f')} | {_fmt(brier, '7.4f')} | "
+            f"{_fmt(ll, '7.4f')} | {_fmt(conf, '6.3f')}"
+        )
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+
+    if args.baseline_only:
+        conn = sqlite3.connect(Path(args.db))
+        try:
+            data, _ = load_games(conn, args.seasons)
+        finally:
+            conn.close()
+        if data is None:
+            raise SystemExit("No games in halftime_state for the selected seasons.")
+        source = "halftime_state, margin only"
+    else:
+        history, source = load_history(args.db, args.source, args.seasons)
+        if history is None:
+            raise SystemExit(
+                f"No games with first-half stats in {source} "
+                "(halftime_state has no stat columns and no resolved predictions recorded first_half_stats); "
+                "pass --baseline-only to score on margin alone."
+            )
+        data = history_to_data(history)
+
+    sim_data = None
+    if args.simulate > 0:
+        conn = sqlite3.connect(Path(args.db))
+        try:
+            sim_data = load_simulation_inputs(conn, args.seasons)
+        finally:
+            conn.close()
+    loaded = time.perf_counter()
+
+    curve = load_curve(Path(args.artifact))
+    params = load_confidence_params(Path(args.params))
+    p, confidence, buckets = score(data, curve, params)
+    y = data["home_won"]
+    scored = time.perf_counter()
+
+    print(f"{len(y)} games from {source}, baseline {curve.version}")
+
+    overall = summarize(p, y)
+    print_table("Overall", [("all", overall, float(np.mean(confidence)))])
+
+    rows = []
+    for season in np.unique(data["season"]):
+        m = data["season"] == season
+        rows.append((str(season), summarize(p[m], y[m]), float(np.mean(confidence[m]))))
+    print_table("Per season", rows)
+
+    rows = []
+    for bucket in BUCKETS:
+        m = buckets == bucket
+        rows.append((bucket, summarize(p[m], y[m]), float(np.mean(confidence[m])) if m.any() else None))
+    print_table("Per confidence bucket", rows)
+
+    # Reliability: predicted vs actual home win rate in equal-width p bins
+    print("\nReliability (p home win)")
+    print("-" * 52)
+    print(f"{'Bin':>13} | {'Games':>7} | {'Mean p':>7} | {'Actual':>7} | {'Gap':>6}")
+    print("-" * 52)
+    edges = np.linspace(0.0, 1.0, args.bins + 1)
+    idx = np.clip(np.digitize(p, edges[1:-1]), 0, args.bins - 1)
+    counts = np.bincount(idx, minlength=args.bins)
+    sum_p = np.bincount(idx, weights=p, minlength=args.bins)
+    sum_y = np.bincount(idx, weights=y, minlength=args.bins)
+    for b in range(args.bins):
+        if counts[b] == 0:
+            continue
+        mean_p = sum_p[b] / counts[b]
+        actual = sum_y[b] / counts[b]
+        print(f"{edges[b]:>5.2f}-{edges[b + 1]:<5.2f}   | {counts[b]:>7} | {mean_p:>7.3f} | {actual:>7.3f} | {actual - mean_p:>+6.3f}")
+
+    # Alert volume: alerts fire when confidence >= threshold
+    seasons = np.unique(data["season"])
+    correct = (p >= 0.5).astype(np.int64) == y
+    print("\nAlert volume per threshold")
+    print("-" * 64)
+    print(f"{'Threshold':>9} | {'Alerts':>7} | {'Share':>6} | {'Hit rate':>8} | {'Per season':>10}")
+    print("-" * 64)
+    for t in sorted(args.thresholds):
+        m = confidence >= t
+        alerts = int(m.sum())
+        hit = float(np.mean(correct[m])) if alerts else None
+        print(f"{t:>9.3f} | {alerts:>7} | {alerts / len(y):>6.1%} | {_fmt(hit, '8.3f')} | {alerts / len(seasons):>10.1f}")
+
+    if sim_data is not None:
+        sim_started = time.perf_counter()
+        sim = simulate_history(sim_data, args.simulate, args.seed)
+        print_simulation(sim_data, sim, curve, time.perf_counter() - sim_started)
+
+    done = time.perf_counter()
+    print(f"\nLoaded in {loaded - started:.2f}s, scored in {scored - loaded:.3f}s, total {done - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
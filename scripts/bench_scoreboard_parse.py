@@ -0,0 +1,81 @@
+"""
+bench_scoreboard_parse.py
+
+Benchmarks scoreboard decoding + parsing against captured ESPN payloads
+(archives written by `python -m app.poller --record DIR`).
+
+Each recorded scoreboard is re-encoded to the bytes ESPN would have sent,
+then, for every JSON backend installed (stdlib json always; orjson / ujson
+if present), timed as:
+  decode         bytes -> dict
+  parse          dict -> LiveGame rows + snapshot (parse_scoreboard)
+  decode+parse   what the poller pays per poll
+
+and reported in events (games) per second.
+
+Usage:
+    python -m scripts.bench_scoreboard_parse data/captures/espn-*.jsonl.gz
+    python -m scripts.bench_scoreboard_parse data/captures/espn-20250118T160000Z.jsonl.gz --repeat 20
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from app.sources.espn import JSON_BACKEND, JSON_DECODERS, parse_scoreboard
+from app.sources.recorder import read_archive
+
+
+def load_scoreboards(paths):
+    raw = []
+    for path in paths:
+        for rec in read_archive(Path(path)):
+            if rec.get("kind") == "scoreboard":
+                raw.append(json.dumps(rec["payload"]).encode("utf-8"))
+    return raw
+
+
+def timed(fn, items, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ESPN scoreboard decode/parse throughput")
+    parser.add_argument("archives", nargs="+", type=Path)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    raw = load_scoreboards(args.archives)
+    if not raw:
+        raise SystemExit("No scoreboard payloads in the given archives.")
+
+    decoded = [JSON_DECODERS["json"](b) for b in raw]
+    events = sum(len(d.get("events") or []) for d in decoded)
+    megabytes = sum(len(b) for b in raw) / 1e6
+
+    print(f"{len(raw)} scoreboards, {events} events, {megabytes:.1f} MB; poller backend: {JSON_BACKEND}\n")
+
+    parse_s = timed(parse_scoreboard, decoded, args.repeat)
+
+    header = f"{'backend':<10}{'decode ev/s':>14}{'parse ev/s':>14}{'decode+parse ev/s':>20}{'MB/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, loads in JSON_DECODERS.items():
+        decode_s = timed(loads, raw, args.repeat)
+        total_s = timed(lambda b, loads=loads: parse_scoreboard(loads(b)), raw, args.repeat)
+        print(
+            f"{name:<10}{events / decode_s:>14,.0f}{events / parse_s:>14,.0f}"
+            f"{events / total_s:>20,.0f}{megabytes / decode_s:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
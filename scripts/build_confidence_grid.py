@@ -0,0 +1,189 @@
+"""
+build_confidence_grid.py
+
+Precomputes confidence for every (halftime margin, quantized HQS,
+shooting-extreme) cell from compute_confidence_with_stats' formula
+(confidence_from_quality) and embeds it in a bucket baseline artifact,
+so the live path scores a game with one table read instead of
+re-evaluating the formula (ConfidenceGrid in app/confidence_model.py):
+
+    python -m scripts.build_confidence_grid --artifact data/baseline_probs.json
+    python -m scripts.build_confidence_grid --hqs-step 0.001 --params data/confidence_params.json
+
+HQS nodes run from -boost_cap / boost_scale to +boost_cap / boost_scale
+(where the boost saturates) in steps of at most --hqs-step, shrunk so a
+node lands on the saturation point; margins follow the artifact's dense
+p / weight arrays. Nodes are unrounded, so interpolated lookups round
+once and match the formula. The grid records the artifact version
+and the confidence params it was built from; the poller only uses it when
+both still match, so rebuild after changing either.
+
+--verify checks an existing grid instead of writing one: random
+(margin, HQS, extreme) samples, plus real first-half stats when --db is
+given, scored exactly and through the grid (nearest node and
+interpolated, scalar and batch). Exits non-zero if the --mode lookup
+(the poller's CONFIDENCE_GRID) flips any confidence bucket, and so any
+alert, or errs by more than --tolerance.
+
+    python -m scripts.build_confidence_grid --verify --db data/ncaa_mbb.db
+
+Logistic artifacts ("halftime-logit/v1") are continuous in margin and
+vary by site and season; they are not gridded.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.baseline_curve import ARTIFACT_FORMAT, BaselineCurve, attach_confidence_grid
+from app.config import CONFIG
+from app.confidence_model import (
+    DEFAULT_HQS_STEP,
+    compute_halftime_quality_batch,
+    confidence_bucket_batch,
+    confidence_from_quality,
+    load_confidence_params,
+)
+from scripts.backtest_confidence import load_history
+from scripts.smooth_baseline_probs import write_artifact
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build or verify the precomputed confidence grid")
+    parser.add_argument("--artifact", type=str, default=str(CONFIG.baseline_artifact_path),
+                        help="Bucket baseline artifact to read (and update)")
+    parser.add_argument("--params", type=str, default=str(CONFIG.confidence_params_path),
+                        help="Confidence params file (missing = built-in defaults)")
+    parser.add_argument("--hqs-step", type=float, default=DEFAULT_HQS_STEP)
+    parser.add_argument("--out", type=str, default=None, help="Write here instead of over --artifact")
+    parser.add_argument("--verify", action="store_true", help="Check the artifact's grid, write nothing")
+    parser.add_argument("--samples", type=int, default=20000, help="Random samples to verify against")
+    parser.add_argument("--db", type=str, default=None, help="Also verify on this DB's first-half stats")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=("interpolate", "nearest"), default="interpolate",
+                        help="Lookup to gate on (the poller's CONFIDENCE_GRID)")
+    parser.add_argument("--tolerance", type=float, default=0.0001,
+                        help="Max |grid - exact| for --mode (any bucket flip fails regardless)")
+    return parser.parse_args()
+
+
+def load_bucket_artifact(path: Path) -> dict:
+    if not path.exists():
+        raise SystemExit(f"{path} not found; run scripts.smooth_baseline_probs first.")
+    with open(path, "r", encoding="utf-8") as fh:
+        artifact = json.load(fh)
+    if artifact.get("format") != ARTIFACT_FORMAT:
+        raise SystemExit(f"{path} is {artifact.get('format')!r}; confidence grids need {ARTIFACT_FORMAT}.")
+    return artifact
+
+
+def random_samples(curve: BaselineCurve, grid, n: int, rng):
+    """Margins across (and past) the curve; HQS across the grid, with exact 0 and node values mixed in."""
+    margins = rng.integers(curve.min_margin - 3, curve.max_margin + 4, size=n)
+    hqs = rng.uniform(-1.2 * grid.hqs_max, 1.2 * grid.hqs_max, size=n)
+    hqs[rng.random(n) < 0.05] = 0.0
+    on_node = rng.random(n) < 0.05
+    hqs[on_node] = rng.choice(grid.hqs_nodes(), size=int(on_node.sum()))
+    extreme = rng.random(n) < 0.3
+    return margins, hqs, extreme
+
+
+def historical_samples(db_path: str, params):
+    history, source = load_history(db_path, "auto", None)
+    if history is None:
+        print(f"[WARN] no first-half stats in {db_path}; historical check skipped")
+        return None
+    _, margin, _, _, home, away = history
+    quality = compute_halftime_quality_batch(home, away, params)
+    print(f"Historical samples: {len(margin)} games from {source}")
+    return margin, quality["hqs"], quality["shooting_extreme"]
+
+
+def verify(label: str, curve: BaselineCurve, grid, margins, hqs, extreme, mode: str):
+    """Prints grid vs exact error for one sample set; returns (max error, bucket flips) for `mode`."""
+    finite = np.isfinite(hqs)  # the poller evaluates the formula for these
+    margins, hqs, extreme = margins[finite], hqs[finite], extreme[finite]
+    if not len(margins):
+        print(f"\n{label}: no samples with a finite HQS")
+        return 0.0, 0
+    p, w = curve.lookup_batch(margins)
+    params = grid.params
+
+    t0 = time.perf_counter()
+    exact = np.array([
+        confidence_from_quality(pi, wi, int(m), float(h), bool(e), params)
+        for pi, wi, m, h, e in zip(p, w, margins, hqs, extreme)
+    ])
+    t_exact = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    interp = np.array([grid.lookup(int(m), float(h), bool(e)) for m, h, e in zip(margins, hqs, extreme)])
+    t_grid = time.perf_counter() - t0
+    nearest = np.array([grid.lookup(int(m), float(h), bool(e), interpolate=False)
+                        for m, h, e in zip(margins, hqs, extreme)])
+
+    batch_interp = grid.lookup_batch(margins, hqs, extreme)
+    batch_nearest = grid.lookup_batch(margins, hqs, extreme, interpolate=False)
+    if not (np.array_equal(batch_interp, interp) and np.array_equal(batch_nearest, nearest)):
+        print("[WARN] lookup_batch disagrees with scalar lookup")
+
+    buckets = confidence_bucket_batch(exact, params)
+    print(f"\n{label}: {len(exact)} samples "
+          f"(exact {t_exact / len(exact) * 1e6:.2f} us, grid {t_grid / len(exact) * 1e6:.2f} us per game)")
+    print("-" * 72)
+    print(f"{'Mode':>12} | {'Max |err|':>10} | {'Mean |err|':>10} | {'Differ':>7} | {'Bucket flips':>12}")
+    print("-" * 72)
+    result = (0.0, 0)
+    for name, values in (("interpolate", interp), ("nearest", nearest)):
+        err = np.abs(values - exact)
+        differ = int(np.sum(values != exact))
+        flips = int(np.sum(confidence_bucket_batch(values, params) != buckets))
+        print(f"{name:>12} | {err.max():>10.5f} | {err.mean():>10.5f} | {differ:>7} | {flips:>12}")
+        if name == mode:
+            result = (float(err.max()), flips)
+    return result
+
+
+def main():
+    args = parse_args()
+    path = Path(args.artifact)
+    artifact = load_bucket_artifact(path)
+    curve = BaselineCurve.from_artifact(path)
+
+    if args.verify:
+        grid = curve.confidence_grid
+        if grid is None:
+            raise SystemExit(f"{path} has no usable confidence grid; build one first.")
+    else:
+        params = load_confidence_params(Path(args.params))
+        t0 = time.perf_counter()
+        grid = attach_confidence_grid(artifact, params, args.hqs_step)
+        print(f"Built {2 * grid.n_margins} x {2 * grid.n + 1} confidence grid "
+              f"(HQS step {grid.hqs_step:g}, +/-{grid.hqs_max:g}) in {time.perf_counter() - t0:.2f}s")
+
+    rng = np.random.default_rng(args.seed)
+    results = [verify("Random", curve, grid, *random_samples(curve, grid, args.samples, rng), args.mode)]
+    if args.db:
+        history = historical_samples(args.db, grid.params)
+        if history is not None:
+            results.append(verify("Historical", curve, grid, *history, args.mode))
+
+    worst = max(err for err, _ in results)
+    flips = sum(f for _, f in results)
+    if flips:
+        raise SystemExit(f"{args.mode} grid lookups flip {flips} confidence buckets")
+    if worst > args.tolerance:
+        raise SystemExit(f"{args.mode} grid error {worst:.5f} exceeds --tolerance {args.tolerance}")
+
+    if args.verify:
+        return
+    out = Path(args.out) if args.out else path
+    write_artifact(artifact, out)
+    print(f"\nWrote {out} (version {artifact['version']}, grid for params {args.params})")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,21 @@ calibrate_smoothed_probs.py
 
 Evaluates calibration of smoothed halftime win probabilities
 using a single season of data.
+
+Predictions come from the baseline artifact the poller uses
+(scripts/smooth_baseline_probs.py output); without one, the built-in
+buckets in app/baseline_curve.py.
+
+    python -m scripts.calibrate_baseline_probs --season 2024
 """
 
 import sqlite3
 from pathlib import Path
 import argparse
 
+from app.baseline_curve import BUILTIN_CURVE, BaselineCurve, load_curve_artifact
+from app.config import CONFIG
+
 
 BUCKETS = [
     (-20, -16),
@@ -22,30 +31,25 @@ BUCKETS = [
     (16, 20),
 ]
 
-SMOOTHED_PROBS = {
-    (-20, -16): 0.1331,
-    (-15, -11): 0.1868,
-    (-10, -6):  0.3065,
-    (-5, -1):   0.4966,
-    (0, 0):     0.5526,
-    (1, 5):     0.6862,
-    (6, 10):    0.8188,
-    (11, 15):   0.9132,
-    (16, 20):   0.9508,
-}
-
-
 def parse_args():
     parser = argparse.ArgumentParser(description="Calibrate smoothed halftime probabilities")
     parser.add_argument("--db", type=str, default="data/ncaa_mbb.db")
     parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--artifact", type=str, default=str(CONFIG.baseline_artifact_path))
     return parser.parse_args()
 
 
-def calibrate(conn, season_year: int):
+def load_curve(path: Path):
+    if path.exists():
+        return load_curve_artifact(path)
+    print(f"[WARN] {path} not found; using built-in buckets")
+    return BUILTIN_CURVE
+
+
+def calibrate(conn, season_year: int, curve: BaselineCurve):
     cursor = conn.cursor()
 
-    print("\nCalibration Report (Smoothed Probabilities)")
+    print(f"\nCalibration Report (Smoothed Probabilities, baseline {curve.version})")
     print("-" * 75)
     print(f"{'Margin':>10} | {'Games':>7} | {'Pred %':>8} | {'Actual %':>9}")
     print("-" * 75)
@@ -53,19 +57,23 @@ def calibrate(conn, season_year: int):
     for low, high in BUCKETS:
         cursor.execute(
             """
-            SELECT COUNT(*), AVG(home_won)
+            SELECT halftime_margin, COUNT(*), SUM(home_won)
             FROM halftime_state_capped
             WHERE season_year = ?
-              AND halftime_margin BETWEEN ? AND ?;
+              AND halftime_margin BETWEEN ? AND ?
+            GROUP BY halftime_margin;
             """,
             (season_year, low, high),
         )
+        rows = cursor.fetchall()
 
-        games, actual = cursor.fetchone()
-        if games == 0 or actual is None:
+        games = sum(n for _, n, _ in rows)
+        if games == 0:
             continue
 
-        predicted = SMOOTHED_PROBS[(low, high)]
+        actual = sum(wins for _, _, wins in rows) / games
+        # games-weighted mean of the per-margin prediction
+        predicted = sum(curve.lookup(margin)[0] * n for margin, n, _ in rows) / games
 
         print(
             f"{f'{low} to {high}':>10} | "
@@ -81,7 +89,7 @@ def main():
     args = parse_args()
     conn = sqlite3.connect(Path(args.db))
     try:
-        calibrate(conn, args.season)
+        calibrate(conn, args.season, load_curve(Path(args.artifact)))
     finally:
         conn.close()
 
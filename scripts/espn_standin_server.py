@@ -0,0 +1,366 @@
+"""
+espn_standin_server.py
+
+Local stand-in for the ESPN scoreboard / summary endpoints, for load
+testing the live poller without touching ESPN.
+
+Simulates N games moving through PRE -> LIVE -> HALFTIME -> LIVE -> FINAL.
+Game time runs `--speed` times faster than wall time, and tipoffs are
+spread over `--window-minutes` of game time. Payloads use the same shapes
+that fetch_scoreboard and extract_first_half_team_stats parse, with real
+ESPN team names so the poller's team mapping resolves them.
+
+Usage:
+    python -m scripts.espn_standin_server --games 300 --speed 30 --latency-ms 80 --rate-limit-rate 0.02
+
+    ESPN_SCOREBOARD_URL=http://127.0.0.1:8765/scoreboard \\
+    ESPN_SUMMARY_URL=http://127.0.0.1:8765/summary \\
+    SMS_DISABLED=1 python -m app.poller --season 2025 --db /tmp/loadtest.db
+
+    # halftime-start -> prediction-committed latency for the run
+    python -m scripts.espn_standin_server report --db /tmp/loadtest.db
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sqlite3
+import statistics
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from app.team_mapping_static import ESPN_TO_SPORTSREF
+
+
+# Game-time phases, in simulated minutes
+FIRST_HALF_MINUTES = 40.0   # 20:00 of clock plus stoppages
+HALFTIME_MINUTES = 20.0
+SECOND_HALF_MINUTES = 45.0
+HALF_CLOCK_SECONDS = 20 * 60
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local ESPN stand-in server for poller load tests")
+    sub = parser.add_subparsers(dest="command")
+
+    report = sub.add_parser("report", help="Halftime -> prediction latency for a finished run")
+    report.add_argument("--db", type=str, required=True)
+    report.add_argument("--url", type=str, default="http://127.0.0.1:8765")
+
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=150, help="Games on the slate (50-500)")
+    parser.add_argument("--speed", type=float, default=30.0, help="Simulated seconds per wall second")
+    parser.add_argument("--window-minutes", type=float, default=60.0,
+                        help="Tipoffs are spread over this many simulated minutes")
+    parser.add_argument("--lead-minutes", type=float, default=5.0,
+                        help="Simulated minutes before the first tipoff")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+class SimulatedSlate:
+    """
+    Deterministic slate of games on a sped-up clock.
+
+    Everything is a pure function of (seed, wall time), so any number of
+    server threads can answer concurrently without shared mutable state.
+    Reported start times are wall-clock, so the poller's tipoff scheduling
+    behaves as it would against ESPN.
+    """
+
+    def __init__(self, n_games: int, speed: float, window_minutes: float, lead_minutes: float, seed: int):
+        self.speed = speed
+        self.started_wall = time.time()
+
+        rng = random.Random(seed)
+        names = sorted(ESPN_TO_SPORTSREF)
+
+        self.games = []
+        for i in range(n_games):
+            home, away = rng.sample(names, 2)
+            tipoff_sim_min = lead_minutes + rng.uniform(0, window_minutes)
+            self.games.append({
+                "id": str(401700000 + i),
+                "home": home,
+                "away": away,
+                "home_team_id": str(1000 + names.index(home)),
+                "away_team_id": str(1000 + names.index(away)),
+                "tipoff_sim_min": tipoff_sim_min,
+                # points scored per simulated game minute, 40 game minutes
+                "home_pts": [rng.choice((0, 1, 2, 2, 2, 3)) for _ in range(40)],
+                "away_pts": [rng.choice((0, 1, 2, 2, 2, 3)) for _ in range(40)],
+                "fg_pct": (rng.uniform(35, 55), rng.uniform(35, 55)),
+                "fg3_pct": (rng.uniform(20, 45), rng.uniform(20, 45)),
+                "fta": (rng.randint(2, 14), rng.randint(2, 14)),
+                "turnovers": (rng.randint(3, 12), rng.randint(3, 12)),
+                "off_reb": (rng.randint(1, 9), rng.randint(1, 9)),
+                "rebounds": (rng.randint(12, 25), rng.randint(12, 25)),
+            })
+        self.by_id = {g["id"]: g for g in self.games}
+
+    def sim_minutes(self, wall: float) -> float:
+        return (wall - self.started_wall) * self.speed / 60.0
+
+    def wall_at(self, sim_min: float) -> float:
+        return self.started_wall + sim_min * 60.0 / self.speed
+
+    def state(self, g: dict, wall: float):
+        """
+        Returns (status, period, clock_seconds, game_minutes_played).
+        """
+        t = self.sim_minutes(wall) - g["tipoff_sim_min"]
+        if t < 0:
+            return "PRE", 0, HALF_CLOCK_SECONDS, 0.0
+
+        if t < FIRST_HALF_MINUTES:
+            frac = t / FIRST_HALF_MINUTES
+            return "LIVE", 1, HALF_CLOCK_SECONDS * (1 - frac), 20.0 * frac
+        t -= FIRST_HALF_MINUTES
+
+        if t < HALFTIME_MINUTES:
+            return "HALFTIME", 1, 0.0, 20.0
+        t -= HALFTIME_MINUTES
+
+        if t < SECOND_HALF_MINUTES:
+            frac = t / SECOND_HALF_MINUTES
+            return "LIVE", 2, HALF_CLOCK_SECONDS * (1 - frac), 20.0 + 20.0 * frac
+
+        return "FINAL", 2, 0.0, 40.0
+
+    def halftime_started_wall(self, g: dict) -> float:
+        return self.wall_at(g["tipoff_sim_min"] + FIRST_HALF_MINUTES)
+
+    @staticmethod
+    def score(points: list, minutes_played: float) -> int:
+        return sum(points[:int(minutes_played)])
+
+    def event(self, g: dict, wall: float) -> dict:
+        status, period, clock, played = self.state(g, wall)
+
+        type_obj = {
+            "PRE": {"state": "pre", "completed": False, "name": "STATUS_SCHEDULED", "shortDetail": "Scheduled"},
+            "LIVE": {"state": "in", "completed": False, "name": "STATUS_IN_PROGRESS", "shortDetail": "In Progress"},
+            "HALFTIME": {"state": "in", "completed": False, "name": "STATUS_HALFTIME", "shortDetail": "Halftime"},
+            "FINAL": {"state": "post", "completed": True, "name": "STATUS_FINAL", "shortDetail": "Final"},
+        }[status]
+
+        tipoff = datetime.fromtimestamp(self.wall_at(g["tipoff_sim_min"]), tz=timezone.utc)
+
+        def competitor(side: str) -> dict:
+            return {
+                "homeAway": side,
+                "score": str(self.score(g[f"{side}_pts"], played)),
+                "team": {"id": g[f"{side}_team_id"], "displayName": g[side]},
+            }
+
+        return {
+            "id": g["id"],
+            "date": tipoff.strftime("%Y-%m-%dT%H:%MZ"),
+            "competitions": [{
+                "status": {
+                    "clock": round(clock, 1),
+                    "displayClock": f"{int(clock // 60)}:{int(clock % 60):02d}",
+                    "period": period,
+                    "type": type_obj,
+                },
+                "competitors": [competitor("home"), competitor("away")],
+            }],
+        }
+
+    def scoreboard(self, wall: float) -> dict:
+        return {"events": [self.event(g, wall) for g in self.games]}
+
+    def summary(self, g: dict) -> dict:
+        def team(side: str, i: int) -> dict:
+            return {
+                "team": {"homeAway": side, "displayName": g[side]},
+                "statistics": [
+                    {"name": "fg%", "displayValue": f"{g['fg_pct'][i]:.1f}"},
+                    {"name": "3pt%", "displayValue": f"{g['fg3_pct'][i]:.1f}"},
+                    {"name": "fta", "displayValue": str(g["fta"][i])},
+                    {"name": "turnovers", "displayValue": str(g["turnovers"][i])},
+                    {"name": "offReb", "displayValue": str(g["off_reb"][i])},
+                    {"name": "rebounds", "displayValue": str(g["rebounds"][i])},
+                ],
+            }
+
+        return {"boxscore": {"teams": [team("home", 0), team("away", 1)]}}
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def inc(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def make_handler(slate: SimulatedSlate, args, stats: Stats):
+    rng = random.Random(args.seed + 1)
+    rng_lock = threading.Lock()
+
+    def roll() -> float:
+        with rng_lock:
+            return rng.random()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like ESPN's CDN
+
+        def log_message(self, *a):
+            pass
+
+        def _send_json(self, status: int, body: dict, extra_headers=None):
+            raw = json.dumps(body, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (extra_headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _send_payload(self, body: dict):
+            raw = json.dumps(body, separators=(",", ":")).encode()
+            etag = '"' + hashlib.sha1(raw).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                stats.inc("304")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            stats.inc("200")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+
+            if url.path == "/stats":
+                self._send_json(200, {
+                    "requests": stats.snapshot(),
+                    "halftime_started_utc": {
+                        g["id"]: datetime.fromtimestamp(slate.halftime_started_wall(g), tz=timezone.utc).isoformat()
+                        for g in slate.games
+                    },
+                })
+                return
+
+            if args.latency_ms > 0:
+                with rng_lock:
+                    delay = rng.expovariate(1.0 / args.latency_ms) / 1000.0
+                time.sleep(delay)
+
+            if roll() < args.rate_limit_rate:
+                stats.inc("429")
+                self._send_json(429, {"error": "rate limited"}, {"Retry-After": "5"})
+                return
+            if roll() < args.error_rate:
+                stats.inc("500")
+                self._send_json(500, {"error": "simulated failure"})
+                return
+
+            if url.path.endswith("/scoreboard"):
+                stats.inc("scoreboard")
+                self._send_payload(slate.scoreboard(time.time()))
+                return
+
+            if url.path.endswith("/summary"):
+                stats.inc("summary")
+                g = slate.by_id.get((query.get("event") or [""])[0])
+                if g is None:
+                    self._send_json(404, {"error": "unknown event"})
+                    return
+                self._send_payload(slate.summary(g))
+                return
+
+            self._send_json(404, {"error": "not found"})
+
+    return Handler
+
+
+def serve(args):
+    slate = SimulatedSlate(args.games, args.speed, args.window_minutes, args.lead_minutes, args.seed)
+    stats = Stats()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(slate, args, stats))
+    server.daemon_threads = True
+
+    last_tipoff = max(g["tipoff_sim_min"] for g in slate.games)
+    total_sim_min = last_tipoff + FIRST_HALF_MINUTES + HALFTIME_MINUTES + SECOND_HALF_MINUTES
+    print(f"Serving {len(slate.games)} games on http://{args.host}:{args.port} "
+          f"(speed x{args.speed}, slate ends in ~{total_sim_min * 60 / args.speed / 60:.1f} wall minutes)")
+    print(f"  ESPN_SCOREBOARD_URL=http://{args.host}:{args.port}/scoreboard")
+    print(f"  ESPN_SUMMARY_URL=http://{args.host}:{args.port}/summary")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Requests:", stats.snapshot())
+
+
+def report(args):
+    with urllib.request.urlopen(f"{args.url}/stats", timeout=10) as resp:
+        stats = json.loads(resp.read())
+
+    halftime_started = stats["halftime_started_utc"]
+
+    conn = sqlite3.connect(Path(args.db))
+    try:
+        rows = conn.execute("SELECT game_live_id, created_at_utc FROM predictions;").fetchall()
+    finally:
+        conn.close()
+
+    latencies = []
+    for game_live_id, created_at in rows:
+        started = halftime_started.get(game_live_id)
+        if not started or not created_at:
+            continue
+        delta = datetime.fromisoformat(created_at) - datetime.fromisoformat(started)
+        latencies.append(delta / timedelta(seconds=1))
+
+    print("\nStand-in Load Test Report")
+    print("-" * 50)
+    print(f"Requests: {stats['requests']}")
+    print(f"Predictions matched: {len(latencies)} / {len(halftime_started)} games")
+    if len(latencies) >= 2:
+        q = statistics.quantiles(latencies, n=100)
+        print(f"Halftime -> prediction latency (s): "
+              f"p50={q[49]:.2f} p95={q[94]:.2f} max={max(latencies):.2f}")
+    print("-" * 50)
+
+
+def main():
+    args = parse_args()
+    if args.command == "report":
+        report(args)
+    else:
+        serve(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+fit_logistic_baseline.py
+
+Fits a continuous halftime win-probability model on halftime_state:
+
+    logit P(home_win) = intercept + b_margin * halftime_margin
+                        + b_neutral * neutral_site + season_offset[season]
+
+by IRLS (Newton's method on the binomial log likelihood) in NumPy. Games
+are first collapsed to one row per (margin, neutral, season) with counts,
+so each iteration is a few small matrix products however many seasons
+are loaded. Season offsets get a ridge penalty (--season-ridge) so they
+shrink toward 0, which is what the live path uses for a season it has
+not seen.
+
+Unlike the margin buckets, every point of lead moves the probability.
+
+Writes the coefficient artifact (format "halftime-logit/v1") the poller
+loads from BASELINE_ARTIFACT and evaluates per game as a single exp()
+(LogisticCurve in app/baseline_curve.py):
+
+    python -m scripts.fit_logistic_baseline --db data/ncaa_mbb.db
+    python -m scripts.fit_logistic_baseline --holdout 2024 --dry-run
+
+--holdout SEASON also fits without that season and scores both the
+logistic model and the current bucket curve on it, out of sample.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.baseline_curve import BUILTIN_CURVE, LOGIT_FORMAT, BaselineCurve, LogisticCurve
+from app.config import CONFIG
+from scripts.backtest_confidence import summarize
+from scripts.smooth_baseline_probs import write_artifact
+
+FIXED_TERMS = ("intercept", "margin", "neutral")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fit a logistic halftime win-probability model")
+    parser.add_argument("--db", type=str, default="data/ncaa_mbb.db")
+    parser.add_argument("--seasons", type=int, nargs="*", default=None, help="Only these season years")
+    parser.add_argument("--season-ridge", type=float, default=10.0,
+                        help="L2 penalty on season offsets (0 = unpenalized)")
+    parser.add_argument("--weight", type=float, default=0.94,
+                        help="Constant baseline weight stored in the artifact "
+                             "(0.94 = the populated buckets' weight)")
+    parser.add_argument("--holdout", type=int, default=None, help="Season to score out of sample")
+    parser.add_argument("--buckets", type=str, default=None,
+                        help="Bucket artifact to compare against (default: built-in buckets)")
+    parser.add_argument("--max-iter", type=int, default=50)
+    parser.add_argument("--out", type=str, default=str(CONFIG.baseline_artifact_path),
+                        help="Artifact path (the poller's BASELINE_ARTIFACT)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the fit only, write nothing")
+    return parser.parse_args()
+
+
+def load_games(conn, seasons=None):
+    """halftime_state -> dict of numpy columns (margin, neutral, season, home_won)."""
+    sql = "SELECT season_year, halftime_margin, location, home_won FROM halftime_state"
+    params = ()
+    if seasons:
+        sql += f" WHERE season_year IN ({', '.join('?' for _ in seasons)})"
+        params = tuple(seasons)
+    rows = conn.execute(sql, params).fetchall()
+    if not rows:
+        return None
+
+    season, margin, location, home_won = zip(*rows)
+    return {
+        "season": np.asarray(season, dtype=np.int64),
+        "margin": np.asarray(margin, dtype=np.int64),
+        "neutral": np.asarray([loc == "neutral" for loc in location], dtype=np.int64),
+        "home_won": np.asarray(home_won, dtype=np.int64),
+    }
+
+
+def collapse(data):
+    """One row per distinct (margin, neutral, season): keys, games, wins."""
+    keys = np.stack([data["margin"], data["neutral"], data["season"]], axis=1)
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    games = np.bincount(inverse, minlength=len(unique)).astype(np.float64)
+    wins = np.bincount(inverse, weights=data["home_won"], minlength=len(unique))
+    return unique, games, wins
+
+
+def design(keys, seasons):
+    """[1, margin, neutral, one-hot season...] for collapsed keys."""
+    X = np.zeros((len(keys), len(FIXED_TERMS) + len(seasons)))
+    X[:, 0] = 1.0
+    X[:, 1] = keys[:, 0]
+    X[:, 2] = keys[:, 1]
+    for j, year in enumerate(seasons):
+        X[:, len(FIXED_TERMS) + j] = keys[:, 2] == year
+    return X
+
+
+def fit_irls(X, games, wins, penalty, max_iter=50, tol=1e-10):
+    """
+    Penalized binomial IRLS. Returns (beta, covariance, iterations).
+    penalty: per-coefficient L2 weights (0 = unpenalized).
+    """
+    beta = np.zeros(X.shape[1])
+    P = np.diag(penalty)
+    for iteration in range(1, max_iter + 1):
+        z = X @ beta
+        p = 0.5 * (1.0 + np.tanh(0.5 * z))
+        w = games * p * (1.0 - p)
+        hessian = X.T @ (X * w[:, None]) + P
+        gradient = X.T @ (wins - games * p) - P @ beta
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.max(np.abs(step)) < tol:
+            break
+    else:
+        print(f"[WARN] IRLS did not converge in {max_iter} iterations")
+    return beta, np.linalg.inv(hessian), iteration
+
+
+def fit(data, season_ridge: float, max_iter: int):
+    keys, games, wins = collapse(data)
+    seasons = sorted(int(s) for s in np.unique(keys[:, 2]))
+    X = design(keys, seasons)
+    penalty = np.r_[np.zeros(len(FIXED_TERMS)), np.full(len(seasons), season_ridge)]
+    if season_ridge <= 0:
+        # unpenalized offsets are collinear with the intercept; drop one
+        X, seasons, penalty = X[:, :-1], seasons[:-1], penalty[:-1]
+    beta, cov, iterations = fit_irls(X, games, wins, penalty, max_iter)
+    return beta, np.sqrt(np.diag(cov)), seasons, iterations, len(keys)
+
+
+def to_curve(beta, seasons, weight, version="fit") -> LogisticCurve:
+    coefficients = dict(zip(FIXED_TERMS, beta[:len(FIXED_TERMS)].tolist()))
+    offsets = dict(zip(seasons, beta[len(FIXED_TERMS):].tolist()))
+    return LogisticCurve(coefficients, offsets, weight=weight, version=version)
+
+
+def load_buckets(path):
+    if path and Path(path).exists():
+        return BaselineCurve.from_artifact(Path(path))
+    return BUILTIN_CURVE
+
+
+def _score(curve, data, use_season=True):
+    p, _ = curve.lookup_batch(data["margin"], data["neutral"], data["season"] if use_season else None)
+    return summarize(p, data["home_won"])
+
+
+def print_scores(title, rows):
+    print(f"\n{title}")
+    print("-" * 60)
+    print(f"{'Model':>16} | {'Games':>7} | {'Accuracy':>8} | {'Brier':>7} | {'LogLoss':>7}")
+    print("-" * 60)
+    for label, (n, acc, brier, ll) in rows:
+        print(f"{label:>16} | {n:>7} | {acc:>8.3f} | {brier:>7.4f} | {ll:>7.4f}")
+
+
+def print_curve(curve, buckets, data):
+    print("\nP(home win) by halftime margin (no season offset)")
+    print("-" * 70)
+    print(f"{'Margin':>6} | {'Games':>6} | {'Actual':>7} | {'Logit':>7} | {'Neutral':>7} | {'Buckets':>7}")
+    print("-" * 70)
+    for margin in range(-20, 21, 2):
+        m = (data["margin"] == margin) & (data["neutral"] == 0)
+        n = int(m.sum())
+        actual = f"{data['home_won'][m].mean():>7.3f}" if n else f"{'-':>7}"
+        print(
+            f"{margin:>6} | {n:>6} | {actual} | {curve.lookup(margin)[0]:>7.3f} | "
+            f"{curve.lookup(margin, neutral=True)[0]:>7.3f} | {buckets.lookup(margin)[0]:>7.3f}"
+        )
+
+
+def build_artifact(beta, se, seasons, iterations, data, args) -> dict:
+    coefficients = dict(zip(FIXED_TERMS, beta[:len(FIXED_TERMS)].tolist()))
+    offsets = {str(s): v for s, v in zip(seasons, beta[len(FIXED_TERMS):].tolist())}
+    digest = hashlib.sha256(json.dumps([coefficients, offsets]).encode("utf-8")).hexdigest()[:8]
+    created = datetime.now(timezone.utc).replace(microsecond=0)
+    return {
+        "format": LOGIT_FORMAT,
+        "version": f"logit-{created.strftime('%Y%m%dT%H%M%SZ')}-{digest}",
+        "created_at_utc": created.isoformat(),
+        "source": {"db": str(args.db), "table": "halftime_state", "games": int(len(data["margin"])),
+                   "seasons": sorted(int(s) for s in np.unique(data["season"]))},
+        "season_ridge": args.season_ridge,
+        "iterations": iterations,
+        "weight": args.weight,
+        "coefficients": coefficients,
+        "standard_errors": dict(zip(FIXED_TERMS, se[:len(FIXED_TERMS)].tolist())),
+        "season_offsets": offsets,
+    }
+
+
+def main():
+    args = parse_args()
+    conn = sqlite3.connect(Path(args.db))
+    try:
+        data = load_games(conn, args.seasons)
+    finally:
+        conn.close()
+    if data is None:
+        raise SystemExit("No games in halftime_state; nothing fitted.")
+
+    beta, se, seasons, iterations, cells = fit(data, args.season_ridge, args.max_iter)
+    curve = to_curve(beta, seasons, args.weight)
+    buckets = load_buckets(args.buckets)
+
+    print(f"\nLogistic fit: {len(data['margin'])} games in {cells} (margin, site, season) cells, "
+          f"{iterations} IRLS iterations")
+    print("-" * 44)
+    print(f"{'Term':>12} | {'Coef':>9} | {'SE':>7} | {'z':>7}")
+    print("-" * 44)
+    for j, term in enumerate(FIXED_TERMS):
+        print(f"{term:>12} | {beta[j]:>9.4f} | {se[j]:>7.4f} | {beta[j] / se[j]:>7.1f}")
+    for j, season in enumerate(seasons, start=len(FIXED_TERMS)):
+        print(f"{season:>12} | {beta[j]:>9.4f} | {se[j]:>7.4f} | {beta[j] / se[j]:>7.1f}")
+
+    print_curve(curve, buckets, data)
+    print_scores("In sample", [
+        ("logit", _score(curve, data)),
+        ("logit, no season", _score(curve, data, use_season=False)),
+        ("buckets", _score(buckets, data)),
+    ])
+
+    if args.holdout is not None:
+        test = data["season"] == args.holdout
+        if not test.any() or test.all():
+            raise SystemExit(f"--holdout {args.holdout}: need games in and outside that season")
+        split = lambda m: {k: v[m] for k, v in data.items()}
+        hb, _, hs, _, _ = fit(split(~test), args.season_ridge, args.max_iter)
+        held = to_curve(hb, hs, args.weight)
+        print_scores(f"Held-out season {args.holdout} (fit without it)", [
+            ("logit", _score(held, split(test))),
+            ("buckets", _score(buckets, split(test))),
+        ])
+
+    if args.dry_run:
+        return
+    artifact = build_artifact(beta, se, seasons, iterations, data, args)
+    write_artifact(artifact, Path(args.out))
+    print(f"\nWrote {args.out} (version {artifact['version']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,30 @@
 """
 smooth_baseline_probs.py
 
-Applies shrinkage smoothing to baseline halftime probabilities.
+Applies shrinkage smoothing to baseline halftime probabilities and writes
+the versioned baseline artifact the live poller loads (and hot-reloads):
+
+    python -m scripts.smooth_baseline_probs --db data/ncaa_mbb.db --out data/baseline_probs.json
+
+Artifact (JSON, format "halftime-baseline/v1"): dense per-integer-margin
+"p" / "weight" arrays over min_margin..max_margin, plus the per-bucket
+fit (games, raw, smoothed, k) and metadata (version, created_at_utc,
+source db, prior). Unless --no-grid, the artifact also carries the
+precomputed confidence grid for the current confidence params (see
+scripts/build_confidence_grid.py).
 """
 
+import hashlib
+import json
+import os
 import sqlite3
+from datetime import datetime, timezone
 from pathlib import Path
 import argparse
 
+from app.baseline_curve import ARTIFACT_FORMAT, MAX_MARGIN, MIN_MARGIN, attach_confidence_grid, dense_from_buckets
+from app.config import CONFIG
+
 PRIOR_PROB = 0.50  # explicit prior
 
 BUCKETS = [
@@ -26,11 +43,20 @@ BUCKETS = [
 def parse_args():
     parser = argparse.ArgumentParser(description="Smooth baseline halftime probabilities")
     parser.add_argument("--db", type=str, default="data/ncaa_mbb.db")
+    parser.add_argument("--out", type=str, default=str(CONFIG.baseline_artifact_path),
+                        help="Artifact path (the poller's BASELINE_ARTIFACT)")
+    parser.add_argument("--no-grid", action="store_true", help="Do not embed the confidence grid")
+    parser.add_argument("--dry-run", action="store_true", help="Print the table only, write nothing")
     return parser.parse_args()
 
 
 def smooth_probs(conn):
+    """
+    Prints the smoothing table; returns the fitted buckets as
+    [{low, high, games, raw_p, p, weight, k}] (empty buckets are skipped).
+    """
     cursor = conn.cursor()
+    fitted = []
 
     print("\nSmoothed Baseline Halftime Probabilities")
     print("-" * 85)
@@ -76,6 +102,16 @@ def smooth_probs(conn):
         # Defensive clamp
         smoothed = max(0.0, min(1.0, smoothed))
 
+        fitted.append({
+            "low": low,
+            "high": high,
+            "games": games,
+            "raw_p": raw_prob,
+            "p": round(smoothed, 4),
+            "weight": round(weight, 2),
+            "k": k,
+        })
+
         print(
             f"{f'{low} to {high}':>10} | "
             f"{games:>7} | "
@@ -85,16 +121,59 @@ def smooth_probs(conn):
         )
 
     print("-" * 85)
+    return fitted
+
+
+def build_artifact(buckets, db_path: str) -> dict:
+    # same rounding as the hand-copied BASELINE_HALFTIME_PROBS table
+    p, weight = dense_from_buckets(buckets, MIN_MARGIN, MAX_MARGIN)
+
+    digest = hashlib.sha256(json.dumps([p, weight]).encode("utf-8")).hexdigest()[:8]
+    created = datetime.now(timezone.utc).replace(microsecond=0)
+
+    return {
+        "format": ARTIFACT_FORMAT,
+        "version": f"{created.strftime('%Y%m%dT%H%M%SZ')}-{digest}",
+        "created_at_utc": created.isoformat(),
+        "source": {"db": str(db_path), "table": "halftime_state_capped",
+                   "games": sum(b["games"] for b in buckets)},
+        "prior": PRIOR_PROB,
+        "min_margin": MIN_MARGIN,
+        "max_margin": MAX_MARGIN,
+        "buckets": buckets,
+        "p": p,
+        "weight": weight,
+    }
+
+
+def write_artifact(artifact: dict, out: Path) -> None:
+    # write-then-rename: a hot-reloading poller never reads a partial file
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(artifact, fh, indent=2)
+    os.replace(tmp, out)
 
 
 def main():
     args = parse_args()
     conn = sqlite3.connect(Path(args.db))
     try:
-        smooth_probs(conn)
+        buckets = smooth_probs(conn)
     finally:
         conn.close()
 
+    if args.dry_run:
+        return
+    if not buckets:
+        raise SystemExit("No games in halftime_state_capped; artifact not written.")
+
+    artifact = build_artifact(buckets, args.db)
+    if not args.no_grid:
+        attach_confidence_grid(artifact)
+    write_artifact(artifact, Path(args.out))
+    print(f"Wrote {args.out} (version {artifact['version']})")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
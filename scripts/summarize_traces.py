@@ -0,0 +1,93 @@
+"""
+summarize_traces.py
+
+Summarizes halftime alert traces written by the poller (--trace FILE) into
+p50 / p95 / p99 per span.
+
+For each span two latencies are reported:
+  duration  how long the span itself took
+  done at   when it finished, measured from the scoreboard request that
+            first showed the game at HALFTIME (at_ms + duration_ms)
+
+end_to_end "done at" is the halftime -> last SMS latency per game.
+
+Usage:
+    python scripts/summarize_traces.py data/traces/halftime.jsonl
+    python scripts/summarize_traces.py data/traces/*.jsonl --since 2025-01-18
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+# pipeline order; unknown spans are listed after these
+SPAN_ORDER = ["detect", "summary_fetch", "confidence", "simulate", "prediction_insert", "send_sms", "end_to_end"]
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def load_spans(paths, since=None):
+    for path in paths:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    span = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since and span.get("ts", "") < since:
+                    continue
+                yield span
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p95/p99 per halftime alert span")
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--since", type=str, default=None, help="Only spans with ts >= this UTC ISO prefix")
+    args = parser.parse_args()
+
+    durations = defaultdict(list)
+    done_at = defaultdict(list)
+    traces = set()
+    sms_failures = 0
+    outcomes = defaultdict(int)
+
+    for span in load_spans(args.paths, args.since):
+        name = span["span"]
+        traces.add(span["trace"])
+        durations[name].append(span["duration_ms"])
+        done_at[name].append(span["at_ms"] + span["duration_ms"])
+        if name == "send_sms" and span.get("ok") is False:
+            sms_failures += 1
+        if name == "end_to_end":
+            outcomes[span.get("outcome", "unknown")] += 1
+
+    if not traces:
+        print("No spans found.")
+        return
+
+    names = [n for n in SPAN_ORDER if n in durations] + sorted(set(durations) - set(SPAN_ORDER))
+
+    print(f"{len(traces)} traces, outcomes: {dict(outcomes)}, SMS failures: {sms_failures}\n")
+    header = f"{'span':<18}{'n':>6}  {'duration p50/p95/p99 (ms)':>30}  {'done at p50/p95/p99 (ms)':>30}"
+    print(header)
+    print("-" * len(header))
+    for name in names:
+        d = durations[name]
+        t = done_at[name]
+        dur = "/".join(f"{percentile(d, q):.1f}" for q in (0.50, 0.95, 0.99))
+        done = "/".join(f"{percentile(t, q):.1f}" for q in (0.50, 0.95, 0.99))
+        print(f"{name:<18}{len(d):>6}  {dur:>30}  {done:>30}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+sweep_confidence_params.py
+
+Grid search over the confidence model's knobs (app/confidence_model.py
+ConfidenceParams: HQS weights, disagreement factor, shooting penalty and
+thresholds, strength boost, HIGH / MEDIUM cutoffs) on historical halftimes.
+
+The feature matrix is built once (both teams' first-half stats, baseline p
+and weight, margin, whether the baseline pick was right, season)
+and placed in shared memory; a process pool scores every combination
+against that one copy with compute_confidence_batch, so swept confidence
+is what the poller would compute. Combinations that differ only in the cutoffs reuse
+the same confidence vector.
+
+Features come from halftime_state when it carries first-half stat columns
+(home_<field> / away_<field>), otherwise from resolved predictions whose
+explanation_json recorded first_half_stats.
+
+Reports the Pareto front of alert hit rate vs alert volume (MEDIUM+ alerts)
+and writes the chosen point as a params file the poller loads at startup
+(CONFIG.confidence_params_path / CONFIDENCE_PARAMS):
+
+    python -m scripts.sweep_confidence_params --db data/ncaa_mbb.db
+    python -m scripts.sweep_confidence_params --grid grid.json --min-alerts-per-season 400 --workers 8
+
+grid.json maps ConfidenceParams fields to lists of values; fields left out
+stay at the current params.
+
+Note: the baseline pick (p >= 0.5) does not depend on these params, so the
+sweep tunes *which* games alert, not who is picked.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from app.confidence_model import (
+    CONFIDENCE_PARAMS,
+    PARAMS_FORMAT,
+    STAT_FIELDS,
+    ConfidenceParams,
+    compute_confidence_batch,
+)
+from app.config import CONFIG
+from scripts.backtest_confidence import load_curve, load_history
+from scripts.smooth_baseline_probs import write_artifact
+
+# feature matrix columns
+HOME_COLUMNS = tuple(f"home_{f}" for f in STAT_FIELDS)
+AWAY_COLUMNS = tuple(f"away_{f}" for f in STAT_FIELDS)
+COLUMNS = HOME_COLUMNS + AWAY_COLUMNS + ("p", "weight", "margin", "correct", "season")
+COL = {name: i for i, name in enumerate(COLUMNS)}
+
+CUTOFF_FIELDS = ("medium_cutoff", "high_cutoff")
+
+DEFAULT_GRID = {
+    "fg_weight": [0.20, 0.30, 0.40],
+    "fg3_weight": [0.05, 0.15, 0.25],
+    "to_weight": [0.10, 0.20, 0.30],
+    "orb_weight": [0.10, 0.15, 0.20],
+    "reb_weight": [0.05, 0.10, 0.15],
+    "ft_weight": [0.05, 0.10, 0.15],
+    "disagreement_factor": [0.4, 0.6, 0.8],
+    "shooting_penalty": [0.70, 0.85, 1.00],
+    "medium_cutoff": [0.08, 0.10, 0.12, 0.14],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sweep confidence model params over historical halftimes")
+    parser.add_argument("--db", type=str, default="data/ncaa_mbb.db")
+    parser.add_argument("--artifact", type=str, default=str(CONFIG.baseline_artifact_path),
+                        help="Baseline curve used for p / margin-only confidence")
+    parser.add_argument("--source", choices=("auto", "halftime_state", "predictions"), default="auto")
+    parser.add_argument("--seasons", type=int, nargs="*", default=None)
+    parser.add_argument("--grid", type=str, default=None, help="JSON {field: [values]} (default: built-in grid)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=64, help="Combinations per task")
+    parser.add_argument("--min-alerts-per-season", type=float, default=None,
+                        help="Pick the best hit rate with at least this many alerts per season "
+                             "(default: the current params' volume)")
+    parser.add_argument("--top", type=int, default=25, help="Pareto rows to print")
+    parser.add_argument("--out", type=str, default=str(CONFIG.confidence_params_path))
+    parser.add_argument("--dry-run", action="store_true", help="Report only, write nothing")
+    return parser.parse_args()
+
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+
+def build_features(history, curve) -> np.ndarray:
+    season, margin, home_won, neutral, home, away = history
+    p, weight = curve.lookup_batch(margin, neutral, season)
+
+    features = np.empty((len(margin), len(COLUMNS)), dtype=np.float64)
+    for field in STAT_FIELDS:
+        features[:, COL[f"home_{field}"]] = home[field]
+        features[:, COL[f"away_{field}"]] = away[field]
+    features[:, COL["p"]] = p
+    features[:, COL["weight"]] = weight
+    features[:, COL["margin"]] = margin
+    features[:, COL["correct"]] = (p >= 0.5).astype(np.int64) == home_won
+    features[:, COL["season"]] = season
+    return features
+
+
+# ---------------------------------------------------------------------------
+# Workers (read the shared matrix; nothing is pickled per task but params)
+# ---------------------------------------------------------------------------
+
+_SHM = None
+_FEATURES = None
+
+
+def _attach(name: str, shape, dtype: str):
+    global _SHM, _FEATURES
+    _SHM = shared_memory.SharedMemory(name=name)
+    _FEATURES = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_SHM.buf)
+
+
+def _confidence(features: np.ndarray, params: ConfidenceParams) -> np.ndarray:
+    """compute_confidence_batch on the feature columns, so swept values are the poller's exactly."""
+    home = {f: features[:, COL[f"home_{f}"]] for f in STAT_FIELDS}
+    away = {f: features[:, COL[f"away_{f}"]] for f in STAT_FIELDS}
+    return compute_confidence_batch(
+        features[:, COL["p"]], features[:, COL["weight"]], features[:, COL["margin"]], home, away, params,
+    )["confidence"]
+
+
+def evaluate(features: np.ndarray, params: ConfidenceParams, cutoffs) -> list:
+    """
+    Scores one set of model params under every (medium, high) cutoff pair.
+    Returns [(params, metrics)] for each pair.
+    """
+    confidence = _confidence(features, params)
+    correct = features[:, COL["correct"]]
+    seasons = len(np.unique(features[:, COL["season"]]))
+
+    out = []
+    for medium, high in cutoffs:
+        alert = confidence >= medium
+        top = confidence >= high
+        alerts, highs = int(alert.sum()), int(top.sum())
+        metrics = {
+            "alerts": alerts,
+            "alerts_per_season": alerts / seasons,
+            "hit_rate": float(correct[alert].mean()) if alerts else None,
+            "high_alerts": highs,
+            "high_hit_rate": float(correct[top].mean()) if highs else None,
+        }
+        out.append((ConfidenceParams(**{**params.to_dict(), "medium_cutoff": medium, "high_cutoff": high}), metrics))
+    return out
+
+
+def _evaluate_chunk(task):
+    combos, cutoffs = task
+    results = []
+    for params in combos:
+        results.extend(evaluate(_FEATURES, params, cutoffs))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Grid, front, selection
+# ---------------------------------------------------------------------------
+
+def load_grid(path):
+    if path is None:
+        return dict(DEFAULT_GRID)
+    with open(path, encoding="utf-8") as fh:
+        grid = json.load(fh)
+    ConfidenceParams.from_dict({k: v[0] for k, v in grid.items()})  # rejects unknown fields
+    return grid
+
+
+def expand_grid(grid, base: ConfidenceParams):
+    """-> (model param combinations, [(medium, high)] cutoff pairs)."""
+    model_fields = [k for k in grid if k not in CUTOFF_FIELDS]
+    combos = [
+        ConfidenceParams(**{**base.to_dict(), **dict(zip(model_fields, values))})
+        for values in itertools.product(*(grid[k] for k in model_fields))
+    ]
+    mediums = grid.get("medium_cutoff", [base.medium_cutoff])
+    highs = grid.get("high_cutoff", [base.high_cutoff])
+    cutoffs = [(m, h) for m in mediums for h in highs if h >= m]
+    return combos, cutoffs
+
+
+def pareto_front(results):
+    """Non-dominated points: no other point has more alerts and a higher hit rate."""
+    ranked = sorted(
+        (r for r in results if r[1]["hit_rate"] is not None),
+        key=lambda r: (-r[1]["alerts"], -r[1]["hit_rate"]),
+    )
+    front, best = [], -1.0
+    for r in ranked:
+        if r[1]["hit_rate"] > best:
+            front.append(r)
+            best = r[1]["hit_rate"]
+    return front
+
+
+def choose(front, min_alerts_per_season: float):
+    eligible = [r for r in front if r[1]["alerts_per_season"] >= min_alerts_per_season]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda r: (r[1]["hit_rate"], r[1]["alerts"]))
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def describe(params: ConfidenceParams, base: ConfidenceParams) -> str:
+    changed = {k: v for k, v in params.to_dict().items() if v != getattr(base, k)}
+    return " ".join(f"{k}={v:g}" for k, v in changed.items()) or "(current)"
+
+
+def print_front(front, base, total, top):
+    print(f"\nPareto front: alert hit rate vs volume ({len(front)} points)")
+    print("-" * 100)
+    print(f"{'Alerts':>7} | {'/season':>7} | {'Share':>6} | {'Hit rate':>8} | {'HIGH':>6} | {'HIGH hit':>8} | Params vs current")
+    print("-" * 100)
+    step = max(1, len(front) // top)
+    for params, m in front[::step]:
+        print(
+            f"{m['alerts']:>7} | {m['alerts_per_season']:>7.1f} | {m['alerts'] / total:>6.1%} | "
+            f"{_fmt(m['hit_rate'], '8.3f')} | {m['high_alerts']:>6} | {_fmt(m['high_hit_rate'], '8.3f')} | "
+            f"{describe(params, base)}"
+        )
+
+
+def build_params_file(params, metrics, current_metrics, source: dict) -> dict:
+    digest = hashlib.sha256(json.dumps(params.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    created = datetime.now(timezone.utc).replace(microsecond=0)
+    return {
+        "format": PARAMS_FORMAT,
+        "version": f"{created.strftime('%Y%m%dT%H%M%SZ')}-{digest}",
+        "created_at_utc": created.isoformat(),
+        "source": source,
+        "params": params.to_dict(),
+        "metrics": metrics,
+        "current_metrics": current_metrics,
+    }
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+
+    history, source = load_history(args.db, args.source, args.seasons)
+    if history is None:
+        raise SystemExit(
+            f"No games with first-half stats in {source} "
+            "(halftime_state has no stat columns and no resolved predictions recorded first_half_stats)."
+        )
+
+    curve = load_curve(Path(args.artifact))
+    features = build_features(history, curve)
+    base = CONFIDENCE_PARAMS
+    grid = load_grid(args.grid)
+    combos, cutoffs = expand_grid(grid, base)
+    n_points = len(combos) * len(cutoffs)
+
+    print(f"{len(features)} games from {source}, baseline {curve.version}; "
+          f"{n_points} combinations ({len(combos)} models x {len(cutoffs)} cutoff pairs), {args.workers} workers")
+
+    current = evaluate(features, base, [(base.medium_cutoff, base.high_cutoff)])[0][1]
+
+    shm = shared_memory.SharedMemory(create=True, size=features.nbytes)
+    try:
+        np.ndarray(features.shape, dtype=features.dtype, buffer=shm.buf)[:] = features
+        tasks = [(combos[i:i + args.chunk], cutoffs) for i in range(0, len(combos), args.chunk)]
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_attach,
+            initargs=(shm.name, features.shape, features.dtype.str),
+        ) as pool:
+            for chunk in pool.map(_evaluate_chunk, tasks):
+                results.extend(chunk)
+    finally:
+        shm.close()
+        shm.unlink()
+    swept = time.perf_counter()
+
+    front = pareto_front(results)
+    print(f"\nCurrent params: {current['alerts']} alerts ({current['alerts_per_season']:.1f}/season), "
+          f"hit rate {_fmt(current['hit_rate'], '.3f')}")
+    print_front(front, base, len(features), args.top)
+
+    floor = args.min_alerts_per_season
+    if floor is None:
+        floor = current["alerts_per_season"]
+    chosen = choose(front, floor)
+    print(f"\nSwept {len(results)} points in {swept - started:.1f}s")
+
+    if chosen is None:
+        raise SystemExit(f"No front point with >= {floor:.1f} alerts per season; nothing written.")
+
+    params, metrics = chosen
+    print(f"Chosen (>= {floor:.1f} alerts/season): {metrics['alerts']} alerts, "
+          f"hit rate {metrics['hit_rate']:.3f}; {describe(params, base)}")
+
+    if args.dry_run:
+        return
+    out = build_params_file(params, metrics, current, {
+        "db": str(args.db), "table": source, "games": len(features),
+        "baseline_version": curve.version, "combinations": n_points,
+    })
+    write_artifact(out, Path(args.out))
+    print(f"Wrote {args.out} (version {out['version']}); restart the poller to use it")
+
+
+if __name__ == "__main__":
+    main()
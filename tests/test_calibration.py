@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+from app.calibration import (
+    ensure_calibration_schema,
+    get_margin_counts,
+    recalibrate,
+    record_resolution,
+)
+from app.config import CONFIG
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    ensure_calibration_schema(conn)
+    return conn
+
+
+def resolve(conn, version, margin=7, baseline_prob=0.6, bucket="HIGH", home_win=1, season=2025):
+    record_resolution(
+        conn, season_year=season, baseline_version=version, halftime_margin=margin,
+        baseline_prob=baseline_prob, bucket=bucket, predicted_prob=baseline_prob,
+        home_win=home_win, prediction_correct=home_win,
+    )
+
+
+def bucket_rows(conn, season=2025):
+    return {
+        (version, key): resolved
+        for version, key, resolved in conn.execute(
+            "SELECT baseline_version, key, resolved FROM calibration_state "
+            "WHERE kind = 'bucket' AND season_year = ?;",
+            (season,),
+        )
+    }
+
+
+def test_counts_are_kept_per_baseline_version(conn):
+    for _ in range(4):
+        resolve(conn, "v1")
+    resolve(conn, "v2", home_win=0)
+    resolve(conn, "v2", margin=-3, bucket="LOW")
+    resolve(conn, "v1", season=2024)
+
+    assert get_margin_counts(conn, 2025, "v1", 7) == (4, 4, pytest.approx(2.4))
+    assert get_margin_counts(conn, 2025, "v2", 7) == (1, 0, pytest.approx(0.6))
+    assert get_margin_counts(conn, 2025, "v2", -3) == (1, 1, pytest.approx(0.6))
+    assert get_margin_counts(conn, 2025, "v3", 7) is None
+    assert bucket_rows(conn) == {("v1", "HIGH"): 4, ("v2", "HIGH"): 1, ("v2", "LOW"): 1}
+    assert bucket_rows(conn, 2024) == {("v1", "HIGH"): 1}
+
+
+def test_predictions_without_a_version_only_count_by_bucket(conn):
+    resolve(conn, None)
+    resolve(conn, "v1", margin=None)
+
+    assert conn.execute("SELECT COUNT(*) FROM calibration_state WHERE kind = 'margin';").fetchone()[0] == 0
+    assert bucket_rows(conn) == {("", "HIGH"): 1, ("v1", "HIGH"): 1}
+
+
+@pytest.mark.skipif(not CONFIG.online_calibration, reason="ONLINE_CALIBRATION=0")
+def test_recalibrate_only_uses_the_same_curve(conn):
+    for _ in range(4):
+        resolve(conn, "v1")
+
+    p, shift, resolved = recalibrate(conn, 2025, 7, 0.6, "v1")
+    # gap 0.4 over 4 games, shrunk by 4 / (4 + prior)
+    assert resolved == 4
+    assert shift == pytest.approx(0.4 * 4 / (4 + CONFIG.calibration_prior_games))
+    assert p == pytest.approx(0.6 + shift)
+
+    assert recalibrate(conn, 2025, 7, 0.6, "v2") == (0.6, 0.0, 0)
+
+
+def test_old_layout_migrates_under_the_empty_version():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE calibration_state (
+            season_year INTEGER NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL,
+            resolved INTEGER NOT NULL DEFAULT 0, home_wins INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0, sum_predicted REAL NOT NULL DEFAULT 0,
+            updated_at_utc TEXT NOT NULL,
+            PRIMARY KEY (season_year, kind, key)
+        );
+        """
+    )
+    conn.execute("INSERT INTO calibration_state VALUES (2025, 'margin', '7', 10, 8, 8, 6.0, 'x');")
+    conn.commit()
+
+    ensure_calibration_schema(conn)
+    assert get_margin_counts(conn, 2025, "", 7) == (10, 8, 6.0)
+    assert get_margin_counts(conn, 2025, "v1", 7) is None
@@ -0,0 +1,129 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.confidence_model import (
+    DEFAULT_PARAMS,
+    STAT_FIELDS,
+    ConfidenceGrid,
+    _safe_float,
+    compute_confidence_batch,
+    compute_confidence_with_stats,
+    compute_halftime_quality,
+    confidence_from_quality,
+    stats_to_arrays,
+)
+
+# what extract_first_half_team_stats can hand over, plus junk
+STAT_VALUES = ["45.5%", "0.455", "12", 7, 31.0, "", "--", None, "nan", "inf", "-inf", "nan%", float("nan")]
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "nan%", "inf%", float("nan"), float("inf")])
+def test_safe_float_rejects_non_finite(value):
+    assert _safe_float(value) is None
+
+
+@pytest.mark.parametrize("value, expected", [("45.5%", 0.455), ("12", 12.0), (7, 7.0), ("--", None), (None, None)])
+def test_safe_float_parses(value, expected):
+    assert _safe_float(value) == expected
+
+
+def _random_team(rng):
+    team = {}
+    for field in STAT_FIELDS:
+        if rng.random() < 0.1:
+            continue  # field missing altogether
+        if rng.random() < 0.5:
+            team[field] = rng.choice(STAT_VALUES)
+        elif field.endswith("_pct"):
+            team[field] = f"{rng.uniform(20, 70):.1f}%"
+        else:
+            team[field] = str(rng.randint(0, 25))
+    return team
+
+
+def test_batch_matches_scalar_bit_for_bit():
+    rng = random.Random(7)
+    n = 5000
+    home = [_random_team(rng) for _ in range(n)]
+    away = [_random_team(rng) for _ in range(n)]
+    margin = np.array([rng.randint(-25, 25) for _ in range(n)])
+    p = np.array([rng.uniform(0.05, 0.95) for _ in range(n)])
+    weight = np.array([rng.uniform(0.3, 1.0) for _ in range(n)])
+
+    batch = compute_confidence_batch(p, weight, margin, stats_to_arrays(home), stats_to_arrays(away))
+
+    for i in range(n):
+        quality = compute_halftime_quality(home[i], away[i])
+        confidence = compute_confidence_with_stats(p[i], weight[i], int(margin[i]), home[i], away[i])
+        assert math.isfinite(confidence)
+        assert confidence == batch["confidence"][i]
+        assert quality["hqs"] == batch["hqs"][i]
+        assert quality["shooting_extreme"] == bool(batch["shooting_extreme"][i])
+
+
+MIN_MARGIN = -20
+
+
+@pytest.fixture(scope="module")
+def grid():
+    margins = np.arange(MIN_MARGIN, 21)
+    p = 1.0 / (1.0 + np.exp(-0.17 * margins))
+    weight = np.linspace(0.4, 0.9, len(margins))
+    return ConfidenceGrid.build(p, weight, MIN_MARGIN, DEFAULT_PARAMS, hqs_step=0.01), p, weight
+
+
+def exact(p, weight, margin, hqs, extreme):
+    i = min(max(margin - MIN_MARGIN, 0), len(p) - 1)
+    return confidence_from_quality(p[i], weight[i], margin, hqs, extreme, DEFAULT_PARAMS)
+
+
+def test_grid_saturates_on_a_node(grid):
+    grid, _, _ = grid
+    saturation = DEFAULT_PARAMS.boost_cap / DEFAULT_PARAMS.boost_scale
+    assert grid.hqs_step <= 0.01
+    assert grid.hqs_max == pytest.approx(saturation, abs=1e-12)
+
+
+def test_grid_lookup_matches_formula_at_nodes(grid):
+    grid, p, weight = grid
+    for margin in (-20, -7, -1, 0, 1, 7, 20):
+        for hqs in grid.hqs_nodes():
+            for extreme in (False, True):
+                expected = exact(p, weight, margin, float(hqs), extreme)
+                assert grid.lookup(margin, float(hqs), extreme) == expected
+                assert grid.lookup(margin, float(hqs), extreme, interpolate=False) == expected
+
+
+def test_grid_lookup_matches_formula_between_nodes(grid):
+    grid, p, weight = grid
+    rng = np.random.default_rng(11)
+    margins = rng.integers(-25, 26, size=5000)  # past both ends of the curve too
+    hqs = rng.uniform(-grid.hqs_max, grid.hqs_max, size=5000)
+    midpoints = (np.arange(grid.n) + 0.5) * grid.hqs_step
+    hqs[:2 * grid.n] = np.concatenate([midpoints, -midpoints])
+    extreme = rng.random(5000) < 0.3
+
+    expected = [exact(p, weight, int(m), float(h), bool(e)) for m, h, e in zip(margins, hqs, extreme)]
+    looked_up = [grid.lookup(int(m), float(h), bool(e)) for m, h, e in zip(margins, hqs, extreme)]
+    assert looked_up == expected
+    assert grid.lookup_batch(margins, hqs, extreme).tolist() == expected
+
+
+@pytest.mark.parametrize("scale", [1.0, 1.0 + 1e-9, 1.5, 10.0])
+def test_grid_lookup_matches_formula_at_and_past_saturation(grid, scale):
+    grid, p, weight = grid
+    for margin in (-9, 0, 4):
+        for side in (1, -1):
+            hqs = side * grid.hqs_max * scale
+            for extreme in (False, True):
+                assert grid.lookup(margin, hqs, extreme) == exact(p, weight, margin, hqs, extreme)
+
+
+def test_grid_round_trips_through_its_dict(grid):
+    grid, _, _ = grid
+    loaded = ConfidenceGrid.from_dict(grid.to_dict())
+    assert loaded.lookup(7, 0.123, False) == grid.lookup(7, 0.123, False)
+    assert loaded.hqs_step == grid.hqs_step
@@ -0,0 +1,120 @@
+import sqlite3
+
+import numpy as np
+
+from app.db_live import GameStatus, LiveGame, ensure_daily_games_schema, upsert_daily_games
+from app.live_state import NO_SCORE, ScoreboardSnapshot, ScoreboardStateCache
+from app.sources.espn import parse_scoreboard
+
+
+def game(game_live_id, status=GameStatus.LIVE, home=30, away=28, start="2025-01-18T17:00:00+00:00"):
+    return LiveGame(game_live_id, "2025-01-18", start, status, "Home", "Away", "1", "2", home, away)
+
+
+def changed_ids(cache, games):
+    return [g.game_live_id for g in cache.changed(games)]
+
+
+def test_only_new_or_changed_games_are_returned():
+    cache = ScoreboardStateCache()
+    slate = [game("1"), game("2"), game("3", GameStatus.PRE, None, None)]
+    assert changed_ids(cache, slate) == ["1", "2", "3"]
+    cache.update(slate)
+    assert changed_ids(cache, slate) == []
+
+    slate[1] = game("2", home=32)
+    slate[2] = game("3", GameStatus.PRE, None, None, start="2025-01-18T17:30:00+00:00")
+    assert changed_ids(cache, slate) == ["2", "3"]
+
+
+def test_games_added_to_the_slate_are_changed_until_written():
+    cache = ScoreboardStateCache()
+    slate = [game("1"), game("2")]
+    cache.update(slate)
+    assert changed_ids(cache, slate) == []
+
+    grown = slate + [game("4"), game("5", GameStatus.HALFTIME)]
+    assert changed_ids(cache, grown) == ["4", "5"]
+    # not written yet (e.g. the cycle's transaction failed): still changed next poll
+    assert changed_ids(cache, grown) == ["4", "5"]
+
+    cache.update(cache.changed(grown))
+    assert changed_ids(cache, grown) == []
+    assert cache.previous_status("5") == GameStatus.HALFTIME
+    assert len(cache) == 4
+
+
+def test_games_removed_from_the_slate_do_not_disturb_the_rest():
+    cache = ScoreboardStateCache()
+    slate = [game("1"), game("2"), game("3")]
+    cache.update(slate)
+
+    shrunk = [slate[0], game("3", GameStatus.HALFTIME)]
+    assert changed_ids(cache, shrunk) == ["3"]
+    cache.update(cache.changed(shrunk))
+    assert changed_ids(cache, shrunk) == []
+
+    # the dropped game comes back unchanged
+    assert changed_ids(cache, slate) == ["3"]
+    assert cache.previous_status("2") == GameStatus.LIVE
+
+
+def test_warm_loads_the_persisted_states():
+    conn = sqlite3.connect(":memory:")
+    ensure_daily_games_schema(conn)
+    upsert_daily_games(conn, [game("1"), game("2", GameStatus.FINAL, 70, 65)])
+
+    cache = ScoreboardStateCache()
+    cache.warm(conn)
+    assert cache.previous_status("2") == GameStatus.FINAL
+    assert cache.previous_status("9") is None
+
+    slate = [game("1"), game("2", GameStatus.FINAL, 70, 65), game("9")]
+    assert changed_ids(cache, slate) == ["9"]
+
+
+def event(event_id, state, home_score, away_score, date="2025-01-18T17:00Z"):
+    names = {"pre": "STATUS_SCHEDULED", "in": "STATUS_IN_PROGRESS", "post": "STATUS_FINAL"}
+    return {
+        "id": event_id,
+        "date": date,
+        "competitions": [{
+            "status": {"clock": 300.0, "period": 1,
+                       "type": {"state": state, "completed": state == "post", "name": names[state]}},
+            "competitors": [
+                {"homeAway": "home", "score": home_score, "team": {"id": "1", "displayName": "Home"}},
+                {"homeAway": "away", "score": away_score, "team": {"id": "2", "displayName": "Away"}},
+            ],
+        }],
+    }
+
+
+def assert_same_snapshot(a, b):
+    assert a.ids == b.ids
+    for column in ("status", "home_score", "away_score", "start_key"):
+        assert np.array_equal(getattr(a, column), getattr(b, column))
+
+
+def test_parsed_snapshot_matches_its_games():
+    payload = {"events": [
+        event("1", "in", "30", "28"),
+        event("2", "pre", None, None, date="2025-01-18T19:30Z"),
+        {"id": "3", "competitions": []},  # skipped
+        event("4", "post", "71", "70"),
+    ]}
+    board = parse_scoreboard(payload)
+    assert [g.game_live_id for g in board] == ["1", "2", "4"]
+    assert_same_snapshot(board.snapshot, ScoreboardSnapshot.from_games(board))
+    assert board.snapshot.home_score[1] == NO_SCORE
+
+    subset = board.subset([0, 2])
+    assert [g.game_live_id for g in subset] == ["1", "4"]
+    assert_same_snapshot(subset.snapshot, ScoreboardSnapshot.from_games(subset))
+
+    owned = parse_scoreboard(payload, owns=lambda event_id: event_id != "1")
+    assert_same_snapshot(owned.snapshot, ScoreboardSnapshot.from_games(owned))
+    assert owned.snapshot.ids == ["2", "4"]
+
+
+def test_live_game_is_slotted():
+    assert not hasattr(game("1"), "__dict__")
@@ -0,0 +1,82 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from app.clock import SimulatedClock
+from app.db_live import GameStatus, LiveGame, ensure_daily_games_schema, upsert_daily_games
+from app.poller import PollScheduler, next_poll_delay
+
+NOW = datetime(2025, 1, 18, 17, 0, tzinfo=timezone.utc)  # noon ET
+
+
+def game(status, period=None, clock_seconds=None, start=NOW):
+    return LiveGame(
+        game_live_id="401", date="2025-01-18", start_time_utc=start.isoformat(), status=status,
+        home_name="Home", away_name="Away", home_espn_team_id="1", away_espn_team_id="2",
+        home_score=None, away_score=None, period=period, clock_seconds=clock_seconds,
+    )
+
+
+def scheduler(**kwargs):
+    return PollScheduler(fast_seconds=5, slow_seconds=30, idle_seconds=900,
+                         end_of_half_seconds=120, tipoff_lead_seconds=600, **kwargs)
+
+
+def test_game_cadence_follows_period_and_clock():
+    s = scheduler()
+    assert s.game_interval(game(GameStatus.LIVE, 1, 119.0), NOW) == 5
+    assert s.game_interval(game(GameStatus.LIVE, 1, 120.0), NOW) == 5
+    assert s.game_interval(game(GameStatus.LIVE, 2, 600.0), NOW) == 30
+    assert s.game_interval(game(GameStatus.LIVE), NOW) == 30  # no clock on the scoreboard
+    assert s.game_interval(game(GameStatus.HALFTIME), NOW) == 30
+    assert s.game_interval(game(GameStatus.FINAL), NOW) is None
+
+
+def test_slate_polls_at_its_shortest_cadence():
+    s = scheduler()
+    slate = [game(GameStatus.FINAL), game(GameStatus.LIVE, 1, 900.0), game(GameStatus.HALFTIME)]
+    assert s.next_delay(slate, NOW) == 30
+    assert s.next_delay(slate + [game(GameStatus.LIVE, 2, 45.0)], NOW) == 5
+
+
+def test_fixed_interval_ignores_game_state():
+    s = scheduler(adaptive=False)
+    assert s.next_delay([game(GameStatus.LIVE, 2, 10.0)], NOW) == 30
+    assert s.next_delay([], NOW) == 30
+
+
+def test_pre_game_is_not_polled_until_the_tipoff_lead():
+    s = scheduler()
+    assert s.game_interval(game(GameStatus.PRE, start=NOW + timedelta(minutes=11)), NOW) is None
+    assert s.game_interval(game(GameStatus.PRE, start=NOW + timedelta(minutes=10)), NOW) == 30
+    assert s.game_interval(game(GameStatus.PRE, start=NOW - timedelta(minutes=5)), NOW) == 30  # late tip
+
+
+def test_idle_sleeps_until_shortly_before_next_tipoff():
+    s = scheduler()
+    slate = [game(GameStatus.FINAL), game(GameStatus.PRE, start=NOW + timedelta(minutes=12))]
+    assert s.next_delay(slate, NOW, NOW + timedelta(minutes=12)) == 120
+    # heartbeat caps a long idle; a tipoff inside the lead wakes at the fast cadence
+    assert s.next_delay(slate, NOW, NOW + timedelta(hours=3)) == 900
+    assert s.next_delay(slate, NOW, NOW + timedelta(minutes=9)) == 5
+    assert s.next_delay([], NOW, None) == 900
+
+
+def test_idle_wakes_for_the_sports_day_rollover():
+    s = scheduler()
+    before_rollover = datetime(2025, 1, 19, 9, 58, tzinfo=timezone.utc)  # 4:58am ET
+    assert s.next_delay([], before_rollover, None) == 120
+
+
+def test_next_poll_delay_reads_the_next_tipoff_from_daily_games(monkeypatch):
+    monkeypatch.setattr("app.clock._clock", SimulatedClock(NOW))
+    conn = sqlite3.connect(":memory:")
+    ensure_daily_games_schema(conn)
+    upsert_daily_games(conn, [
+        game(GameStatus.FINAL, start=NOW - timedelta(hours=3)),
+        LiveGame("402", "2025-01-18", (NOW + timedelta(minutes=20)).isoformat(), GameStatus.PRE,
+                 "H2", "A2", "3", "4", None, None),
+    ])
+
+    slate = [game(GameStatus.FINAL)]
+    assert next_poll_delay(conn, scheduler(), slate, "2025-01-18") == 600
+    assert next_poll_delay(conn, scheduler(), slate, "2025-01-19") == 900
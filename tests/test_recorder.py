@@ -0,0 +1,85 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.sources.recorder import ReplayFinished, ReplaySource
+
+START = datetime(2025, 1, 18, 17, 0, tzinfo=timezone.utc)
+
+
+def scoreboard(state, home, away):
+    names = {"pre": "STATUS_SCHEDULED", "in": "STATUS_IN_PROGRESS", "post": "STATUS_FINAL"}
+    return {"events": [{
+        "id": "401",
+        "date": "2025-01-18T17:00Z",
+        "competitions": [{
+            "status": {"clock": 0.0, "period": 1,
+                       "type": {"state": state, "completed": state == "post", "name": names[state]}},
+            "competitors": [
+                {"homeAway": "home", "score": str(home), "team": {"id": "1", "displayName": "Home"}},
+                {"homeAway": "away", "score": str(away), "team": {"id": "2", "displayName": "Away"}},
+            ],
+        }],
+    }]}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    records = [
+        (0, "scoreboard", {"dates": "20250118"}, scoreboard("pre", 0, 0)),
+        (60, "scoreboard", {"dates": "20250118"}, scoreboard("in", 12, 9)),
+        (62, "summary", {"event": "401"}, {"boxscore": {"teams": []}, "n": 1}),
+        (120, "scoreboard", {"dates": "20250118"}, scoreboard("in", 30, 28)),
+        (180, "scoreboard", {"dates": "20250118"}, scoreboard("post", 70, 65)),
+    ]
+    path = tmp_path / "espn-20250118T170000Z.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for offset, kind, params, payload in records:
+            t = (START + timedelta(seconds=offset)).isoformat()
+            fh.write(json.dumps({"t": t, "kind": kind, "params": params, "payload": payload}) + "\n")
+        fh.write('{"t": "truncated')  # killed recorder
+    return path
+
+
+def poll_until_finished(path, interval):
+    source = ReplaySource([path], speed=0)
+    seen = []
+    while True:
+        try:
+            games = source.fetch_scoreboard("http://scoreboard", "20250118")
+        except ReplayFinished:
+            return seen
+        g = games[0]
+        seen.append((source.clock.now(), str(g.status), g.home_score, g.away_score))
+        source.clock.sleep(interval)
+
+
+def test_replay_is_deterministic(archive):
+    first = poll_until_finished(archive, 25)
+    assert first == poll_until_finished(archive, 25)
+    assert [s[0] - START for s in first] == [timedelta(seconds=25 * i) for i in range(8)]
+    assert [s[1:] for s in first] == [
+        ("PRE", 0, 0), ("PRE", 0, 0), ("PRE", 0, 0),
+        ("LIVE", 12, 9), ("LIVE", 12, 9),
+        ("LIVE", 30, 28), ("LIVE", 30, 28), ("FINAL", 70, 65),
+    ]
+
+
+def test_replay_serves_the_latest_payload_at_or_before_now(archive):
+    source = ReplaySource([archive], speed=0)
+    assert source.clock.now() == START
+    with pytest.raises(LookupError):
+        source.get_json("http://summary", {"event": "401"}, 5, kind="summary")
+
+    # the summary recorded 2s after the scoreboard is within the lookahead
+    source.clock.sleep(60)
+    assert source.get_json("http://summary", {"event": "401"}, 5, kind="summary")["n"] == 1
+    with pytest.raises(LookupError):
+        source.get_json("http://summary", {"event": "999"}, 5, kind="summary")
+
+    source.clock.sleep(121)
+    assert source.finished
+    with pytest.raises(ReplayFinished):
+        source.get_json("http://scoreboard", {"dates": "20250118"}, 5, kind="scoreboard")
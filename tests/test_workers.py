@@ -0,0 +1,50 @@
+import threading
+import time
+
+from app.workers import TransitionWorkerPool
+
+
+def test_tasks_for_one_key_run_in_submit_order(tmp_path):
+    pool = TransitionWorkerPool(tmp_path / "w.db", workers=3, max_queue=8)
+    lock = threading.Lock()
+    seen = []
+
+    def task(conn, key, i):
+        time.sleep(0.001 * (i % 3))
+        with lock:
+            seen.append((key, i))
+
+    keys = [f"game-{k}" for k in range(10)]
+    for i in range(20):
+        for key in keys:
+            pool.submit(key, "halftime", task, key, i)
+    pool.shutdown(wait=True)
+
+    for key in keys:
+        assert [i for k, i in seen if k == key] == list(range(20))
+
+
+def test_shutdown_drains_queued_tasks(tmp_path):
+    pool = TransitionWorkerPool(tmp_path / "w.db", workers=2)
+    gate = threading.Event()
+    done = []
+
+    def slow(conn, i):
+        gate.wait(5)
+        done.append(i)
+
+    def boom(conn):
+        raise RuntimeError("handler failed")
+
+    for i in range(10):
+        pool.submit("same-game", "final", slow, i)
+    pool.submit("same-game", "final", boom)
+    pool.submit("same-game", "final", slow, 10)
+    assert pool.depth() > 0
+
+    gate.set()
+    pool.shutdown(wait=True)
+
+    # everything submitted before shutdown ran, a failing handler did not stop the worker
+    assert done == list(range(11))
+    assert pool.depth() == 0